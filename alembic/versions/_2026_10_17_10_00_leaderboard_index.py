@@ -0,0 +1,31 @@
+"""leaderboard index
+
+Revision ID: 5c1f0e8a9b3d
+Revises: da53dbbe6f84
+Create Date: 2026-10-17 10:00:12.481093
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "5c1f0e8a9b3d"
+down_revision: Union[str, None] = "da53dbbe6f84"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_index(
+        "ix_personal_account_total_exp_user_id",
+        "personal_account",
+        [sa.text("total_exp DESC"), "user_id"],
+        unique=False,
+    )
+
+
+def downgrade() -> None:
+    op.drop_index("ix_personal_account_total_exp_user_id", table_name="personal_account")
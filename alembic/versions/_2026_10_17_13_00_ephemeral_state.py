@@ -0,0 +1,37 @@
+"""ephemeral state
+
+Revision ID: b41d9e0c7a28
+Revises: 3f9a6c2d1e57
+Create Date: 2026-10-17 13:00:27.550147
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision: str = "b41d9e0c7a28"
+down_revision: Union[str, None] = "3f9a6c2d1e57"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "ephemeral_state",
+        sa.Column("namespace", sa.String(), nullable=False),
+        sa.Column("key", sa.String(), nullable=False),
+        sa.Column("value", postgresql.JSONB(astext_type=sa.Text()), nullable=False),
+        sa.Column("expires_at", sa.DateTime(timezone=True), nullable=False),
+        sa.PrimaryKeyConstraint("namespace", "key"),
+        prefixes=["UNLOGGED"],
+    )
+    op.create_index(op.f("ix_ephemeral_state_expires_at"), "ephemeral_state", ["expires_at"], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index(op.f("ix_ephemeral_state_expires_at"), table_name="ephemeral_state")
+    op.drop_table("ephemeral_state")
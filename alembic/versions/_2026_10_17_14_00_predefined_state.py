@@ -0,0 +1,31 @@
+"""predefined state
+
+Revision ID: 6d0e3b9f52a1
+Revises: b41d9e0c7a28
+Create Date: 2026-10-17 14:00:51.118264
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "6d0e3b9f52a1"
+down_revision: Union[str, None] = "b41d9e0c7a28"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "predefined_state",
+        sa.Column("key", sa.String(), nullable=False),
+        sa.Column("hash", sa.String(), nullable=False),
+        sa.PrimaryKeyConstraint("key"),
+    )
+
+
+def downgrade() -> None:
+    op.drop_table("predefined_state")
@@ -0,0 +1,59 @@
+"""unique personal account rewards
+
+Revision ID: 8a4c2e7f1d93
+Revises: 6d0e3b9f52a1
+Create Date: 2026-10-18 10:00:37.204815
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "8a4c2e7f1d93"
+down_revision: Union[str, None] = "6d0e3b9f52a1"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # merge duplicates left by concurrent grants into the oldest row, summing their counts
+    op.execute(
+        sa.text(
+            """
+            WITH merged AS (
+                SELECT MIN(id) AS id, SUM(COALESCE(count, 0)) AS count
+                FROM personal_account_rewards
+                GROUP BY personal_account_id, reward_id
+                HAVING COUNT(*) > 1
+            )
+            UPDATE personal_account_rewards AS par SET count = merged.count
+            FROM merged
+            WHERE par.id = merged.id
+            """
+        )
+    )
+    op.execute(
+        sa.text(
+            """
+            DELETE FROM personal_account_rewards AS par
+            USING personal_account_rewards AS kept
+            WHERE kept.personal_account_id = par.personal_account_id
+                AND kept.reward_id = par.reward_id
+                AND kept.id < par.id
+            """
+        )
+    )
+    op.create_unique_constraint(
+        "uq_personal_account_rewards_personal_account_id_reward_id",
+        "personal_account_rewards",
+        ["personal_account_id", "reward_id"],
+    )
+
+
+def downgrade() -> None:
+    op.drop_constraint(
+        "uq_personal_account_rewards_personal_account_id_reward_id", "personal_account_rewards", type_="unique"
+    )
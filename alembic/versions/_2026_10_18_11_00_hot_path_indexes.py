@@ -0,0 +1,56 @@
+"""hot path indexes
+
+Revision ID: e7b3f0a85c14
+Revises: 8a4c2e7f1d93
+Create Date: 2026-10-18 11:00:14.650392
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "e7b3f0a85c14"
+down_revision: Union[str, None] = "8a4c2e7f1d93"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# (name, table, columns, partial index condition)
+INDEXES = [
+    ("ix_user_task_answers_user_id_task_id_correct", "user_task_answers", ["user_id", "task_id"], "is_correct"),
+    ("ix_task_association_task_id", "task_association", ["task_id"], None),
+    ("ix_level_battle_pass_id", "level", ["battle_pass_id"], None),
+    (
+        "ix_personal_account_battle_passes_personal_account_id",
+        "personal_account_battle_passes",
+        ["personal_account_id"],
+        None,
+    ),
+    ("ix_timeslots_consultant_id", "timeslots", ["consultant_id"], None),
+    ("ix_appointments_consultant_id", "appointments", ["consultant_id"], None),
+    ("ix_appointments_timeslot_id", "appointments", ["timeslot_id"], None),
+]
+
+
+def upgrade() -> None:
+    # CREATE INDEX CONCURRENTLY does not block writes, but can not run inside a transaction.
+    # If it fails, drop the INVALID index it leaves behind before running the migration again.
+    with op.get_context().autocommit_block():
+        for name, table, columns, where in INDEXES:
+            op.create_index(
+                name,
+                table,
+                columns,
+                unique=False,
+                postgresql_where=sa.text(where) if where else None,
+                postgresql_concurrently=True,
+                if_not_exists=True,
+            )
+
+
+def downgrade() -> None:
+    with op.get_context().autocommit_block():
+        for name, table, _, _ in reversed(INDEXES):
+            op.drop_index(name, table_name=table, postgresql_concurrently=True, if_exists=True)
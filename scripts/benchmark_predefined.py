@@ -0,0 +1,24 @@
+import shutil
+import sys
+import tempfile
+import timeit
+from pathlib import Path
+
+# add parent dir to sys.path
+sys.path.append(str(Path(__file__).parents[1]))
+from src.storages.predefined.storage import Predefined  # noqa: E402
+
+source = Path(sys.argv[1]) if len(sys.argv) > 1 else Path(__file__).parents[1] / "predefined.yaml"
+number = 50
+
+with tempfile.TemporaryDirectory() as tmp:
+    path = Path(tmp) / source.name
+    shutil.copy(source, path)
+    Predefined.compile_snapshot(path)
+    assert Predefined.load(path) == Predefined.from_yaml(path)
+
+    yaml_time = timeit.timeit(lambda: Predefined.from_yaml(path), number=number) / number
+    snapshot_time = timeit.timeit(lambda: Predefined.load(path), number=number) / number
+
+print(f"yaml:     {yaml_time * 1000:8.2f} ms")
+print(f"snapshot: {snapshot_time * 1000:8.2f} ms ({yaml_time / snapshot_time:.1f}x faster)")
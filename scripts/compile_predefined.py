@@ -0,0 +1,9 @@
+import sys
+from pathlib import Path
+
+# add parent dir to sys.path
+sys.path.append(str(Path(__file__).parents[1]))
+from src.storages.predefined.storage import Predefined  # noqa: E402
+
+path = Path(sys.argv[1]) if len(sys.argv) > 1 else Path(__file__).parents[1] / "predefined.yaml"
+print(f"Compiled {Predefined.compile_snapshot(path)}")
@@ -0,0 +1,171 @@
+"""
+Index advisor for hot query paths.
+
+Runs hot repository methods against a seeded database (each inside a unit of work that is rolled back),
+records every SQL statement they send, then runs EXPLAIN (ANALYZE, BUFFERS) on each of them inside a rolled back
+transaction and flags sequential scans over at least --min-rows rows.
+
+Usage: SETTINGS_PATH=settings.yaml python scripts/explain_queries.py [--user-id ID] [--min-rows N] [--analyze]
+"""
+
+import argparse
+import asyncio
+import json
+import sys
+from pathlib import Path
+from typing import Any, Awaitable, Callable, Optional
+
+from sqlalchemy import event, text
+from sqlalchemy.exc import DBAPIError
+
+# add parent dir to sys.path
+sys.path.append(str(Path(__file__).parents[1]))
+from src.api.dependencies import Dependencies  # noqa: E402
+from src.api.lifespan import setup_repositories  # noqa: E402
+from src.modules.auth.schemas import VerificationResult  # noqa: E402
+from src.modules.personal_account.schemas import PersonalAccountInclude  # noqa: E402
+from src.modules.user.schemas import UserRoles  # noqa: E402
+from src.storages.sqlalchemy.unit_of_work import UnitOfWork  # noqa: E402
+
+
+class Statement:
+    def __init__(self, scenario: str, sql: str, parameters: Any):
+        self.scenario = scenario
+        self.sql = sql
+        self.parameters = parameters
+
+
+def scenarios(user_id: int, lesson_id: Optional[int], task_id: Optional[int]) -> dict[str, Callable[[], Awaitable]]:
+    lessons = Dependencies.get_lesson_repository()
+    grading = Dependencies.get_grading_repository()
+    accounts = Dependencies.get_personal_account_repository()
+    rewards = Dependencies.get_reward_repository()
+    achievements = Dependencies.get_achievement_repository()
+    battle_passes = Dependencies.get_battle_pass_repository()
+    consultations = Dependencies.get_consultation_repository()
+    users = Dependencies.get_user_repository()
+    reports = Dependencies.get_report_repository()
+    verification = VerificationResult(success=True, user_id=user_id, role=UserRoles.DEFAULT)
+
+    async def submit():
+        answer_key = await lessons.read_answer_key(task_id)
+        await grading.submit(user_id=user_id, lesson_id=lesson_id, task=answer_key, is_correct=True)
+
+    async def first_batch(stream):
+        async for _ in stream:
+            break
+
+    found = {
+        "lesson catalog": lambda: lessons._load_catalog(),
+        "lesson progress": lambda: lessons.get_progress(user_id),
+        "user": lambda: users.read(user_id),
+        "personal account": lambda: accounts.read(verification, list(PersonalAccountInclude)),
+        "leaderboard": lambda: accounts._read_leaderboard_page(accounts.LEADERBOARD_TOP_SIZE),
+        "leaderboard position": lambda: accounts.read_leaderboard_position(user_id),
+        "my battle pass": lambda: accounts.read_my_battle_pass(verification),
+        "rewards": lambda: rewards.get_all(),
+        "grant rewards": lambda: rewards.add_rewards_to_personal_account(user_id, [(1, 1)]),
+        "achievement summaries": lambda: achievements._read_summaries(),
+        "battle passes": lambda: battle_passes.get_all(),
+        "battle pass levels": lambda: battle_passes._load_levels(),
+        "battle pass exp": lambda: battle_passes.increase_battle_exp(user_id, 10),
+        "consultants": lambda: consultations.read_all_consultants(),
+        "users report": lambda: first_batch(reports.stream_users()),
+        "lesson progress report": lambda: first_batch(reports.stream_lesson_progress()),
+        "task progress report": lambda: first_batch(reports.stream_task_progress()),
+    }
+    if lesson_id is not None and task_id is not None:
+        found["submit answer"] = submit
+    return found
+
+
+async def record(min_rows: int, user_id: Optional[int], analyze: bool) -> None:
+    await setup_repositories()
+    storage = Dependencies.get_storage()
+
+    async with storage.engine.connect() as connection:
+        if analyze:
+            await connection.execute(text("ANALYZE"))
+            await connection.commit()
+        if user_id is None:
+            # the most active user has the largest share of rows, as in production
+            user_id = (
+                await connection.execute(
+                    text("SELECT user_id FROM user_task_answers GROUP BY user_id ORDER BY COUNT(*) DESC LIMIT 1")
+                )
+            ).scalar() or (await connection.execute(text("SELECT MIN(user_id) FROM personal_account"))).scalar()
+        row = (await connection.execute(text("SELECT test_id, task_id FROM task_association LIMIT 1"))).first()
+    if user_id is None:
+        sys.exit("The database is empty, seed it first")
+    lesson_id, task_id = row if row else (None, None)
+
+    statements: dict[str, Statement] = {}
+    current = {"scenario": ""}
+
+    def before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        if not executemany and not statement.lstrip().upper().startswith(("BEGIN", "COMMIT", "ROLLBACK")):
+            statements.setdefault(statement, Statement(current["scenario"], statement, parameters))
+
+    event.listen(storage.engine.sync_engine, "before_cursor_execute", before_cursor_execute)
+    for name, scenario in scenarios(user_id, lesson_id, task_id).items():
+        current["scenario"] = name
+        try:
+            async with UnitOfWork(storage):  # never committed
+                await scenario()
+        except Exception as e:
+            print(f"! {name}: {type(e).__name__}: {e}")
+    event.remove(storage.engine.sync_engine, "before_cursor_execute", before_cursor_execute)
+
+    flagged = 0
+    async with storage.engine.connect() as connection:
+        for statement in statements.values():
+            transaction = await connection.begin()
+            try:
+                result = await connection.exec_driver_sql(
+                    f"EXPLAIN (ANALYZE, BUFFERS, FORMAT JSON) {statement.sql}", statement.parameters or ()
+                )
+                plan = result.scalar()
+            except DBAPIError as e:
+                print(f"! {statement.scenario}: EXPLAIN failed: {e.orig}")
+                continue
+            finally:
+                await transaction.rollback()
+            flagged += report(statement, json.loads(plan)[0] if isinstance(plan, str) else plan[0], min_rows)
+
+    print(f"\n{len(statements)} statements explained, {flagged} with sequential scans over {min_rows}+ rows")
+    await storage.close_connection()
+
+
+def seq_scans(node: dict) -> list[dict]:
+    found = [node] if node["Node Type"] == "Seq Scan" else []
+    for child in node.get("Plans", []):
+        found.extend(seq_scans(child))
+    return found
+
+
+def report(statement: Statement, explained: dict, min_rows: int) -> bool:
+    plan = explained["Plan"]
+    flags = []
+    for scan in seq_scans(plan):
+        scanned = (scan.get("Actual Rows", 0) + scan.get("Rows Removed by Filter", 0)) * scan.get("Actual Loops", 1)
+        if scanned >= min_rows:
+            flags.append(f"Seq Scan on {scan['Relation Name']}: {scanned} rows, filter {scan.get('Filter', '-')}")
+
+    buffers = plan.get("Shared Hit Blocks", 0) + plan.get("Shared Read Blocks", 0)
+    sql = " ".join(statement.sql.split())
+    print(
+        f"{'SEQ ' if flags else 'ok  '} {explained['Execution Time']:8.2f} ms {buffers:7} buffers  [{statement.scenario}]"
+    )
+    print(f"     {sql[:160]}{'...' if len(sql) > 160 else ''}")
+    for flag in flags:
+        print(f"     ^ {flag}")
+    return bool(flags)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--user-id", type=int, help="User to run queries for (default: the most active one)")
+    parser.add_argument("--min-rows", type=int, default=1000, help="Ignore sequential scans over smaller tables")
+    parser.add_argument("--analyze", action="store_true", help="Run ANALYZE first to refresh planner statistics")
+    args = parser.parse_args()
+    asyncio.run(record(args.min_rows, args.user_id, args.analyze))
@@ -12,6 +12,7 @@ from starlette.responses import RedirectResponse
 from src.api import docs
 from src.api.docs import generate_unique_operation_id
 from src.api.lifespan import lifespan
+from src.api.middlewares import UnitOfWorkMiddleware
 from src.api.routers import routers
 from src.config import settings
 from src.config_schema import Environment
@@ -45,6 +46,9 @@ if settings.static_files is not None:
         name=settings.static_files.mount_name,
     )
 
+# One database session and transaction per request
+app.add_middleware(UnitOfWorkMiddleware)
+
 # CORS settings
 if settings.cors_allow_origins:
     app.add_middleware(
@@ -0,0 +1,47 @@
+__all__ = ["json_response", "CONDITIONAL_RESPONSES"]
+
+from typing import Optional
+
+from fastapi import Request, Response
+from starlette import status
+
+from src.api.exceptions import ObjectNotFound
+from src.config import settings
+from src.storages.cache import SerializedJSON
+
+CONDITIONAL_RESPONSES = {
+    304: {"description": "Not modified, the ETag sent in If-None-Match is still current"},
+}
+
+
+def _cache_control(public: bool) -> str:
+    # Responses to authorized requests must not be stored by shared caches
+    scope = "public" if public else "private"
+    return (
+        f"{scope}, max-age={settings.http_cache.max_age}, "
+        f"stale-while-revalidate={settings.http_cache.stale_while_revalidate}"
+    )
+
+
+def _etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    if not if_none_match:
+        return False
+    if if_none_match.strip() == "*":
+        return True
+    # weak comparison: proxies may turn a strong ETag into a weak one after compressing the body
+    return any(candidate.strip().removeprefix("W/") == etag for candidate in if_none_match.split(","))
+
+
+def json_response(request: Request, payload: Optional[SerializedJSON], public: bool = True) -> Response:
+    """
+    Response with JSON serialized beforehand, or 304 Not Modified if the client already has it.
+
+    :raises ObjectNotFound: if payload is None
+    """
+    if payload is None:
+        raise ObjectNotFound()
+
+    headers = {"ETag": payload.etag, "Cache-Control": _cache_control(public)}
+    if _etag_matches(request.headers.get("if-none-match"), payload.etag):
+        return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=headers)
+    return Response(content=payload.content, media_type="application/json", headers=headers)
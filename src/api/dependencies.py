@@ -6,6 +6,7 @@ Live Template for dependencies:
         "user_repository: Annotated[UserRepository, DEPENDS_USER_REPOSITORY]",
         "auth_repository: Annotated[AuthRepository, DEPENDS_AUTH_REPOSITORY]",
         "verification: Annotated[VerificationResult, DEPENDS_VERIFIED_REQUEST]",
+        "verification: Annotated[VerificationResult, DEPENDS_ADMIN]",
     )
 """
 
@@ -26,22 +27,30 @@ if TYPE_CHECKING:
         BattlePassRepository,
         EventRepository,
     )
-    from src.modules.lesson.repository import LessonRepository
+    from src.modules.lesson.repository import LessonRepository, GradingRepository
     from src.storages.sqlalchemy.storage import SQLAlchemyStorage
-    from src.modules.smtp.repository import SMTPRepository
+    from src.modules.smtp.repository import SMTPRepository, MailOutboxRepository
     from src.modules.consultation.repository import ConsultationRepository
     from src.modules.phishing.repository import PhishingRepository
+    from src.modules.scheduler.repository import ScheduledJobRepository
+    from src.storages.ephemeral import EphemeralStorage
+    from src.modules.report.repository import ReportRepository
 
 
 class Dependencies:
     _storage: "SQLAlchemyStorage"
+    _ephemeral_storage: "EphemeralStorage"
     _user_repository: "UserRepository"
     _auth_repository: "AuthRepository"
     _personal_account_repository: "PersonalAccountRepository"
     _reward_repository: "RewardRepository"
     _lesson_repository: "LessonRepository"
+    _grading_repository: "GradingRepository"
     _jinja2_env: "Environment"
     _smtp_repository: "SMTPRepository"
+    _mail_outbox_repository: "MailOutboxRepository"
+    _scheduled_job_repository: "ScheduledJobRepository"
+    _report_repository: "ReportRepository"
     _achievement_repository: "AchievementRepository"
     _level_repository: "LevelRepository"
     _battle_pass_repository: "BattlePassRepository"
@@ -57,6 +66,14 @@ class Dependencies:
     def set_storage(cls, storage: "SQLAlchemyStorage"):
         cls._storage = storage
 
+    @classmethod
+    def get_ephemeral_storage(cls) -> "EphemeralStorage":
+        return cls._ephemeral_storage
+
+    @classmethod
+    def set_ephemeral_storage(cls, ephemeral_storage: "EphemeralStorage"):
+        cls._ephemeral_storage = ephemeral_storage
+
     @classmethod
     def get_user_repository(cls) -> "UserRepository":
         return cls._user_repository
@@ -97,6 +114,14 @@ class Dependencies:
     def set_lesson_repository(cls, lesson_repository: "LessonRepository"):
         cls._lesson_repository = lesson_repository
 
+    @classmethod
+    def get_grading_repository(cls) -> "GradingRepository":
+        return cls._grading_repository
+
+    @classmethod
+    def set_grading_repository(cls, grading_repository: "GradingRepository"):
+        cls._grading_repository = grading_repository
+
     @classmethod
     def get_achievement_repository(cls) -> "AchievementRepository":
         return cls._achievement_repository
@@ -121,6 +146,30 @@ class Dependencies:
     def set_smtp_repository(cls, smtp_repository: "SMTPRepository"):
         cls._smtp_repository = smtp_repository
 
+    @classmethod
+    def get_mail_outbox_repository(cls) -> "MailOutboxRepository":
+        return cls._mail_outbox_repository
+
+    @classmethod
+    def set_mail_outbox_repository(cls, mail_outbox_repository: "MailOutboxRepository"):
+        cls._mail_outbox_repository = mail_outbox_repository
+
+    @classmethod
+    def get_scheduled_job_repository(cls) -> "ScheduledJobRepository":
+        return cls._scheduled_job_repository
+
+    @classmethod
+    def set_scheduled_job_repository(cls, scheduled_job_repository: "ScheduledJobRepository"):
+        cls._scheduled_job_repository = scheduled_job_repository
+
+    @classmethod
+    def get_report_repository(cls) -> "ReportRepository":
+        return cls._report_repository
+
+    @classmethod
+    def set_report_repository(cls, report_repository: "ReportRepository"):
+        cls._report_repository = report_repository
+
     @classmethod
     def get_level_repository(cls) -> "LevelRepository":
         return cls._level_repository
@@ -171,13 +220,18 @@ DEPENDS_AUTH_REPOSITORY = Depends(Dependencies.get_auth_repository)
 DEPENDS_PERSONAL_ACCOUNT_REPOSITORY = Depends(Dependencies.get_personal_account_repository)
 DEPENDS_REWARD_REPOSITORY = Depends(Dependencies.get_reward_repository)
 DEPENDS_LESSON_REPOSITORY = Depends(Dependencies.get_lesson_repository)
+DEPENDS_GRADING_REPOSITORY = Depends(Dependencies.get_grading_repository)
 DEPENDS_SMTP_REPOSITORY = Depends(Dependencies.get_smtp_repository)
+DEPENDS_MAIL_OUTBOX_REPOSITORY = Depends(Dependencies.get_mail_outbox_repository)
+DEPENDS_SCHEDULED_JOB_REPOSITORY = Depends(Dependencies.get_scheduled_job_repository)
+DEPENDS_REPORT_REPOSITORY = Depends(Dependencies.get_report_repository)
 DEPENDS_ACHIEVEMENT_REPOSITORY = Depends(Dependencies.get_achievement_repository)
 DEPENDS_LEVEL_REPOSITORY = Depends(Dependencies.get_level_repository)
 DEPENDS_BATTLE_PASS_REPOSITORY = Depends(Dependencies.get_battle_pass_repository)
 DEPENDS_CONSULTATION_REPOSITORY = Depends(Dependencies.get_consultation_repository)
 DEPENDS_EVENT_REPOSITORY = Depends(Dependencies.get_event_repository)
 
-from src.modules.auth.dependencies import verify_request  # noqa: E402
+from src.modules.auth.dependencies import verify_request, verify_admin  # noqa: E402
 
 DEPENDS_VERIFIED_REQUEST = Depends(verify_request)
+DEPENDS_ADMIN = Depends(verify_admin)
@@ -3,6 +3,7 @@ __all__ = [
     "IncorrectCredentialsException",
     "InvalidRedirectUri",
     "ObjectNotFound",
+    "TooManyRequestsException",
 ]
 
 from fastapi import HTTPException
@@ -83,3 +84,23 @@ class ObjectNotFound(HTTPException):
         )
 
     responses = {404: {"description": "Object with this properties not found"}}
+
+
+class TooManyRequestsException(HTTPException):
+    """
+    HTTP_429_TOO_MANY_REQUESTS
+    """
+
+    def __init__(self, retry_after: int = 1):
+        super().__init__(
+            status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+            detail=self.responses[429]["description"],
+            headers={"Retry-After": str(retry_after)},
+        )
+
+    responses = {
+        429: {
+            "description": "Server is busy, try again later",
+            "headers": {"Retry-After": {"schema": {"type": "integer"}}},
+        }
+    }
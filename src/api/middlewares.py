@@ -0,0 +1,34 @@
+__all__ = ["UnitOfWorkMiddleware"]
+
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from src.api.dependencies import Dependencies
+from src.storages.sqlalchemy.unit_of_work import UnitOfWork
+
+
+class UnitOfWorkMiddleware:
+    """
+    Runs every HTTP request in one unit of work, so repositories share a session and a transaction.
+    The work is committed right before a successful response starts, so a failed commit still turns into an error
+    response; error responses roll it back. The session is closed after the body is sent (it may be streamed).
+    """
+
+    def __init__(self, app: ASGIApp):
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        async with UnitOfWork(Dependencies.get_storage()) as unit_of_work:
+
+            async def send_wrapper(message: Message) -> None:
+                if message["type"] == "http.response.start":
+                    if message["status"] < 400:
+                        await unit_of_work.commit()
+                    else:
+                        await unit_of_work.rollback()
+                await send(message)
+
+            await self.app(scope, receive, send_wrapper)
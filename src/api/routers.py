@@ -7,6 +7,7 @@ from src.modules.lesson.router import router as router_tests
 from src.modules.consultation.router import router as router_consultation
 from src.modules.report.router import router as router_report
 from src.modules.phishing.router import router as router_phishing
+from src.modules.monitoring.router import router as router_monitoring
 
 routers = [
     router_users,
@@ -16,6 +17,7 @@ routers = [
     router_consultation,
     router_report,
     router_phishing,
+    router_monitoring,
 ]
 
 if settings.environment == Environment.DEVELOPMENT:
@@ -27,12 +27,36 @@ class StaticFiles(BaseModel):
     directory: Path = Path("static")
 
 
+class DatabasePool(BaseModel):
+    """Connection pool settings. Every worker process has its own pool."""
+
+    pool_size: int = Field(
+        5,
+        ge=1,
+        description="Connections kept open by each worker. "
+        "(pool_size + max_overflow) * workers must stay below Postgres max_connections",
+    )
+    max_overflow: int = Field(10, ge=0, description="Connections that may be opened above pool_size under load")
+    pool_timeout: float = Field(30, description="How long (in seconds) to wait for a free connection before failing")
+    pre_ping: bool = Field(True, description="Check that a connection is alive before handing it out")
+    recycle: int = Field(1800, description="Reopen connections older than this (in seconds), -1 to keep them forever")
+    statement_cache_size: int = Field(
+        100, ge=0, description="Prepared statements cached per connection, 0 when connecting through PgBouncer"
+    )
+    server_settings: dict[str, str] = Field(
+        {"jit": "off"},
+        description="Postgres settings applied to every connection. "
+        "JIT rarely pays off for short OLTP queries and adds latency to planning",
+    )
+
+
 class Database(BaseModel):
     """PostgreSQL database settings."""
 
     model_config = ConfigDict(arbitrary_types_allowed=True)
 
     uri: str = Field(..., description="Database URI. If not set, will be generated from other settings")
+    pool: DatabasePool = Field(default_factory=DatabasePool, description="Connection pool settings")
 
     @field_validator("uri", mode="before")
     @classmethod
@@ -42,9 +66,28 @@ class Database(BaseModel):
         return make_url(v).render_as_string(hide_password=False)
 
     def get_async_engine(self):
+        """
+        Create an engine with its own connection pool. Create it once per process and share it.
+        """
         from sqlalchemy.ext.asyncio import create_async_engine
 
-        return create_async_engine(self.uri)
+        from src.storages.sqlalchemy.pool import TimedAsyncAdaptedQueuePool
+
+        return create_async_engine(
+            self.uri,
+            poolclass=TimedAsyncAdaptedQueuePool,
+            pool_size=self.pool.pool_size,
+            max_overflow=self.pool.max_overflow,
+            pool_timeout=self.pool.pool_timeout,
+            pool_pre_ping=self.pool.pre_ping,
+            pool_recycle=self.pool.recycle,
+            connect_args={
+                # cache of SQLAlchemy asyncpg dialect and of asyncpg itself
+                "prepared_statement_cache_size": self.pool.statement_cache_size,
+                "statement_cache_size": self.pool.statement_cache_size,
+                "server_settings": self.pool.server_settings,
+            },
+        )
 
 
 class Predefined(BaseModel):
@@ -55,11 +98,96 @@ class Predefined(BaseModel):
     first_superuser_email: str = Field(default="admin@admin", description="Email for the first superuser")
 
 
+class EphemeralBackend(StrEnum):
+    MEMORY = "memory"
+    POSTGRES = "postgres"
+
+
+class Ephemeral(BaseModel):
+    """Storage of short-lived state (registration flows, phishing)."""
+
+    backend: EphemeralBackend = Field(
+        EphemeralBackend.POSTGRES,
+        description="Where to keep the state. 'memory' works only with a single app worker",
+    )
+    cleanup_interval: float = Field(300, description="How often (in seconds) to delete expired entries")
+
+
+class HTTPCache(BaseModel):
+    """Cache-Control of catalog responses (lessons, rewards, achievements, battle passes, consultants)."""
+
+    max_age: int = Field(
+        30, ge=0, description="How long (in seconds) browsers and CDNs may reuse a catalog response without asking"
+    )
+    stale_while_revalidate: int = Field(
+        300, ge=0, description="How long (in seconds) caches may serve a stale catalog response while revalidating it"
+    )
+
+
+class Auth(BaseModel):
+    """Authentication settings."""
+
+    revocation_check: bool = Field(
+        True,
+        description="Check that the token owner still exists and read its actual role when a token is not cached. "
+        "If disabled, tokens are authorized by their claims only and stay valid until they expire",
+    )
+    token_cache_ttl: int = Field(
+        300, description="How long (in seconds) verified tokens are cached, so a revoked token may live this long"
+    )
+    registration_code_ttl: int = Field(900, description="How long (in seconds) a registration code is valid")
+    bcrypt_rounds: int = Field(
+        12, ge=4, le=31, description="bcrypt cost for new password hashes. Existing hashes keep their own cost"
+    )
+    password_workers: int = Field(2, ge=1, description="Number of threads hashing and verifying passwords")
+    password_queue_size: int = Field(
+        16,
+        ge=0,
+        description="How many password operations may wait for a free worker. "
+        "Requests beyond that are rejected with 429 Too Many Requests",
+    )
+
+
+class Outbox(BaseModel):
+    """Settings of the background worker sending queued emails."""
+
+    poll_interval: float = Field(5, description="How often (in seconds) to look for due emails when idle")
+    batch_size: int = Field(20, ge=1, description="How many emails to claim at once")
+    lease: int = Field(
+        120, description="How long (in seconds) a claimed email is hidden from other workers while it is being sent"
+    )
+    max_attempts: int = Field(6, ge=1, description="How many times to try sending an email before giving up")
+    retry_delay: float = Field(
+        30, description="Delay (in seconds) before the first retry. It doubles with every failed attempt"
+    )
+    max_retry_delay: float = Field(3600, description="Upper bound (in seconds) for the retry delay")
+
+
+class Scheduler(BaseModel):
+    """Settings of the delayed jobs scheduler."""
+
+    poll_interval: float = Field(
+        30, description="Longest sleep (in seconds) between checks, to notice jobs scheduled by other workers"
+    )
+    batch_size: int = Field(50, ge=1, description="How many due jobs to claim at once")
+    lease: int = Field(60, description="How long (in seconds) a claimed job is hidden from other workers")
+    max_attempts: int = Field(5, ge=1, description="How many times to run a failing job before giving up")
+    retry_delay: float = Field(30, description="Delay (in seconds) before the first retry, doubles with every attempt")
+
+
 class SMTP(BaseModel):
     server: str = Field(..., description="SMTP server (hostname)")
     port: int = Field(587, description="SMTP port")
-    username: str = Field(..., description="SMTP username (email)")
-    password: SecretStr = Field(..., description="SMTP password")
+    starttls: bool = Field(True, description="Upgrade the connection with STARTTLS")
+    username: str = Field(..., description="SMTP username (email), also used as the sender address")
+    password: Optional[SecretStr] = Field(None, description="SMTP password. If not set, the client does not log in")
+    pool_size: int = Field(
+        2, ge=1, description="Number of SMTP connections (and threads) kept open and reused between messages"
+    )
+    connection_idle_timeout: float = Field(
+        60, description="Reconnect if a pooled connection was idle longer than this (in seconds)"
+    )
+    outbox: Outbox = Field(default_factory=Outbox, description="Outbox worker settings")
     mailing_template: MailingTemplate = Field(default_factory=MailingTemplate, description="Mailing template settings")
     phishing_template: MailingTemplate = Field(
         default=MailingTemplate(subject="Ваши финансовые средства в опасности!!!", file="phishing.jinja2"),
@@ -84,6 +212,14 @@ class Settings(BaseModel):
 
     smtp: SMTP = Field(..., description="SMTP settings")
 
+    auth: Auth = Field(default_factory=Auth, description="Authentication settings")
+
+    scheduler: Scheduler = Field(default_factory=Scheduler, description="Delayed jobs scheduler settings")
+
+    ephemeral: Ephemeral = Field(default_factory=Ephemeral, description="Short-lived state storage settings")
+
+    http_cache: HTTPCache = Field(default_factory=HTTPCache, description="HTTP caching of catalog responses")
+
     session_secret_key: SecretStr = Field(
         ..., description="Secret key for sessions middleware. Use 'openssl " "rand -hex 32' to generate keys"
     )
@@ -20,11 +20,11 @@ class AdminAuth(AuthenticationBackend):
 
         auth_repository = Dependencies.get_auth_repository()
         try:
-            user_id = await auth_repository.authenticate_user(login=login, password=password)
+            verification = await auth_repository.authenticate_user(login=login, password=password)
         except IncorrectCredentialsException:
             return False
 
-        token = TokenRepository.create_access_token(user_id)
+        token = TokenRepository.create_access_token(verification.user_id, verification.role)
         request.session["access_token"] = token
         return True
 
@@ -47,12 +47,7 @@ class AdminAuth(AuthenticationBackend):
 
         verification_result = await TokenRepository.verify_access_token(token)
 
-        if not verification_result:
-            return False
-
-        user = await Dependencies.get_user_repository().read(verification_result.user_id)
-
-        if not user or not user.is_admin:
+        if not verification_result.success or not verification_result.is_admin:
             return False
 
         return True
@@ -4,6 +4,7 @@ from sqladmin import ModelView
 from starlette.requests import Request
 
 from src.api.dependencies import Dependencies
+from src.modules.auth.repository import TokenRepository
 from src.storages.sqlalchemy.models import User
 
 
@@ -16,10 +17,17 @@ class CustomUserModelView(ModelView):
             return
 
         # hash password
-        hashed_password = Dependencies.get_auth_repository().get_password_hash(password)
+        hashed_password = await Dependencies.get_auth_repository().get_password_hash(password)
 
         data["password_hash"] = hashed_password
 
+    async def after_model_change(self, data: dict, model: User, is_created: bool, request: Request) -> None:
+        if not is_created:
+            TokenRepository.invalidate_user(model.id)
+
+    async def after_model_delete(self, model: User, request: Request) -> None:
+        TokenRepository.invalidate_user(model.id)
+
 
 class UserView(CustomUserModelView, model=User):
     form_columns = [
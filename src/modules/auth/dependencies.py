@@ -1,11 +1,11 @@
-__all__ = ["verify_request"]
+__all__ = ["verify_request", "verify_admin"]
 
 from typing import Optional
 
 from fastapi import Depends
 from fastapi.security import HTTPAuthorizationCredentials, HTTPBearer
 
-from src.api.exceptions import NoCredentialsException, IncorrectCredentialsException
+from src.api.exceptions import NoCredentialsException, IncorrectCredentialsException, ForbiddenException
 from src.modules.auth.repository import TokenRepository
 from src.modules.auth.schemas import VerificationResult
 
@@ -44,3 +44,15 @@ async def verify_request(
         return verification_result
 
     raise IncorrectCredentialsException()
+
+
+async def verify_admin(
+    verification: VerificationResult = Depends(verify_request),
+) -> VerificationResult:
+    """
+    Check that the request is made by an admin. The role is taken from the verified token, no user is read.
+    :raises ForbiddenException: if the user is not an admin
+    """
+    if not verification.is_admin:
+        raise ForbiddenException()
+    return verification
@@ -0,0 +1,103 @@
+__all__ = ["PasswordHasher"]
+
+import asyncio
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Callable, TypeVar
+
+from passlib.context import CryptContext
+
+from src.api.exceptions import TooManyRequestsException
+from src.modules.auth.schemas import PasswordHasherStats
+
+T = TypeVar("T")
+
+
+class PasswordHasher:
+    """
+    Runs bcrypt in a bounded thread pool, so hashing does not block the event loop.
+    bcrypt releases the GIL, so threads hash in parallel.
+    When all workers are busy and the queue is full, new operations are rejected with 429.
+    """
+
+    _context: CryptContext
+    _executor: ThreadPoolExecutor
+    workers: int
+    queue_size: int
+    _lock: threading.Lock  # counters are updated from pool threads too
+    _in_flight: int  # submitted jobs that have not left the pool yet
+    _rejected: int
+    _completed: int
+    _total_wait: float
+    _total_work: float
+
+    def __init__(self, rounds: int, workers: int, queue_size: int):
+        self._context = CryptContext(schemes=["bcrypt"], bcrypt__rounds=rounds)
+        self._executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="password")
+        self.workers = workers
+        self.queue_size = queue_size
+        self._lock = threading.Lock()
+        self._in_flight = 0
+        self._rejected = 0
+        self._completed = 0
+        self._total_wait = 0.0
+        self._total_work = 0.0
+
+    async def hash(self, password: str) -> str:
+        return await self._run(self._context.hash, password)
+
+    async def verify(self, password: str, password_hash: str) -> bool:
+        return await self._run(self._context.verify, password, password_hash)
+
+    async def _run(self, func: Callable[..., T], *args) -> T:
+        with self._lock:
+            if self._in_flight >= self.workers + self.queue_size:
+                self._rejected += 1
+                raise TooManyRequestsException()
+            self._in_flight += 1
+
+        submitted_at = time.perf_counter()
+        started_at = finished_at = submitted_at
+
+        def work():
+            nonlocal started_at, finished_at
+            started_at = time.perf_counter()
+            try:
+                return func(*args)
+            finally:
+                finished_at = time.perf_counter()
+
+        def release(future: Future) -> None:
+            # the slot is held until the job leaves the pool, even if the awaiting request was cancelled
+            with self._lock:
+                self._in_flight -= 1
+                if not future.cancelled():
+                    self._completed += 1
+                    self._total_wait += started_at - submitted_at
+                    self._total_work += finished_at - started_at
+
+        try:
+            future = self._executor.submit(work)
+        except RuntimeError:  # shut down
+            with self._lock:
+                self._in_flight -= 1
+            raise
+        future.add_done_callback(release)
+        return await asyncio.wrap_future(future)
+
+    def stats(self) -> PasswordHasherStats:
+        completed = self._completed or 1
+        return PasswordHasherStats(
+            workers=self.workers,
+            queue_size=self.queue_size,
+            in_flight=self._in_flight,
+            queued=max(self._in_flight - self.workers, 0),
+            completed=self._completed,
+            rejected=self._rejected,
+            average_wait=self._total_wait / completed,
+            average_work=self._total_work / completed,
+        )
+
+    def shutdown(self) -> None:
+        self._executor.shutdown(wait=False, cancel_futures=True)
@@ -1,30 +1,48 @@
 __all__ = ["TokenRepository", "AuthRepository"]
 
+import hashlib
 import random
+import time
 from datetime import timedelta, datetime
 from typing import Optional
 
 from authlib.jose import jwt, JoseError
 from fastapi import HTTPException
-from passlib.context import CryptContext
 from sqlalchemy import select
 
 from src.api.dependencies import Dependencies
 from src.api.exceptions import IncorrectCredentialsException
 from src.config import settings
+from src.modules.auth.hasher import PasswordHasher
 from src.modules.auth.schemas import VerificationResult, UserCredentialsFromDB, EmailFlow
-from src.modules.user.schemas import CreateUser, ViewUser
+from src.modules.user.schemas import CreateUser, CreateUserWithPasswordHash, ViewUser, UserRoles
+from src.storages.cache import TTLCache
 from src.storages.sqlalchemy.models import User
 from src.storages.sqlalchemy.repository import SQLAlchemyRepository
 
 
 class TokenRepository:
     ALGORITHM = "RS256"
+    CACHE_SIZE = 4096
+    # sha256(token) -> (user generation, verification result)
+    _verified: TTLCache[tuple[int, VerificationResult]] = TTLCache(
+        maxsize=CACHE_SIZE, ttl=settings.auth.token_cache_ttl
+    )
+    _user_generations: dict[int, int] = {}  # user_id -> number of invalidations
 
     @classmethod
     async def verify_access_token(cls, auth_token: str) -> VerificationResult:
+        key = hashlib.sha256(auth_token.encode()).digest()
+        cached = cls._verified.get(key)
+        if cached is not None:
+            generation, verification_result = cached
+            if generation == cls._user_generations.get(verification_result.user_id, 0):
+                return verification_result
+            cls._verified.pop(key)
+
         try:
             payload = jwt.decode(auth_token, settings.jwt_public_key)
+            payload.validate()
         except JoseError:
             return VerificationResult(success=False)
 
@@ -35,16 +53,36 @@ class TokenRepository:
             return VerificationResult(success=False)
 
         converted_user_id = int(user_id)
+        generation = cls._user_generations.get(converted_user_id, 0)
 
-        if await user_repository.read(converted_user_id) is None:
+        try:
+            role = UserRoles(payload["role"]) if "role" in payload else None
+        except ValueError:
             return VerificationResult(success=False)
 
-        return VerificationResult(success=True, user_id=converted_user_id)
+        if settings.auth.revocation_check or role is None:
+            role = await user_repository.read_role(converted_user_id)
+
+            if role is None:
+                return VerificationResult(success=False)
+
+        verification_result = VerificationResult(success=True, user_id=converted_user_id, role=role)
+        expires_in = payload["exp"] - time.time() if "exp" in payload else None
+        cls._verified.set(key, (generation, verification_result), ttl=expires_in)
+        return verification_result
 
     @classmethod
-    def create_access_token(cls, user_id: int) -> str:
+    def invalidate_user(cls, user_id: int) -> None:
+        """
+        Forget cached verifications of the user tokens. Call it when the user is deleted or its role changes.
+        Other workers will notice the change after `settings.auth.token_cache_ttl` seconds at most.
+        """
+        cls._user_generations[user_id] = cls._user_generations.get(user_id, 0) + 1
+
+    @classmethod
+    def create_access_token(cls, user_id: int, role: UserRoles = UserRoles.DEFAULT) -> str:
         access_token = TokenRepository._create_access_token(
-            data={"sub": str(user_id)},
+            data={"sub": str(user_id), "role": str(role)},
             expires_delta=timedelta(days=1),
         )
         return access_token
@@ -60,44 +98,54 @@ class TokenRepository:
 
 
 class AuthRepository(SQLAlchemyRepository):
-    PWD_CONTEXT = CryptContext(schemes=["bcrypt"])
-    _flows: dict[str, EmailFlow]  # email -> flow
+    FLOWS_NAMESPACE = "registration"  # email -> flow
+    password_hasher: PasswordHasher
 
     def __init__(self, *args, **kwargs):
         super().__init__(*args, **kwargs)
-        self._flows = {}
+        self.password_hasher = PasswordHasher(
+            rounds=settings.auth.bcrypt_rounds,
+            workers=settings.auth.password_workers,
+            queue_size=settings.auth.password_queue_size,
+        )
 
-    @classmethod
-    def get_password_hash(cls, password: str) -> str:
-        return cls.PWD_CONTEXT.hash(password)
+    async def get_password_hash(self, password: str) -> str:
+        return await self.password_hasher.hash(password)
 
-    async def authenticate_user(self, login: str, password: str) -> int:
+    async def authenticate_user(self, login: str, password: str) -> VerificationResult:
         user_credentials = await self._get_user(login)
         if user_credentials is None:
             raise IncorrectCredentialsException()
         password_verified = await self.verify_password(password, user_credentials.password_hash)
         if not password_verified:
             raise IncorrectCredentialsException()
-        return user_credentials.user_id
+        return VerificationResult(success=True, user_id=user_credentials.user_id, role=user_credentials.role)
 
     async def verify_password(self, plain_password: str, hashed_password: str) -> bool:
-        return self.PWD_CONTEXT.verify(plain_password, hashed_password)
+        return await self.password_hasher.verify(plain_password, hashed_password)
 
-    def start_registration(self, user: CreateUser) -> None:
+    async def start_registration(self, user: CreateUser) -> None:
         email = user.email
         code = _generate_auth_code()
-        self._flows[email] = EmailFlow(
-            user=user,
+        # keep only the hash, flows are stored outside the process
+        password_hash = await self.get_password_hash(user.password)
+        flow = EmailFlow(
+            user=CreateUserWithPasswordHash(**user.model_dump(exclude={"password"}), password_hash=password_hash),
             code=code,
         )
+        await Dependencies.get_ephemeral_storage().set(
+            self.FLOWS_NAMESPACE, email, flow.model_dump(), ttl=settings.auth.registration_code_ttl
+        )
         smtp = Dependencies.get_smtp_repository()
         message = smtp.render_message(settings.smtp.mailing_template, email, code=code)
-        smtp.send(message, email)
+        await Dependencies.get_mail_outbox_repository().enqueue(email, message)
 
     async def finish_registration(self, email: str, code: str) -> ViewUser:
-        flow = self._flows.get(email)
-        if flow is None:
+        ephemeral_storage = Dependencies.get_ephemeral_storage()
+        flow_data = await ephemeral_storage.get(self.FLOWS_NAMESPACE, email)
+        if flow_data is None:
             raise IncorrectCredentialsException()
+        flow = EmailFlow.model_validate(flow_data)
         if flow.code != code:
             raise IncorrectCredentialsException()
 
@@ -110,17 +158,19 @@ class AuthRepository(SQLAlchemyRepository):
             raise HTTPException(status_code=400, detail="User already exists")
 
         new_user = await user_repository.create(flow.user)
-        self._flows.pop(email)
+        await ephemeral_storage.pop(self.FLOWS_NAMESPACE, email)
         return new_user
 
     async def _get_user(self, login: str) -> Optional[UserCredentialsFromDB]:
-        async with self._create_session() as session:
-            q = select(User.id, User.password_hash).where(User.login == login)
+        # do not hold the request connection while the password hash is checked
+        async with self._create_session(independent=True) as session:
+            q = select(User.id, User.password_hash, User.role).where(User.login == login)
             user = (await session.execute(q)).one_or_none()
             if user:
                 return UserCredentialsFromDB(
                     user_id=user.id,
                     password_hash=user.password_hash,
+                    role=user.role,
                 )
 
 
@@ -5,6 +5,7 @@ from typing import Annotated
 from fastapi import APIRouter, HTTPException
 
 from src.api.dependencies import DEPENDS_AUTH_REPOSITORY, DEPENDS_USER_REPOSITORY, Dependencies
+from src.api.exceptions import IncorrectCredentialsException, TooManyRequestsException
 from src.modules.auth.repository import TokenRepository, AuthRepository
 from src.modules.auth.schemas import AuthResult, AuthCredentials
 from src.modules.personal_account.schemas import CreatePersonalAccountAchievement, CreatePersonalAccountBattlePasses
@@ -15,12 +16,16 @@ router = APIRouter(prefix="/auth", tags=["Auth"])
 
 
 # by-tag
-@router.post("/by-credentials", response_model=AuthResult)
+@router.post(
+    "/by-credentials",
+    response_model=AuthResult,
+    responses={**IncorrectCredentialsException.responses, **TooManyRequestsException.responses},
+)
 async def by_credentials(
     credentials: AuthCredentials, auth_repository: Annotated[AuthRepository, DEPENDS_AUTH_REPOSITORY]
 ):
-    user_id = await auth_repository.authenticate_user(password=credentials.password, login=credentials.login)
-    token = TokenRepository.create_access_token(user_id)
+    verification = await auth_repository.authenticate_user(password=credentials.password, login=credentials.login)
+    token = TokenRepository.create_access_token(verification.user_id, verification.role)
     return AuthResult(token=token, success=True)
 
 
@@ -34,7 +39,7 @@ async def start_registration(
     db_user = db_user or await user_repository.read_by_email(user.email)
     if db_user is not None:
         raise HTTPException(status_code=400, detail="User already exists")
-    auth_repository.start_registration(user)
+    await auth_repository.start_registration(user)
 
 
 @router.post("/finish-registration")
@@ -44,7 +49,7 @@ async def finish_registration(
     auth_repository: Annotated[AuthRepository, DEPENDS_AUTH_REPOSITORY],
 ):
     user = await auth_repository.finish_registration(email, code)
-    token = TokenRepository.create_access_token(user.id)
+    token = TokenRepository.create_access_token(user.id, user.role)
 
     if user.name == "":
         achievement_repository = Dependencies.get_achievement_repository()
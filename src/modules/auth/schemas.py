@@ -1,15 +1,20 @@
-__all__ = ["VerificationResult", "AuthResult", "AuthCredentials", "UserCredentialsFromDB"]
+__all__ = ["VerificationResult", "AuthResult", "AuthCredentials", "UserCredentialsFromDB", "PasswordHasherStats"]
 
 from typing import Optional
 
 from pydantic import BaseModel, Field
 
-from src.modules.user.schemas import CreateUser
+from src.modules.user.schemas import CreateUserWithPasswordHash, UserRoles
 
 
 class VerificationResult(BaseModel):
     success: bool
     user_id: Optional[int] = None
+    role: Optional[UserRoles] = None
+
+    @property
+    def is_admin(self) -> bool:
+        return self.role == UserRoles.ADMIN
 
 
 class AuthResult(BaseModel):
@@ -25,8 +30,20 @@ class AuthCredentials(BaseModel):
 class UserCredentialsFromDB(BaseModel):
     user_id: int
     password_hash: str
+    role: UserRoles = UserRoles.DEFAULT
 
 
 class EmailFlow(BaseModel):
-    user: CreateUser
+    user: CreateUserWithPasswordHash
     code: str
+
+
+class PasswordHasherStats(BaseModel):
+    workers: int = Field(..., description="Number of hashing threads")
+    queue_size: int = Field(..., description="How many operations may wait for a free thread")
+    in_flight: int = Field(..., description="Operations being hashed or waiting right now")
+    queued: int = Field(..., description="Operations waiting for a free thread right now")
+    completed: int = Field(..., description="Operations finished since startup")
+    rejected: int = Field(..., description="Operations rejected with 429 since startup")
+    average_wait: float = Field(..., description="Average time (in seconds) an operation waited for a thread")
+    average_work: float = Field(..., description="Average time (in seconds) an operation was hashing")
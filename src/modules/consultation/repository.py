@@ -3,12 +3,23 @@ __all__ = ["ConsultationRepository"]
 from typing import Optional
 
 from src.modules.consultation.schemas import ViewConsultant, CreateConsultant, CreateTimeslot, AddAppointment
+from src.storages.cache import CatalogCache, SerializedJSON
 from src.storages.sqlalchemy.repository import SQLAlchemyRepository
 from src.storages.sqlalchemy.models.consultation import Consultant, Timeslot, Appointment
 from src.storages.sqlalchemy.utils import *
 
 
 class ConsultationRepository(SQLAlchemyRepository):
+    CATALOG_TTL = 60
+    _all_json: CatalogCache[SerializedJSON]
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self._all_json = CatalogCache(ttl=self.CATALOG_TTL)
+
+    def invalidate_catalog(self) -> None:
+        self._all_json.invalidate()
+
     async def create_consultant(self, data: CreateConsultant, consultant_id: Optional[int] = None) -> ViewConsultant:
         async with self._create_session() as session:
             dct = data.model_dump()
@@ -17,6 +28,7 @@ class ConsultationRepository(SQLAlchemyRepository):
             q = insert(Consultant).values(dct).returning(Consultant)
             obj = await session.scalar(q)
             await session.commit()
+            self.invalidate_catalog()
             return ViewConsultant.model_validate(obj)
 
     async def read_all_consultants(self) -> list[ViewConsultant]:
@@ -25,6 +37,12 @@ class ConsultationRepository(SQLAlchemyRepository):
             objs = await session.scalars(q)
             return [ViewConsultant.model_validate(obj) for obj in objs]
 
+    async def get_all_json(self) -> SerializedJSON:
+        return await self._all_json.get(self._serialize_all)
+
+    async def _serialize_all(self) -> SerializedJSON:
+        return SerializedJSON.from_models(await self.read_all_consultants())
+
     async def read_consultant(self, id_: int) -> Optional[ViewConsultant]:
         async with self._create_session() as session:
             q = select(Consultant).where(Consultant.id == id_)
@@ -37,6 +55,7 @@ class ConsultationRepository(SQLAlchemyRepository):
             q = insert(Timeslot).values(**data.model_dump(), consultant_id=consultant_id).returning(Timeslot)
             obj = await session.scalar(q)
             await session.commit()
+            self.invalidate_catalog()
             return ViewConsultant.model_validate(obj)
 
     async def remove_timeslot(self, consultant_id: int, timeslot_id: int) -> ViewConsultant:
@@ -44,6 +63,7 @@ class ConsultationRepository(SQLAlchemyRepository):
             q = delete(Timeslot).where(Timeslot.id == timeslot_id)
             await session.execute(q)
             await session.commit()
+            self.invalidate_catalog()
             q = select(Consultant).where(Consultant.id == consultant_id)
             obj = await session.scalar(q)
             return ViewConsultant.model_validate(obj)
@@ -56,6 +76,7 @@ class ConsultationRepository(SQLAlchemyRepository):
                 q = insert(Timeslot).values(**timeslot.model_dump(), consultant_id=consultant_id).returning(Timeslot)
                 await session.scalar(q)
             await session.commit()
+            self.invalidate_catalog()
             q = select(Consultant).where(Consultant.id == consultant_id)
             obj = await session.scalar(q)
             return ViewConsultant.model_validate(obj)
@@ -69,4 +90,5 @@ class ConsultationRepository(SQLAlchemyRepository):
             )
             obj = await session.scalar(q)
             await session.commit()
+            self.invalidate_catalog()
             return ViewConsultant.model_validate(obj)
@@ -2,14 +2,13 @@ __all__ = ["router"]
 
 from typing import Annotated
 
-from fastapi import APIRouter
+from fastapi import APIRouter, Request, Response
 
-from src.api.dependencies import DEPENDS_VERIFIED_REQUEST, DEPENDS_CONSULTATION_REPOSITORY, DEPENDS_USER_REPOSITORY
-from src.api.exceptions import ForbiddenException
+from src.api.conditional import json_response, CONDITIONAL_RESPONSES
+from src.api.dependencies import DEPENDS_ADMIN, DEPENDS_VERIFIED_REQUEST, DEPENDS_CONSULTATION_REPOSITORY
 from src.modules.auth.schemas import VerificationResult
 from src.modules.consultation.repository import ConsultationRepository
 from src.modules.consultation.schemas import ViewConsultant, CreateConsultant, CreateTimeslot, AddAppointment
-from src.modules.user.repository import UserRepository
 
 router = APIRouter(prefix="/consultation", tags=["Consultation"])
 
@@ -17,21 +16,17 @@ router = APIRouter(prefix="/consultation", tags=["Consultation"])
 @router.post("/consultants/", status_code=201)
 async def post_consultant(
     data: CreateConsultant,
-    verification: Annotated[VerificationResult, DEPENDS_VERIFIED_REQUEST],
-    user_repository: Annotated[UserRepository, DEPENDS_USER_REPOSITORY],
+    verification: Annotated[VerificationResult, DEPENDS_ADMIN],
     consultation_repository: Annotated["ConsultationRepository", DEPENDS_CONSULTATION_REPOSITORY],
 ) -> ViewConsultant:
-    user = await user_repository.read(verification.user_id)
-    if not user.is_admin:
-        raise ForbiddenException()
     return await consultation_repository.create_consultant(data)
 
 
-@router.get("/consultants/")
+@router.get("/consultants/", response_model=list[ViewConsultant], responses=CONDITIONAL_RESPONSES)
 async def get_all_consultants(
-    consultation_repository: Annotated["ConsultationRepository", DEPENDS_CONSULTATION_REPOSITORY]
-) -> list[ViewConsultant]:
-    return await consultation_repository.read_all_consultants()
+    request: Request, consultation_repository: Annotated["ConsultationRepository", DEPENDS_CONSULTATION_REPOSITORY]
+) -> Response:
+    return json_response(request, await consultation_repository.get_all_json())
 
 
 @router.get("/consultants/{consultant_id}")
@@ -45,13 +40,9 @@ async def get_consultant(
 async def add_timeslot(
     consultant_id: int,
     data: CreateTimeslot,
-    verification: Annotated[VerificationResult, DEPENDS_VERIFIED_REQUEST],
-    user_repository: Annotated[UserRepository, DEPENDS_USER_REPOSITORY],
+    verification: Annotated[VerificationResult, DEPENDS_ADMIN],
     consultation_repository: Annotated["ConsultationRepository", DEPENDS_CONSULTATION_REPOSITORY],
 ) -> ViewConsultant:
-    user = await user_repository.read(verification.user_id)
-    if not user.is_admin:
-        raise ForbiddenException()
     return await consultation_repository.add_timeslot(consultant_id, data)
 
 
@@ -59,13 +50,9 @@ async def add_timeslot(
 async def remove_timeslot(
     consultant_id: int,
     timeslot_id: int,
-    verification: Annotated[VerificationResult, DEPENDS_VERIFIED_REQUEST],
-    user_repository: Annotated[UserRepository, DEPENDS_USER_REPOSITORY],
+    verification: Annotated[VerificationResult, DEPENDS_ADMIN],
     consultation_repository: Annotated["ConsultationRepository", DEPENDS_CONSULTATION_REPOSITORY],
 ) -> ViewConsultant:
-    user = await user_repository.read(verification.user_id)
-    if not user.is_admin:
-        raise ForbiddenException()
     return await consultation_repository.remove_timeslot(consultant_id, timeslot_id)
 
 
@@ -1,35 +1,117 @@
-__all__ = ["LessonRepository"]
+__all__ = ["LessonRepository", "GradingRepository", "LessonCatalog"]
 
 from typing import Optional
 
-from src.modules.lesson.schemas import ViewLesson, CreateLesson, CreateTask, ViewTask, UpdateLesson, UpdateTask
-from src.storages.sqlalchemy.models import UserTaskAnswer
+from src.api.dependencies import Dependencies
+from src.modules.lesson.schemas import (
+    ViewLesson,
+    CreateLesson,
+    CreateTask,
+    ViewTask,
+    ViewTaskWithAnswers,
+    TaskAnswerKey,
+    UpdateLesson,
+    UpdateTask,
+    TaskSubmissionResult,
+    LessonProgress,
+)
+from src.storages.cache import CatalogCache, SerializedJSON
 from src.storages.sqlalchemy.repository import SQLAlchemyRepository
+from src.storages.sqlalchemy.unit_of_work import run_after_commit
 from src.storages.sqlalchemy.models.lesson import Lesson, Task, TaskAssociation, TaskReward
 from src.storages.sqlalchemy.utils import *
 
 
+class LessonCatalog:
+    """
+    Snapshot of all lessons and tasks: validated schemas and their JSON responses, serialized once.
+    Answer keys are kept apart from the public views and are used only for grading.
+    """
+
+    lessons: dict[int, ViewLesson]
+    lesson_ids_by_alias: dict[str, int]
+    tasks: dict[int, ViewTask]
+    task_ids_by_alias: dict[str, int]
+    answer_keys: dict[int, TaskAnswerKey]
+
+    all_lessons_json: SerializedJSON
+    lesson_json: dict[int, SerializedJSON]
+    lesson_tasks_json: dict[int, SerializedJSON]
+    task_json: dict[int, SerializedJSON]
+
+    def __init__(self, lessons: list[ViewLesson], tasks: list[ViewTask], answer_keys: list[TaskAnswerKey]):
+        self.lessons = {lesson.id: lesson for lesson in lessons}
+        self.lesson_ids_by_alias = {lesson.alias: lesson.id for lesson in lessons}
+        self.tasks = {task.id: task for task in tasks}
+        self.task_ids_by_alias = {task.alias: task.id for task in tasks}
+        self.answer_keys = {answer_key.id: answer_key for answer_key in answer_keys}
+
+        self.task_json = {task.id: SerializedJSON.from_model(task) for task in tasks}
+        self.lesson_json = {lesson.id: SerializedJSON.from_model(lesson) for lesson in lessons}
+        self.all_lessons_json = SerializedJSON.from_parts(payload.content for payload in self.lesson_json.values())
+        self.lesson_tasks_json = {
+            lesson.id: SerializedJSON.from_parts(self.task_json[task.id].content for task in lesson.tasks)
+            for lesson in lessons
+        }
+
+    def lesson_by_alias(self, alias: str) -> Optional[ViewLesson]:
+        id_ = self.lesson_ids_by_alias.get(alias)
+        return None if id_ is None else self.lessons[id_]
+
+    def lesson_json_by_alias(self, alias: str) -> Optional[SerializedJSON]:
+        id_ = self.lesson_ids_by_alias.get(alias)
+        return None if id_ is None else self.lesson_json[id_]
+
+    def task_by_alias(self, alias: str) -> Optional[ViewTask]:
+        id_ = self.task_ids_by_alias.get(alias)
+        return None if id_ is None else self.tasks[id_]
+
+    def task_json_by_alias(self, alias: str) -> Optional[SerializedJSON]:
+        id_ = self.task_ids_by_alias.get(alias)
+        return None if id_ is None else self.task_json[id_]
+
+
 class LessonRepository(SQLAlchemyRepository):
+    # Lessons and tasks change only when admins edit them, so reads are served from an in-process catalog.
+    # Writes made through this repository drop it at once, writes made by other workers are noticed
+    # after CATALOG_TTL seconds at most.
+    CATALOG_TTL = 60
+    _catalog: CatalogCache[LessonCatalog]
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self._catalog = CatalogCache(ttl=self.CATALOG_TTL)
+
+    # ----------------- Catalog -----------------
+    async def get_catalog(self) -> LessonCatalog:
+        return await self._catalog.get(self._load_catalog)
+
+    def invalidate_catalog(self) -> None:
+        self._catalog.invalidate()
+
+    async def _load_catalog(self) -> LessonCatalog:
+        async with self._create_session() as session:
+            lessons = await session.scalars(select(Lesson).order_by(Lesson.id))
+            lessons = [ViewLesson.model_validate(obj) for obj in lessons]
+            objs = (await session.scalars(select(Task).order_by(Task.id))).all()
+            tasks = [ViewTask.model_validate(obj) for obj in objs]
+            answer_keys = [TaskAnswerKey.model_validate(obj) for obj in objs]
+        return LessonCatalog(lessons, tasks, answer_keys)
+
     # ----------------- Test -----------------
     async def create_lesson(self, data: CreateLesson) -> ViewLesson:
         async with self._create_session() as session:
             q = insert(Lesson).values(data.model_dump()).returning(Lesson)
             obj = await session.scalar(q)
             await session.commit()
+            self.invalidate_catalog()
             return ViewLesson.model_validate(obj)
 
     async def read_all_lessons(self) -> list[ViewLesson]:
-        async with self._create_session() as session:
-            q = select(Lesson)
-            objs = await session.scalars(q)
-            return [ViewLesson.model_validate(obj) for obj in objs]
+        return list((await self.get_catalog()).lessons.values())
 
     async def read_lesson(self, id_: int) -> Optional[ViewLesson]:
-        async with self._create_session() as session:
-            q = select(Lesson).where(Lesson.id == id_)
-            obj = await session.scalar(q)
-            if obj:
-                return ViewLesson.model_validate(obj)
+        return (await self.get_catalog()).lessons.get(id_)
 
     async def update_lesson(self, id_: int, data: UpdateLesson) -> ViewLesson:
         async with self._create_session() as session:
@@ -41,6 +123,7 @@ class LessonRepository(SQLAlchemyRepository):
             )
             obj = await session.scalar(q)
             await session.commit()
+            self.invalidate_catalog()
             return ViewLesson.model_validate(obj)
 
     async def upsert_lesson(self, data: CreateLesson) -> ViewLesson:
@@ -60,6 +143,7 @@ class LessonRepository(SQLAlchemyRepository):
                 q = insert(Lesson).values(data.model_dump()).returning(Lesson)
                 obj = await session.scalar(q)
             await session.commit()
+            self.invalidate_catalog()
             return ViewLesson.model_validate(obj)
 
     async def set_tasks_for_lesson(self, test_id: int, task_ids: list[int]) -> None:
@@ -70,6 +154,7 @@ class LessonRepository(SQLAlchemyRepository):
                 q = insert(TaskAssociation).values(test_id=test_id, task_id=task_id, order=i)
                 await session.execute(q)
             await session.commit()
+            self.invalidate_catalog()
 
     async def set_tasks_for_lesson_by_aliases(self, lesson_alias: str, task_aliases: list[str]) -> None:
         async with self._create_session() as session:
@@ -87,61 +172,76 @@ class LessonRepository(SQLAlchemyRepository):
                 q = insert(TaskAssociation).values(test_id=lesson.id, task_id=task.id, order=i)
                 await session.execute(q)
             await session.commit()
+            self.invalidate_catalog()
 
-    async def get_all_tasks_for_lesson(self, lesson_id: int) -> list[ViewTask]:
+    async def get_progress(self, user_id: int) -> list[LessonProgress]:
+        """
+        Count total and solved tasks of every lesson and evaluate its availability condition for the user
+        """
         async with self._create_session() as session:
-            q = (
-                select(Task)
-                .join(TaskAssociation, TaskAssociation.task_id == Task.id)
-                .where(TaskAssociation.test_id == lesson_id)
-                .order_by(TaskAssociation.order)
+            q = text(
+                """
+                SELECT
+                    lessons.id AS lesson_id,
+                    CASE lessons.condition_type
+                        WHEN 'min_level' THEN
+                            COALESCE(personal_account.total_exp, 0) / 100 >= COALESCE(lessons.min_level, 0)
+                        WHEN 'reward' THEN EXISTS (
+                            SELECT 1 FROM personal_account_rewards
+                            WHERE personal_account_rewards.personal_account_id = :user_id
+                                AND personal_account_rewards.reward_id = lessons.reward_id
+                        )
+                        WHEN 'battlepass' THEN EXISTS (
+                            SELECT 1 FROM personal_account_battle_passes
+                            WHERE personal_account_battle_passes.personal_account_id = :user_id
+                                AND personal_account_battle_passes.battle_pass_id = lessons.battlepass_id
+                        )
+                        ELSE TRUE
+                    END AS is_available,
+                    COUNT(task_association.task_id) AS total_tasks,
+                    COUNT(solved.task_id) AS solved_tasks
+                FROM lessons
+                LEFT JOIN personal_account ON personal_account.user_id = :user_id
+                LEFT JOIN task_association ON task_association.test_id = lessons.id
+                LEFT JOIN (
+                    SELECT DISTINCT task_id FROM user_task_answers WHERE user_id = :user_id AND is_correct
+                ) AS solved ON solved.task_id = task_association.task_id
+                GROUP BY lessons.id, personal_account.total_exp
+                ORDER BY lessons.id
+                """
             )
-            objs = await session.scalars(q)
-            return [ViewTask.model_validate(obj) for obj in objs]
-
-    async def get_solved_tasks_for_lesson(self, user_id: int, lesson_id: int) -> list[ViewTask]:
-        async with self._create_session() as session:
-            q = (
-                select(Task)
-                .join(TaskAssociation, TaskAssociation.task_id == Task.id)
-                .join(UserTaskAnswer, UserTaskAnswer.task_id == Task.id)
-                .where(UserTaskAnswer.user_id == user_id)
-                .where(TaskAssociation.test_id == lesson_id)
-                .where(UserTaskAnswer.is_correct)
-                .order_by(TaskAssociation.order)
-            )
-            objs = await session.scalars(q)
-            return [ViewTask.model_validate(obj) for obj in objs]
+            rows = await session.execute(q, {"user_id": user_id})
+            return [LessonProgress.model_validate(row) for row in rows]
 
     # ----------------- Task -----------------
-    async def create_task(self, data: CreateTask) -> ViewTask:
+    async def create_task(self, data: CreateTask) -> ViewTaskWithAnswers:
         async with self._create_session() as session:
             q = insert(Task).values(data.model_dump()).returning(Task)
             obj = await session.scalar(q)
             await session.commit()
-            return ViewTask.model_validate(obj)
+            self.invalidate_catalog()
+            return ViewTaskWithAnswers.model_validate(obj)
 
     async def read_all_tasks(self) -> list[ViewTask]:
-        async with self._create_session() as session:
-            q = select(Task)
-            objs = await session.scalars(q)
-            return [ViewTask.model_validate(obj) for obj in objs]
+        return list((await self.get_catalog()).tasks.values())
 
     async def read_task(self, id_: int) -> Optional[ViewTask]:
-        async with self._create_session() as session:
-            q = select(Task).where(Task.id == id_)
-            obj = await session.scalar(q)
-            if obj:
-                return ViewTask.model_validate(obj)
+        return (await self.get_catalog()).tasks.get(id_)
 
     async def read_task_by_alias(self, alias: str) -> Optional[ViewTask]:
+        return (await self.get_catalog()).task_by_alias(alias)
+
+    async def read_answer_key(self, id_: int) -> Optional[TaskAnswerKey]:
+        return (await self.get_catalog()).answer_keys.get(id_)
+
+    async def read_task_with_answers(self, id_: int) -> Optional[ViewTaskWithAnswers]:
         async with self._create_session() as session:
-            q = select(Task).where(Task.alias == alias)
+            q = select(Task).where(Task.id == id_)
             obj = await session.scalar(q)
             if obj:
-                return ViewTask.model_validate(obj)
+                return ViewTaskWithAnswers.model_validate(obj)
 
-    async def update_task(self, id_: int, data: UpdateTask) -> ViewTask:
+    async def update_task(self, id_: int, data: UpdateTask) -> ViewTaskWithAnswers:
         async with self._create_session() as session:
             q = (
                 update(Task)
@@ -151,9 +251,10 @@ class LessonRepository(SQLAlchemyRepository):
             )
             obj = await session.scalar(q)
             await session.commit()
-            return ViewTask.model_validate(obj)
+            self.invalidate_catalog()
+            return ViewTaskWithAnswers.model_validate(obj)
 
-    async def upsert_task(self, data: CreateTask) -> ViewTask:
+    async def upsert_task(self, data: CreateTask) -> ViewTaskWithAnswers:
         async with self._create_session() as session:
             # alias
             q = select(Task).where(Task.alias == data.alias)
@@ -170,7 +271,8 @@ class LessonRepository(SQLAlchemyRepository):
                 q = insert(Task).values(data.model_dump(exclude_none=True, exclude_unset=True)).returning(Task)
                 obj = await session.scalar(q)
             await session.commit()
-            return ViewTask.model_validate(obj)
+            self.invalidate_catalog()
+            return ViewTaskWithAnswers.model_validate(obj)
 
     async def set_rewards_for_task(self, task_id: int, rewards: list[tuple[int, int]]):
         async with self._create_session() as session:
@@ -180,6 +282,7 @@ class LessonRepository(SQLAlchemyRepository):
                 q = insert(TaskReward).values(task_id=task_id, reward_id=reward_id, count=count)
                 await session.execute(q)
             await session.commit()
+            self.invalidate_catalog()
 
     async def set_rewards_for_task_by_aliases(self, alias: str, rewards: list[tuple[int, int]]):
         async with self._create_session() as session:
@@ -193,24 +296,97 @@ class LessonRepository(SQLAlchemyRepository):
                 q = insert(TaskReward).values(task_id=task.id, reward_id=reward_id, count=count)
                 await session.execute(q)
             await session.commit()
+            self.invalidate_catalog()
 
-    async def read_lesson_by_alias(self, alias: str) -> ViewLesson:
-        async with self._create_session() as session:
-            q = select(Lesson).where(Lesson.alias == alias)
-            obj = await session.scalar(q)
-            if obj:
-                return ViewLesson.model_validate(obj)
+    async def read_lesson_by_alias(self, alias: str) -> Optional[ViewLesson]:
+        return (await self.get_catalog()).lesson_by_alias(alias)
+
+
+class GradingRepository(SQLAlchemyRepository):
+    """
+    Records task submissions and grants their rewards in a single transaction
+    """
+
+    LOCK_QUERY = text("SELECT pg_advisory_xact_lock(:user_id, :task_id)")
+    # All data-modifying CTEs are executed exactly once, even if not referenced in the main query
+    SUBMIT_QUERY = text(
+        """
+        WITH solved AS (
+            SELECT EXISTS (
+                SELECT 1 FROM user_task_answers
+                WHERE user_id = :user_id AND task_id = :task_id AND is_correct
+            ) AS already
+        ),
+        answer AS (
+            INSERT INTO user_task_answers (user_id, lesson_id, task_id, is_correct)
+            VALUES (:user_id, :lesson_id, :task_id, CAST(:is_correct AS BOOLEAN))
+            RETURNING id
+        ),
+        award AS (
+            SELECT CAST(:is_correct AS BOOLEAN) AND NOT already AS granted FROM solved
+        ),
+        account AS (
+            UPDATE personal_account SET total_exp = total_exp + :exp
+            WHERE user_id = :user_id AND (SELECT granted FROM award)
+            RETURNING total_exp
+        ),
+        battle_passes AS (
+            UPDATE personal_account_battle_passes AS pabp SET experience = pabp.experience + :exp
+            FROM battle_pass
+            WHERE battle_pass.id = pabp.battle_pass_id
+                AND battle_pass.is_active
+                AND pabp.personal_account_id = :user_id
+                AND (SELECT granted FROM award)
+            RETURNING pabp.battle_pass_id, pabp.experience
+        ),
+        granted_rewards AS (
+            INSERT INTO personal_account_rewards (personal_account_id, reward_id, count)
+            SELECT :user_id, r.reward_id, SUM(r.count)
+            FROM unnest(CAST(:reward_ids AS INTEGER[]), CAST(:reward_counts AS INTEGER[])) AS r(reward_id, count)
+            WHERE (SELECT granted FROM award)
+            GROUP BY r.reward_id
+            ON CONFLICT (personal_account_id, reward_id)
+                DO UPDATE SET count = COALESCE(personal_account_rewards.count, 0) + excluded.count
+            RETURNING reward_id
+        )
+        SELECT
+            solved.already AS already_solved,
+            award.granted AS granted,
+            (SELECT total_exp FROM account) AS total_exp,
+            ARRAY(SELECT ARRAY[battle_pass_id, experience] FROM battle_passes) AS battle_pass_experience
+        FROM solved, award
+        """
+    )
 
-    async def is_solved_task(self, user_id: int, task_id) -> bool:
+    async def submit(self, user_id: int, lesson_id: int, task: TaskAnswerKey, is_correct: bool) -> TaskSubmissionResult:
+        """
+        Save the answer and, if it is the first correct one, add task exp to the personal account and active battle
+        passes and grant task rewards and rewards of battle pass levels reached. Concurrent submissions of the same
+        task by the same user are serialized with a transaction-level advisory lock, so rewards can not be granted twice.
+        """
+        rewards = [(association.reward.id, association.count) for association in task.rewards_associations]
+        battle_pass_repository = Dependencies.get_battle_pass_repository()
+        levels = await battle_pass_repository.get_levels()
         async with self._create_session() as session:
-            q = select(UserTaskAnswer).where(
-                and_(
-                    UserTaskAnswer.user_id == user_id,
-                    UserTaskAnswer.task_id == task_id,
-                    UserTaskAnswer.is_correct,
-                )
+            await session.execute(self.LOCK_QUERY, {"user_id": user_id, "task_id": task.id})
+            result = await session.execute(
+                self.SUBMIT_QUERY,
+                {
+                    "user_id": user_id,
+                    "lesson_id": lesson_id,
+                    "task_id": task.id,
+                    "is_correct": is_correct,
+                    "exp": task.exp or 0,
+                    "reward_ids": [reward_id for reward_id, _ in rewards],
+                    "reward_counts": [count for _, count in rewards],
+                },
             )
-            obj = await session.scalar(q)
-            if obj:
-                return True
-            return False
+            row = result.one()
+            gained = await battle_pass_repository.level_up(
+                session, user_id, task.exp or 0, row.battle_pass_experience, levels
+            )
+            await session.commit()
+            if row.granted:
+                accounts = Dependencies.get_personal_account_repository()
+                run_after_commit(lambda: accounts.on_exp_changed(user_id, row.total_exp))
+            return TaskSubmissionResult(already_solved=row.already_solved, granted=row.granted, levels=gained)
@@ -1,54 +1,56 @@
 __all__ = ["router"]
 
-from typing import Annotated
+from typing import Annotated, Optional
 
-from fastapi import APIRouter
+from fastapi import APIRouter, Request, Response
 from pydantic import BaseModel, Field
 
+from src.api.conditional import json_response, CONDITIONAL_RESPONSES
 from src.api.dependencies import (
+    DEPENDS_ADMIN,
     DEPENDS_LESSON_REPOSITORY,
+    DEPENDS_GRADING_REPOSITORY,
     DEPENDS_VERIFIED_REQUEST,
-    DEPENDS_USER_REPOSITORY,
-    DEPENDS_REWARD_REPOSITORY,
-    DEPENDS_PERSONAL_ACCOUNT_REPOSITORY,
-    DEPENDS_BATTLE_PASS_REPOSITORY,
 )
-from src.api.exceptions import ObjectNotFound, ForbiddenException
+from src.api.exceptions import ObjectNotFound
 from src.modules.auth.schemas import VerificationResult
-from src.modules.lesson.repository import LessonRepository
+from src.modules.lesson.repository import LessonRepository, GradingRepository
 from src.modules.lesson.schemas import (
     ViewLesson,
     CreateLesson,
     TaskAnswer,
     ViewTask,
+    ViewTaskWithAnswers,
     CreateTask,
     UpdateLesson,
     UpdateTask,
+    LessonProgress,
 )
-from src.modules.personal_account.repository import RewardRepository, PersonalAccountRepository, BattlePassRepository
-from src.modules.user.repository import UserRepository
-from src.storages.sqlalchemy.models.lesson import ConditionType
+from src.modules.personal_account.schemas import ViewLevelUp
+from src.storages.cache import SerializedJSON
 
 router = APIRouter(prefix="/lessons", tags=["Lesson"])
 
+_EMPTY_LIST = SerializedJSON(b"[]")
+_CATALOG_RESPONSES = {**CONDITIONAL_RESPONSES, **ObjectNotFound.responses}
+
 
 class TaskSolveResult(BaseModel):
     success: bool
     rewards: list[int] = Field(default_factory=list)
     exp: int = 0
+    explanation: Optional[str] = Field(None, description="Explanation of the answer, revealed after submission")
+    levels: list[ViewLevelUp] = Field(default_factory=list, description="Battle pass levels reached with the exp")
 
 
 @router.post("/solve")
 async def solve(
     answer: TaskAnswer,
     verification: Annotated[VerificationResult, DEPENDS_VERIFIED_REQUEST],
-    user_repository: Annotated[UserRepository, DEPENDS_USER_REPOSITORY],
-    personal_account: Annotated[PersonalAccountRepository, DEPENDS_PERSONAL_ACCOUNT_REPOSITORY],
-    reward_repository: Annotated[RewardRepository, DEPENDS_REWARD_REPOSITORY],
     lesson_repository: Annotated[LessonRepository, DEPENDS_LESSON_REPOSITORY],
-    battle_pass_repository: Annotated[BattlePassRepository, DEPENDS_BATTLE_PASS_REPOSITORY],
+    grading_repository: Annotated[GradingRepository, DEPENDS_GRADING_REPOSITORY],
 ) -> TaskSolveResult:
-    task = await lesson_repository.read_task(answer.task_id)
+    task = await lesson_repository.read_answer_key(answer.task_id)
 
     if task is None:
         raise ObjectNotFound()
@@ -59,154 +61,93 @@ async def solve(
     else:
         success = task.check_answer(answer.choices)
 
-    # check for any correct submissions
-    solved_already = await lesson_repository.is_solved_task(verification.user_id, answer.task_id)
-
-    await user_repository.submit_answer_for_task(
-        user_id=verification.user_id, lesson_id=answer.lesson_id, task_id=answer.task_id, is_correct=success
+    submission = await grading_repository.submit(
+        user_id=verification.user_id, lesson_id=answer.lesson_id, task=task, is_correct=success
     )
 
-    if solved_already:
-        return TaskSolveResult(success=True)
-
-    if success:
-        if task.rewards_associations:
-            await reward_repository.add_rewards_to_personal_account(
-                verification.user_id, [(r.reward.id, r.count) for r in task.rewards_associations]
-            )
-        await personal_account.increase_exp(verification.user_id, task.exp)
-        await battle_pass_repository.increase_battle_exp(verification.user_id, task.exp)
-        return TaskSolveResult(success=success, rewards=[r.reward.id for r in task.rewards_associations], exp=task.exp)
-    return TaskSolveResult(success=success)
-
+    if submission.already_solved:
+        return TaskSolveResult(success=True, explanation=task.explanation)
 
-class LessonProgress(BaseModel):
-    lesson_id: int
-    is_available: bool = False
-    solved_tasks: int
-    total_tasks: int
+    if submission.granted:
+        return TaskSolveResult(
+            success=success,
+            rewards=[r.reward.id for r in task.rewards_associations],
+            exp=task.exp,
+            explanation=task.explanation,
+            levels=submission.levels,
+        )
+    return TaskSolveResult(success=success, explanation=task.explanation)
 
 
 @router.get("/my-progress")
 async def get_my_progress(
     verification: Annotated[VerificationResult, DEPENDS_VERIFIED_REQUEST],
-    user_repository: Annotated[UserRepository, DEPENDS_USER_REPOSITORY],
     lessons_repository: Annotated[LessonRepository, DEPENDS_LESSON_REPOSITORY],
-    personal_account_repository: Annotated[PersonalAccountRepository, DEPENDS_PERSONAL_ACCOUNT_REPOSITORY],
 ) -> list[LessonProgress]:
-    user = await user_repository.read(verification.user_id)
-    if user is None:
-        raise ObjectNotFound()
-
-    personal_account = await personal_account_repository.read(verification)
-    level = personal_account.total_exp / 100
-    lessons = await lessons_repository.read_all_lessons()
-
-    result = []
-    for lesson in lessons:
-        if lesson.condition_type == ConditionType.nothing:
-            available = True
-        elif lesson.condition_type == ConditionType.min_level:
-            available = level >= lesson.condition_value
-        else:
-            # TODO: Checks for rewards and battlepass
-            available = False
-        all_tasks = len(await lessons_repository.get_all_tasks_for_lesson(lesson.id))
-        solved_tasks = len(await lessons_repository.get_solved_tasks_for_lesson(user.user_id, lesson.id))
-        result.append(
-            LessonProgress(
-                lesson_id=lesson.id,
-                is_available=available,
-                solved_tasks=solved_tasks,
-                total_tasks=all_tasks,
-            )
-        )
-
-    return result
+    return await lessons_repository.get_progress(verification.user_id)
 
 
 # ----------------- Lesson -----------------
 @router.post("/", status_code=201)
 async def post_lesson(
     data: CreateLesson,
-    verification: Annotated[VerificationResult, DEPENDS_VERIFIED_REQUEST],
-    user_repository: Annotated[UserRepository, DEPENDS_USER_REPOSITORY],
+    verification: Annotated[VerificationResult, DEPENDS_ADMIN],
     lesson_repository: Annotated[LessonRepository, DEPENDS_LESSON_REPOSITORY],
 ) -> ViewLesson:
-    user = await user_repository.read(verification.user_id)
-    if not user.is_admin:
-        raise ForbiddenException()
-
     obj = await lesson_repository.create_lesson(data)
     return obj
 
 
-@router.get("/", response_model=list[ViewLesson])
+@router.get("/", response_model=list[ViewLesson], responses=CONDITIONAL_RESPONSES)
 async def get_all_lessons(
-    lesson_repository: Annotated[LessonRepository, DEPENDS_LESSON_REPOSITORY]
-) -> list[ViewLesson]:
-    return await lesson_repository.read_all_lessons()
+    request: Request, lesson_repository: Annotated[LessonRepository, DEPENDS_LESSON_REPOSITORY]
+) -> Response:
+    catalog = await lesson_repository.get_catalog()
+    return json_response(request, catalog.all_lessons_json)
 
 
-@router.get("/by-alias/{alias}")
+@router.get("/by-alias/{alias}", response_model=ViewLesson, responses=_CATALOG_RESPONSES)
 async def get_one_lesson_by_alias(
-    alias: str, lesson_repository: Annotated[LessonRepository, DEPENDS_LESSON_REPOSITORY]
-) -> ViewLesson:
-    obj = await lesson_repository.read_lesson_by_alias(alias)
-
-    if obj is None:
-        raise ObjectNotFound()
-
-    return obj
+    request: Request, alias: str, lesson_repository: Annotated[LessonRepository, DEPENDS_LESSON_REPOSITORY]
+) -> Response:
+    catalog = await lesson_repository.get_catalog()
+    return json_response(request, catalog.lesson_json_by_alias(alias))
 
 
-@router.get("/{lesson_id}")
+@router.get("/{lesson_id}", response_model=ViewLesson, responses=_CATALOG_RESPONSES)
 async def get_one_lesson(
-    lesson_id: int, lesson_repository: Annotated[LessonRepository, DEPENDS_LESSON_REPOSITORY]
-) -> ViewLesson:
-    obj = await lesson_repository.read_lesson(lesson_id)
-
-    if obj is None:
-        raise ObjectNotFound()
-
-    return obj
+    request: Request, lesson_id: int, lesson_repository: Annotated[LessonRepository, DEPENDS_LESSON_REPOSITORY]
+) -> Response:
+    catalog = await lesson_repository.get_catalog()
+    return json_response(request, catalog.lesson_json.get(lesson_id))
 
 
 @router.put("/{lesson_id}", status_code=201)
 async def put_lesson(
     lesson_id: int,
     data: UpdateLesson,
-    verification: Annotated[VerificationResult, DEPENDS_VERIFIED_REQUEST],
-    user_repository: Annotated[UserRepository, DEPENDS_USER_REPOSITORY],
+    verification: Annotated[VerificationResult, DEPENDS_ADMIN],
     lesson_repository: Annotated[LessonRepository, DEPENDS_LESSON_REPOSITORY],
 ) -> ViewLesson:
-    user = await user_repository.read(verification.user_id)
-    if not user.is_admin:
-        raise ForbiddenException()
-
     obj = await lesson_repository.update_lesson(lesson_id, data)
     return obj
 
 
-@router.get("/{lesson_id}/tasks")
+@router.get("/{lesson_id}/tasks", response_model=list[ViewTask], responses=CONDITIONAL_RESPONSES)
 async def get_tasks_for_lesson(
-    lesson_id: int, lesson_repository: Annotated[LessonRepository, DEPENDS_LESSON_REPOSITORY]
-) -> list[ViewTask]:
-    return await lesson_repository.get_all_tasks_for_lesson(lesson_id)
+    request: Request, lesson_id: int, lesson_repository: Annotated[LessonRepository, DEPENDS_LESSON_REPOSITORY]
+) -> Response:
+    catalog = await lesson_repository.get_catalog()
+    return json_response(request, catalog.lesson_tasks_json.get(lesson_id, _EMPTY_LIST))
 
 
 @router.put("/{lesson_id}/tasks", status_code=201)
 async def put_tasks_for_lesson(
     lesson_id: int,
     task_ids: list[int],
-    verification: Annotated[VerificationResult, DEPENDS_VERIFIED_REQUEST],
-    user_repository: Annotated[UserRepository, DEPENDS_USER_REPOSITORY],
+    verification: Annotated[VerificationResult, DEPENDS_ADMIN],
     lesson_repository: Annotated[LessonRepository, DEPENDS_LESSON_REPOSITORY],
 ) -> None:
-    user = await user_repository.read(verification.user_id)
-    if not user.is_admin:
-        raise ForbiddenException()
-
     await lesson_repository.set_tasks_for_lesson(lesson_id, task_ids)
 
 
@@ -216,45 +157,36 @@ async def put_tasks_for_lesson(
 @router.post("/tasks/", status_code=201)
 async def post_task(
     data: CreateTask,
-    verification: Annotated[VerificationResult, DEPENDS_VERIFIED_REQUEST],
-    user_repository: Annotated[UserRepository, DEPENDS_USER_REPOSITORY],
+    verification: Annotated[VerificationResult, DEPENDS_ADMIN],
     lesson_repository: Annotated[LessonRepository, DEPENDS_LESSON_REPOSITORY],
-) -> ViewTask:
-    user = await user_repository.read(verification.user_id)
-
-    if not user.is_admin:
-        raise ForbiddenException()
-
+) -> ViewTaskWithAnswers:
     obj = await lesson_repository.create_task(data)
     return obj
 
 
-@router.get("/tasks/by-alias/{alias}")
+@router.get("/tasks/by-alias/{alias}", response_model=ViewTask, responses=_CATALOG_RESPONSES)
 async def get_one_task_by_alias(
-    alias: str, lesson_repository: Annotated[LessonRepository, DEPENDS_LESSON_REPOSITORY]
-) -> ViewTask:
-    return await lesson_repository.read_task_by_alias(alias)
+    request: Request, alias: str, lesson_repository: Annotated[LessonRepository, DEPENDS_LESSON_REPOSITORY]
+) -> Response:
+    catalog = await lesson_repository.get_catalog()
+    return json_response(request, catalog.task_json_by_alias(alias))
 
 
-@router.get("/tasks/{task_id}")
+@router.get("/tasks/{task_id}", response_model=ViewTask, responses=_CATALOG_RESPONSES)
 async def get_one_task(
-    task_id: int, lesson_repository: Annotated[LessonRepository, DEPENDS_LESSON_REPOSITORY]
-) -> ViewTask:
-    return await lesson_repository.read_task(task_id)
+    request: Request, task_id: int, lesson_repository: Annotated[LessonRepository, DEPENDS_LESSON_REPOSITORY]
+) -> Response:
+    catalog = await lesson_repository.get_catalog()
+    return json_response(request, catalog.task_json.get(task_id))
 
 
 @router.put("/tasks/{task_id}", status_code=201)
 async def put_task(
     task_id: int,
     data: UpdateTask,
-    verification: Annotated[VerificationResult, DEPENDS_VERIFIED_REQUEST],
-    user_repository: Annotated[UserRepository, DEPENDS_USER_REPOSITORY],
+    verification: Annotated[VerificationResult, DEPENDS_ADMIN],
     lesson_repository: Annotated[LessonRepository, DEPENDS_LESSON_REPOSITORY],
-) -> ViewTask:
-    user = await user_repository.read(verification.user_id)
-    if not user.is_admin:
-        raise ForbiddenException()
-
+) -> ViewTaskWithAnswers:
     obj = await lesson_repository.update_task(task_id, data)
     return obj
 
@@ -268,12 +200,8 @@ class RewardEntry(BaseModel):
 async def put_task_rewards(
     task_id: int,
     rewards: list[RewardEntry],
-    verification: Annotated[VerificationResult, DEPENDS_VERIFIED_REQUEST],
-    user_repository: Annotated[UserRepository, DEPENDS_USER_REPOSITORY],
+    verification: Annotated[VerificationResult, DEPENDS_ADMIN],
     lesson_repository: Annotated[LessonRepository, DEPENDS_LESSON_REPOSITORY],
-) -> ViewTask:
-    user = await user_repository.read(verification.user_id)
-    if not user.is_admin:
-        raise ForbiddenException()
+) -> ViewTaskWithAnswers:
     await lesson_repository.set_rewards_for_task(task_id, [(r.reward_id, r.count) for r in rewards])
-    return await lesson_repository.read_task(task_id)
+    return await lesson_repository.read_task_with_answers(task_id)
@@ -1,8 +1,9 @@
+import unicodedata
 from typing import Optional
 
-from pydantic import BaseModel, ConfigDict, Field
+from pydantic import BaseModel, ConfigDict, Field, PrivateAttr
 
-from src.modules.personal_account.schemas import ViewReward
+from src.modules.personal_account.schemas import ViewReward, ViewLevelUp
 from src.storages.sqlalchemy.models.lesson import StepType, ConditionType
 
 
@@ -17,6 +18,10 @@ class TaskAnswer(BaseModel):
 
 
 class ViewTask(BaseModel):
+    """
+    Public view of a task, without the answer key
+    """
+
     model_config = ConfigDict(from_attributes=True)
 
     id: int = Field(..., description="ID of the task")
@@ -26,25 +31,59 @@ class ViewTask(BaseModel):
     type: "StepType" = Field(..., description="Type of the task, need for rendering and validation")
 
     choices: Optional[list[str]] = Field(default=None, description="Choices for multichoice, radio, instant tasks")
+    exp: Optional[int] = Field(default=0, description="Reward for the task (in xp points)")
+    rewards_associations: Optional[list["RewardAssociation"]] = Field(default_factory=list)
+
+
+class ViewTaskWithAnswers(ViewTask):
+    """
+    Task with its answer key, for admins
+    """
+
     correct_choices: Optional[list[int]] = Field(
         default=None, description="Correct choices for multichoice, instant, radio tasks"
     )
     input_answers: Optional[list[str]] = Field(default=None, description="Answer for input task (synonyms)")
-    exp: Optional[int] = Field(default=0, description="Reward for the task (in xp points)")
     explanation: Optional[str] = Field(default=None, description="Explanation of the answer for the task")
+
+
+def normalize_answer(answer: str) -> str:
+    """Unicode NFKC, case-insensitive, with runs of whitespace collapsed to a single space"""
+    return " ".join(unicodedata.normalize("NFKC", answer).casefold().split())
+
+
+class TaskAnswerKey(BaseModel):
+    """
+    Grading projection of a task, never sent to clients.
+    Answers are compiled into hash sets once, so checking is O(1) and ignores the order of choices.
+    """
+
+    model_config = ConfigDict(from_attributes=True)
+
+    id: int = Field(..., description="ID of the task")
+    type: "StepType" = Field(..., description="Type of the task")
+    correct_choices: Optional[list[int]] = Field(default=None)
+    input_answers: Optional[list[str]] = Field(default=None)
+    explanation: Optional[str] = Field(default=None)
+    exp: Optional[int] = Field(default=0)
     rewards_associations: Optional[list["RewardAssociation"]] = Field(default_factory=list)
 
-    def check_answer(self, answer: Optional[str | list[str]]) -> bool:
-        if self.type == StepType.input and isinstance(answer, str):
-            return answer in self.input_answers
-        elif self.type == StepType.instant:
-            return answer == self.correct_choices
-        elif self.type == StepType.radio:
-            return answer == self.correct_choices
-        elif self.type == StepType.multichoice:
-            return answer == self.correct_choices
-        elif self.type == StepType.empty:
+    _input_answers: frozenset[str] = PrivateAttr()
+    _correct_choices: Optional[frozenset[int]] = PrivateAttr()  # None if the task has no correct choices
+
+    def model_post_init(self, __context) -> None:
+        self._input_answers = frozenset(normalize_answer(answer) for answer in self.input_answers or ())
+        self._correct_choices = None if self.correct_choices is None else frozenset(self.correct_choices)
+
+    def check_answer(self, answer: Optional[str | list[int]]) -> bool:
+        if self.type == StepType.empty:
             return True
+        if answer is None:
+            return False
+        if self.type == StepType.input:
+            return isinstance(answer, str) and normalize_answer(answer) in self._input_answers
+        if self.type in (StepType.instant, StepType.radio, StepType.multichoice):
+            return isinstance(answer, list) and frozenset(answer) == self._correct_choices
         return False
 
 
@@ -84,6 +123,23 @@ class UpdateTask(BaseModel):
     explanation: Optional[str] = Field(default=None, description="Explanation of the answer for the task")
 
 
+class TaskSubmissionResult(BaseModel):
+    already_solved: bool = Field(..., description="Task had been solved correctly before this submission")
+    granted: bool = Field(..., description="Exp and rewards of the task were granted by this submission")
+    levels: list[ViewLevelUp] = Field(
+        default_factory=list, description="Battle pass levels reached with the granted exp, their rewards are granted"
+    )
+
+
+class LessonProgress(BaseModel):
+    model_config = ConfigDict(from_attributes=True)
+
+    lesson_id: int
+    is_available: bool = False
+    solved_tasks: int
+    total_tasks: int
+
+
 class ViewLesson(BaseModel):
     model_config = ConfigDict(from_attributes=True)
 
@@ -121,3 +177,5 @@ class UpdateLesson(BaseModel):
 
 
 ViewLesson.model_rebuild()
+ViewTaskWithAnswers.model_rebuild()
+TaskAnswerKey.model_rebuild()
@@ -0,0 +1,46 @@
+__all__ = ["router"]
+
+from typing import Annotated
+
+from fastapi import APIRouter
+
+from src.api.dependencies import DEPENDS_ADMIN, DEPENDS_AUTH_REPOSITORY, DEPENDS_STORAGE
+from src.api.exceptions import ForbiddenException, IncorrectCredentialsException, NoCredentialsException
+from src.modules.auth.repository import AuthRepository
+from src.modules.auth.schemas import VerificationResult, PasswordHasherStats
+from src.storages.sqlalchemy.pool import DatabasePoolStats
+from src.storages.sqlalchemy.storage import SQLAlchemyStorage
+
+router = APIRouter(prefix="/monitoring", tags=["Monitoring"])
+
+
+@router.get(
+    "/password-hasher",
+    responses={
+        200: {"description": "Password hashing pool statistics"},
+        **IncorrectCredentialsException.responses,
+        **NoCredentialsException.responses,
+        **ForbiddenException.responses,
+    },
+)
+async def get_password_hasher_stats(
+    verification: Annotated[VerificationResult, DEPENDS_ADMIN],
+    auth_repository: Annotated[AuthRepository, DEPENDS_AUTH_REPOSITORY],
+) -> PasswordHasherStats:
+    return auth_repository.password_hasher.stats()
+
+
+@router.get(
+    "/database-pool",
+    responses={
+        200: {"description": "Database connection pool statistics of the worker that served the request"},
+        **IncorrectCredentialsException.responses,
+        **NoCredentialsException.responses,
+        **ForbiddenException.responses,
+    },
+)
+async def get_database_pool_stats(
+    verification: Annotated[VerificationResult, DEPENDS_ADMIN],
+    storage: Annotated[SQLAlchemyStorage, DEPENDS_STORAGE],
+) -> DatabasePoolStats:
+    return storage.engine.pool.stats()
@@ -1,5 +1,12 @@
-from typing import Optional
+from bisect import bisect_right
+from collections import Counter, defaultdict
+from typing import Collection, Iterable, Optional
 
+from pydantic import BaseModel
+from sqlalchemy import Select
+from sqlalchemy.orm import selectinload
+
+from src.api.dependencies import Dependencies
 from src.api.exceptions import ObjectNotFound
 from src.modules.auth.schemas import VerificationResult
 
@@ -13,12 +20,16 @@ from src.storages.sqlalchemy.models import (
     BattlePass,
     PersonalAccountBattlePasses,
     LevelRewards,
+    User,
 )
+from src.storages.cache import TTLCache, CatalogCache, SerializedJSON
 from src.storages.sqlalchemy.models.event import Event, EventParticipants
 from src.storages.sqlalchemy.repository import SQLAlchemyRepository
+from src.storages.sqlalchemy.unit_of_work import run_after_commit
 from src.storages.sqlalchemy.utils import *
 from src.modules.personal_account.schemas import (
     ViewPersonalAccount,
+    PersonalAccountInclude,
     ViewReward,
     CreateReward,
     CreatePersonalAccountReward,
@@ -33,8 +44,10 @@ from src.modules.personal_account.schemas import (
     UpdateAchievement,
     CreatePersonalAccountAchievement,
     ViewLeaderBoard,
+    ViewLeaderBoardPosition,
     ViewAchievementWithSummary,
     ViewPersonalAccountBattlePass,
+    ViewLevelUp,
     CreateEvent,
     ViewEvent,
     CreateEventParticipant,
@@ -42,16 +55,97 @@ from src.modules.personal_account.schemas import (
 
 
 class PersonalAccountRepository(SQLAlchemyRepository):
+    LEADERBOARD_TOP_SIZE = 100
+    LEADERBOARD_TOP_TTL = 30
+    LEADERBOARD_PLACE_LIMIT = 10_000  # places are not counted further down
+    _leaderboard_top: TTLCache[list[ViewLeaderBoard]]
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self._leaderboard_top = TTLCache(maxsize=1, ttl=self.LEADERBOARD_TOP_TTL)
+
     async def create(self, session, user_id: int) -> None:
         q = insert(PersonalAccount).values(user_id=user_id)
         await session.execute(q)
-
-    async def read(self, verification: VerificationResult) -> Optional[ViewPersonalAccount]:
+        # the total user count in achievement summaries changes
+        run_after_commit(Dependencies.get_achievement_repository().invalidate_summaries)
+
+    async def read(
+        self, verification: VerificationResult, include: Collection[PersonalAccountInclude] = ()
+    ) -> Optional[ViewPersonalAccount]:
+        accounts = await self.read_many([verification.user_id], include)
+        if accounts:
+            return accounts[0]
+
+    async def read_many(
+        self, user_ids: Collection[int], include: Collection[PersonalAccountInclude] = ()
+    ) -> list[ViewPersonalAccount]:
+        """
+        Read personal accounts with the requested relations only:
+        one single-table query for the accounts and one projection query per included relation
+        """
+        if not user_ids:
+            return []
         async with self._create_session() as session:
-            q = select(PersonalAccount).where(PersonalAccount.user_id == verification.user_id)
-            obj = await session.scalar(q)
-            if obj:
-                return ViewPersonalAccount.model_validate(obj)
+            q = (
+                select(PersonalAccount.user_id, PersonalAccount.total_exp)
+                .where(PersonalAccount.user_id.in_(list(user_ids)))
+                .order_by(PersonalAccount.user_id)
+            )
+            accounts = {row.user_id: row._asdict() for row in await session.execute(q)}
+            if not accounts:
+                return []
+            for relation in include:
+                q, schema = self._relation_query(relation, list(accounts))
+                grouped = defaultdict(list)
+                for row in await session.execute(q):
+                    grouped[row.personal_account_id].append(schema.model_validate(row))
+                for user_id, account in accounts.items():
+                    account[relation.value] = grouped[user_id]
+            return [ViewPersonalAccount.model_validate(account) for account in accounts.values()]
+
+    @staticmethod
+    def _relation_query(relation: PersonalAccountInclude, user_ids: list[int]) -> tuple[Select, type[BaseModel]]:
+        if relation == PersonalAccountInclude.REWARDS:
+            q = (
+                select(
+                    PersonalAccountRewards.personal_account_id,
+                    Reward.id,
+                    Reward.name,
+                    Reward.content,
+                    Reward.type,
+                    Reward.image,
+                )
+                .join(Reward, Reward.id == PersonalAccountRewards.reward_id)
+                .where(PersonalAccountRewards.personal_account_id.in_(user_ids))
+                .distinct()
+                .order_by(PersonalAccountRewards.personal_account_id, Reward.id)
+            )
+            return q, ViewReward
+        if relation == PersonalAccountInclude.ACHIEVEMENTS:
+            q = (
+                select(
+                    PersonalAccountAchievements.personal_account_id,
+                    Achievement.id,
+                    Achievement.name,
+                    Achievement.description,
+                    Achievement.image,
+                )
+                .join(Achievement, Achievement.id == PersonalAccountAchievements.achievement_id)
+                .where(PersonalAccountAchievements.personal_account_id.in_(user_ids))
+                .order_by(PersonalAccountAchievements.personal_account_id, Achievement.id)
+            )
+            return q, ViewAchievement
+        q = (
+            select(
+                PersonalAccountBattlePasses.personal_account_id,
+                PersonalAccountBattlePasses.battle_pass_id,
+                PersonalAccountBattlePasses.experience,
+            )
+            .where(PersonalAccountBattlePasses.personal_account_id.in_(user_ids))
+            .order_by(PersonalAccountBattlePasses.personal_account_id, PersonalAccountBattlePasses.battle_pass_id)
+        )
+        return q, ViewPersonalAccountBattlePass
 
     async def increase_exp(self, user_id: int, exp: int) -> None:
         async with self._create_session() as session:
@@ -59,24 +153,126 @@ class PersonalAccountRepository(SQLAlchemyRepository):
                 update(PersonalAccount)
                 .where(PersonalAccount.user_id == user_id)
                 .values(total_exp=PersonalAccount.total_exp + exp)
+                .returning(PersonalAccount.total_exp)
             )
-            await session.execute(q)
+            total_exp = await session.scalar(q)
             await session.commit()
+            run_after_commit(lambda: self.on_exp_changed(user_id, total_exp))
 
     async def set_experience(self, user_id: int, exp: int) -> None:
         async with self._create_session() as session:
             q = update(PersonalAccount).where(PersonalAccount.user_id == user_id).values(total_exp=exp)
             await session.execute(q)
             await session.commit()
-
-    async def read_leaderboard(self) -> list[ViewLeaderBoard]:
+            run_after_commit(lambda: self.on_exp_changed(user_id, exp))
+
+    def on_exp_changed(self, user_id: int, total_exp: Optional[int]) -> None:
+        """
+        Drop the cached leaderboard top if the change of user experience may reorder it.
+        Call it once the change is committed (see `run_after_commit`), or a concurrent read may cache the old top.
+        """
+        top = self._leaderboard_top.get("top")
+        if top is None or total_exp is None:
+            return
+        if len(top) < self.LEADERBOARD_TOP_SIZE or total_exp >= top[-1].total_exp:
+            self._leaderboard_top.clear()
+        elif any(entry.id == user_id for entry in top):
+            self._leaderboard_top.clear()
+
+    def _leaderboard_query(self):
+        return select(PersonalAccount.total_exp, User.name, User.id).join(User, User.id == PersonalAccount.user_id)
+
+    async def read_leaderboard(
+        self,
+        limit: int = LEADERBOARD_TOP_SIZE,
+        after_exp: Optional[int] = None,
+        after_user_id: Optional[int] = None,
+        after_place: Optional[int] = None,
+    ) -> list[ViewLeaderBoard]:
+        """
+        Read leaderboard page sorted by total exp (ties are ordered by user id).
+        Pass `after_exp`, `after_user_id` and `after_place` of the last entry of the previous page to get the next one.
+        Places are numbered on from `after_place`, without it they are not set on pages after the first.
+        """
+        if after_exp is None and limit <= self.LEADERBOARD_TOP_SIZE:
+            top = self._leaderboard_top.get("top")
+            if top is None:
+                top = await self._read_leaderboard_page(self.LEADERBOARD_TOP_SIZE)
+                self._leaderboard_top.set("top", top)
+            return top[:limit]
+        return await self._read_leaderboard_page(limit, after_exp, after_user_id, after_place)
+
+    async def _read_leaderboard_page(
+        self,
+        limit: int,
+        after_exp: Optional[int] = None,
+        after_user_id: Optional[int] = None,
+        after_place: Optional[int] = None,
+    ) -> list[ViewLeaderBoard]:
         async with self._create_session() as session:
-            q = text(
-                """select personal_account.total_exp, users.name, users.id from personal_account inner join users on personal_account.user_id=users.id order by personal_account.total_exp desc;"""
+            q = (
+                self._leaderboard_query()
+                .order_by(PersonalAccount.total_exp.desc(), PersonalAccount.user_id)
+                .limit(limit)
             )
+            if after_exp is not None:
+                q = q.where(
+                    or_(
+                        PersonalAccount.total_exp < after_exp,
+                        and_(PersonalAccount.total_exp == after_exp, PersonalAccount.user_id > (after_user_id or 0)),
+                    )
+                )
             objs = await session.execute(q)
-            if objs:
-                return [ViewLeaderBoard.model_validate(obj) for obj in objs]
+            entries = [ViewLeaderBoard.model_validate(obj) for obj in objs]
+            if after_exp is None:
+                after_place = 0
+            if after_place is not None:
+                entries = [entry.model_copy(update={"place": after_place + i + 1}) for i, entry in enumerate(entries)]
+            return entries
+
+    async def read_leaderboard_position(self, user_id: int, neighbours: int = 5) -> Optional[ViewLeaderBoardPosition]:
+        """
+        Read place of the user in the leaderboard with up to `neighbours` entries above and below.
+        The place is a count of accounts ranked higher over the leaderboard index, so it costs O(place);
+        the count stops at `LEADERBOARD_PLACE_LIMIT` and places are not set for users below it.
+        """
+        async with self._create_session() as session:
+            me = (await session.execute(self._leaderboard_query().where(PersonalAccount.user_id == user_id))).first()
+            if me is None:
+                return None
+            higher = or_(
+                PersonalAccount.total_exp > me.total_exp,
+                and_(PersonalAccount.total_exp == me.total_exp, PersonalAccount.user_id < user_id),
+            )
+            lower = or_(
+                PersonalAccount.total_exp < me.total_exp,
+                and_(PersonalAccount.total_exp == me.total_exp, PersonalAccount.user_id > user_id),
+            )
+            ranked_higher = select(PersonalAccount.user_id).where(higher).limit(self.LEADERBOARD_PLACE_LIMIT)
+            higher_count = await session.scalar(select(func.count()).select_from(ranked_higher.subquery()))
+            place = higher_count + 1 if higher_count < self.LEADERBOARD_PLACE_LIMIT else None
+            above = (
+                await session.execute(
+                    self._leaderboard_query()
+                    .where(higher)
+                    .order_by(PersonalAccount.total_exp, PersonalAccount.user_id.desc())
+                    .limit(neighbours)
+                )
+            ).all()
+            below = (
+                await session.execute(
+                    self._leaderboard_query()
+                    .where(lower)
+                    .order_by(PersonalAccount.total_exp.desc(), PersonalAccount.user_id)
+                    .limit(neighbours)
+                )
+            ).all()
+            rows = [*reversed(above), me, *below]
+            entries = [ViewLeaderBoard.model_validate(row) for row in rows]
+            if place is not None:
+                first_place = place - len(above)
+                entries = [entry.model_copy(update={"place": first_place + i}) for i, entry in enumerate(entries)]
+            return ViewLeaderBoardPosition(place=place, entries=entries)
 
     async def read_my_battle_pass(self, verification: VerificationResult) -> ViewPersonalAccountBattlePass:
         async with self._create_session() as session:
@@ -98,11 +294,37 @@ class PersonalAccountRepository(SQLAlchemyRepository):
 
 
 class RewardRepository(SQLAlchemyRepository):
+    CATALOG_TTL = 60
+    # reward ids must be unique within one statement, ON CONFLICT can not update a row twice
+    GRANT_QUERY = text(
+        """
+        INSERT INTO personal_account_rewards (personal_account_id, reward_id, count)
+        SELECT personal_account.user_id, r.reward_id, r.count
+        FROM personal_account,
+            unnest(CAST(:reward_ids AS INTEGER[]), CAST(:reward_counts AS INTEGER[])) AS r(reward_id, count)
+        WHERE personal_account.user_id = :user_id
+        ON CONFLICT (personal_account_id, reward_id)
+            DO UPDATE SET count = COALESCE(personal_account_rewards.count, 0) + excluded.count
+        """
+    )
+    _all_json: CatalogCache[SerializedJSON]
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self._all_json = CatalogCache(ttl=self.CATALOG_TTL)
+
+    def invalidate_catalog(self) -> None:
+        # rewards are embedded into lessons and battle pass levels
+        self._all_json.invalidate()
+        Dependencies.get_lesson_repository().invalidate_catalog()
+        Dependencies.get_battle_pass_repository().invalidate_catalog()
+
     async def create(self, reward_data: CreateReward) -> ViewReward:
         async with self._create_session() as session:
             reward = Reward(**reward_data.model_dump())
             session.add(reward)
             await session.commit()
+            self._all_json.invalidate()
             return ViewReward.model_validate(reward)
 
     async def read(self, _id: int) -> Optional[ViewReward]:
@@ -122,6 +344,7 @@ class RewardRepository(SQLAlchemyRepository):
             )
             obj = await session.scalar(q)
             await session.commit()
+            self.invalidate_catalog()
             return ViewReward.model_validate(obj)
 
     async def get_all(self) -> list[ViewReward]:
@@ -131,43 +354,35 @@ class RewardRepository(SQLAlchemyRepository):
             if objs:
                 return [ViewReward.model_validate(obj) for obj in objs]
 
+    async def get_all_json(self) -> SerializedJSON:
+        return await self._all_json.get(self._serialize_all)
+
+    async def _serialize_all(self) -> SerializedJSON:
+        return SerializedJSON.from_models(await self.get_all())
+
     async def add_to_personal_account(self, create_personal_account_reward: CreatePersonalAccountReward) -> None:
-        async with self._create_session() as session:
-            q = (
-                select(PersonalAccountRewards)
-                .where(PersonalAccountRewards.reward_id == create_personal_account_reward.reward_id)
-                .where(PersonalAccountRewards.personal_account_id == create_personal_account_reward.personal_account_id)
-            )
-            result = await session.scalar(q)
-            if result:
-                result.count += 1
-                session.add(result)
-            else:
-                q = insert(PersonalAccountRewards).values(create_personal_account_reward.model_dump())
-                await session.execute(q)
-            await session.commit()
+        await self.add_rewards_to_personal_account(
+            create_personal_account_reward.personal_account_id, [(create_personal_account_reward.reward_id, 1)]
+        )
 
     async def add_rewards_to_personal_account(self, user_id: int, rewards: list[tuple[int, int]]) -> None:
         async with self._create_session() as session:
-            q = select(PersonalAccount).where(PersonalAccount.user_id == user_id)
-            personal_account = await session.scalar(q)
-            if personal_account:
-                for reward_id, count in rewards:
-                    q = (
-                        select(PersonalAccountRewards)
-                        .where(PersonalAccountRewards.reward_id == reward_id)
-                        .where(PersonalAccountRewards.personal_account_id == personal_account.user_id)
-                    )
-                    result = await session.scalar(q)
-                    if result:
-                        result.count += count
-                        session.add(result)
-                    else:
-                        q = insert(PersonalAccountRewards).values(
-                            reward_id=reward_id, personal_account_id=personal_account.user_id, count=count
-                        )
-                        await session.execute(q)
-                await session.commit()
+            await self.grant(session, user_id, rewards)
+            await session.commit()
+
+    async def grant(self, session, user_id: int, rewards: Iterable[tuple[int, int]]) -> None:
+        """
+        Grant (reward id, count) pairs in the given session with one statement,
+        counts of already granted rewards are increased. Nothing is granted if the personal account does not exist.
+        """
+        counts = Counter()
+        for reward_id, count in rewards:
+            counts[reward_id] += count
+        if counts:
+            await session.execute(
+                self.GRANT_QUERY,
+                {"user_id": user_id, "reward_ids": list(counts), "reward_counts": list(counts.values())},
+            )
 
     async def set_rewards_to_level(self, level_id: int, rewards: list[int]) -> None:
         async with self._create_session() as session:
@@ -177,14 +392,25 @@ class RewardRepository(SQLAlchemyRepository):
                 q = insert(LevelRewards).values(level_id=level_id, reward_id=reward_id)
                 await session.execute(q)
             await session.commit()
+            Dependencies.get_battle_pass_repository().invalidate_catalog()
 
 
 class AchievementRepository(SQLAlchemyRepository):
+    SUMMARY_TTL = 60
+    _summaries: TTLCache[list[ViewAchievementWithSummary]]
+    _summaries_json: CatalogCache[SerializedJSON]  # dropped together with _summaries
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self._summaries = TTLCache(maxsize=1, ttl=self.SUMMARY_TTL)
+        self._summaries_json = CatalogCache(ttl=self.SUMMARY_TTL)
+
     async def create(self, achievement_data: CreateAchievement) -> ViewAchievement:
         async with self._create_session() as session:
             achievement = Achievement(**achievement_data.model_dump())
             session.add(achievement)
             await session.commit()
+            run_after_commit(self.invalidate_summaries)
             return ViewAchievement.model_validate(achievement)
 
     async def read(self, _id: int) -> Optional[ViewAchievement]:
@@ -204,6 +430,7 @@ class AchievementRepository(SQLAlchemyRepository):
             )
             obj = await session.scalar(q)
             await session.commit()
+            run_after_commit(self.invalidate_summaries)
             return ViewAchievement.model_validate(obj)
 
     async def set_to_personal_account(
@@ -225,38 +452,52 @@ class AchievementRepository(SQLAlchemyRepository):
             q = insert(PersonalAccountAchievements).values(create_personal_account_achievement.model_dump())
             await session.execute(q)
             await session.commit()
+            run_after_commit(self.invalidate_summaries)
+
+    def invalidate_summaries(self) -> None:
+        """
+        Drop cached summaries, so counts and percentages are read again.
+        Call it once the change is committed (see `run_after_commit`), or a concurrent read may cache old counts.
+        """
+        self._summaries.clear()
+        self._summaries_json.invalidate()
 
     async def get_all(self) -> list[ViewAchievementWithSummary]:
-        async with self._create_session() as session:
-            q = select(Achievement)
-            objs = await session.scalars(q)
-            if objs:
-                achievements = [ViewAchievement.model_validate(achievement) for achievement in objs]
-
-                achievement_counts = {}
-                for achievement in achievements:
-                    q = (
-                        select(func.count(PersonalAccountAchievements.personal_account_id))
-                        .select_from(PersonalAccountAchievements)
-                        .where(PersonalAccountAchievements.achievement_id == achievement.id)
-                    )
-                    achievement_counts[achievement.id] = await session.scalar(q)
-                total_user_count = await session.scalar(select(func.count(PersonalAccount.user_id)))
-
-                achievement_percentages = {}
-                for achievement_id, count in achievement_counts.items():
-                    achievement_percentages[achievement_id] = count / total_user_count
-
-                achievement_summaries = [
-                    ViewAchievementWithSummary(
-                        percent=achievement_percentages[achievement.id],
-                        total_count=achievement_counts[achievement.id],
-                        achievement=achievement,
-                    )
-                    for achievement in achievements
-                ]
+        summaries = self._summaries.get("all")
+        if summaries is None:
+            summaries = await self._read_summaries()
+            self._summaries.set("all", summaries)
+        return summaries
+
+    async def get_all_json(self) -> SerializedJSON:
+        return await self._summaries_json.get(self._serialize_all)
 
-                return achievement_summaries
+    async def _serialize_all(self) -> SerializedJSON:
+        return SerializedJSON.from_models(await self.get_all())
+
+    async def _read_summaries(self) -> list[ViewAchievementWithSummary]:
+        async with self._create_session() as session:
+            total_user_count = select(func.count(PersonalAccount.user_id)).scalar_subquery()
+            q = (
+                select(
+                    Achievement,
+                    func.count(PersonalAccountAchievements.personal_account_id).label("total_count"),
+                    total_user_count.label("total_user_count"),
+                )
+                .outerjoin(PersonalAccountAchievements, PersonalAccountAchievements.achievement_id == Achievement.id)
+                .group_by(Achievement.id)
+                .order_by(Achievement.id)
+            )
+            rows = await session.execute(q)
+            return [
+                ViewAchievementWithSummary(
+                    achievement=ViewAchievement.model_validate(achievement),
+                    total_count=total_count,
+                    total_user_count=total_user_count,
+                    percent=total_count / total_user_count if total_user_count else 0.0,
+                )
+                for achievement, total_count, total_user_count in rows
+            ]
 
 
 class LevelRepository(SQLAlchemyRepository):
@@ -265,26 +506,102 @@ class LevelRepository(SQLAlchemyRepository):
             obj = Level(**level_data.model_dump())
             session.add(obj)
             await session.commit()
-            q = select(Level).where(Level.id == obj.id)
+            Dependencies.get_battle_pass_repository().invalidate_catalog()
+            q = (
+                select(Level)
+                .where(Level.id == obj.id)
+                .options(selectinload(Level.rewards))
+                .execution_options(populate_existing=True)
+            )
             level = await session.scalar(q)
             return ViewLevel.model_validate(level)
 
     async def read(self, _id: int) -> Optional[ViewLevel]:
         async with self._create_session() as session:
-            q = select(Level).where(Level.id == _id)
+            q = select(Level).where(Level.id == _id).options(selectinload(Level.rewards))
             obj = await session.scalar(q)
             if obj:
                 return ViewLevel.model_validate(obj)
 
     async def get_all(self) -> list[ViewLevel]:
         async with self._create_session() as session:
-            q = select(Level)
+            q = select(Level).options(selectinload(Level.rewards))
             objs = await session.scalars(q)
             if objs:
                 return [ViewLevel.model_validate(obj) for obj in objs]
 
 
+# Battle passes are always shown with levels and their rewards
+_BATTLE_PASS_LEVELS = selectinload(BattlePass.levels).selectinload(Level.rewards)
+
+
+class BattlePassLevels:
+    """
+    Levels of one battle pass sorted by required experience, so levels crossed by an experience change
+    are found with two binary searches
+    """
+
+    thresholds: list[int]
+    levels: list[ViewLevelUp]
+
+    def __init__(self, levels: list[ViewLevelUp]):
+        self.levels = sorted(levels, key=lambda level: (level.experience, level.value))
+        self.thresholds = [level.experience for level in self.levels]
+
+    def crossed(self, old_experience: int, new_experience: int) -> list[ViewLevelUp]:
+        """Levels reached by going from old to new experience"""
+        return self.levels[
+            bisect_right(self.thresholds, old_experience) : bisect_right(self.thresholds, new_experience)
+        ]
+
+
 class BattlePassRepository(SQLAlchemyRepository):
+    CATALOG_TTL = 60
+    INCREASE_EXP_QUERY = text(
+        """
+        UPDATE personal_account_battle_passes AS pabp SET experience = pabp.experience + :exp
+        FROM battle_pass
+        WHERE battle_pass.id = pabp.battle_pass_id
+            AND battle_pass.is_active
+            AND pabp.personal_account_id = :user_id
+        RETURNING pabp.battle_pass_id, pabp.experience
+        """
+    )
+    _all_json: CatalogCache[SerializedJSON]
+    _levels: CatalogCache[dict[int, BattlePassLevels]]
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self._all_json = CatalogCache(ttl=self.CATALOG_TTL)
+        self._levels = CatalogCache(ttl=self.CATALOG_TTL)
+
+    def invalidate_catalog(self) -> None:
+        self._all_json.invalidate()
+        self._levels.invalidate()
+
+    async def get_levels(self) -> dict[int, BattlePassLevels]:
+        return await self._levels.get(self._load_levels)
+
+    async def _load_levels(self) -> dict[int, BattlePassLevels]:
+        async with self._create_session() as session:
+            q = select(LevelRewards.level_id, LevelRewards.reward_id).order_by(LevelRewards.reward_id)
+            rewards = defaultdict(list)
+            for row in await session.execute(q):
+                rewards[row.level_id].append(row.reward_id)
+            q = select(Level.id, Level.battle_pass_id, Level.value, Level.experience)
+            levels = defaultdict(list)
+            for row in await session.execute(q):
+                levels[row.battle_pass_id].append(
+                    ViewLevelUp(
+                        battle_pass_id=row.battle_pass_id,
+                        level_id=row.id,
+                        value=row.value,
+                        experience=row.experience,
+                        rewards=rewards[row.id],
+                    )
+                )
+            return {battle_pass_id: BattlePassLevels(items) for battle_pass_id, items in levels.items()}
+
     async def create(self, battle_pass_data: CreateBattlePass, id_: Optional[int] = None) -> ViewBattlePass:
         async with self._create_session() as session:
             dct = battle_pass_data.model_dump()
@@ -293,13 +610,19 @@ class BattlePassRepository(SQLAlchemyRepository):
             obj = BattlePass(**dct)
             session.add(obj)
             await session.commit()
-            q = select(BattlePass).where(BattlePass.id == obj.id)
+            self.invalidate_catalog()
+            q = (
+                select(BattlePass)
+                .where(BattlePass.id == obj.id)
+                .options(_BATTLE_PASS_LEVELS)
+                .execution_options(populate_existing=True)
+            )
             battle_pass = await session.scalar(q)
             return ViewBattlePass.model_validate(battle_pass)
 
     async def read(self, _id: int) -> Optional[ViewBattlePass]:
         async with self._create_session() as session:
-            q = select(BattlePass).where(BattlePass.id == _id)
+            q = select(BattlePass).where(BattlePass.id == _id).options(_BATTLE_PASS_LEVELS)
             obj = await session.scalar(q)
             if obj:
                 return ViewBattlePass.model_validate(obj)
@@ -309,14 +632,21 @@ class BattlePassRepository(SQLAlchemyRepository):
             q = delete(BattlePass).where(BattlePass.id == _id)
             await session.execute(q)
             await session.commit()
+            self.invalidate_catalog()
 
     async def get_all(self) -> list[ViewBattlePass]:
         async with self._create_session() as session:
-            q = select(BattlePass)
+            q = select(BattlePass).options(_BATTLE_PASS_LEVELS)
             objs = await session.scalars(q)
             if objs:
                 return [ViewBattlePass.model_validate(obj) for obj in objs]
 
+    async def get_all_json(self) -> SerializedJSON:
+        return await self._all_json.get(self._serialize_all)
+
+    async def _serialize_all(self) -> SerializedJSON:
+        return SerializedJSON.from_models(await self.get_all())
+
     async def add_to_user(self, create_personal_account_bp: CreatePersonalAccountBattlePasses) -> None:
         async with self._create_session() as session:
             q = select(PersonalAccountBattlePasses).where(
@@ -332,63 +662,73 @@ class BattlePassRepository(SQLAlchemyRepository):
                 session.add(pa_bp)
             await session.commit()
 
-    async def increase_battle_exp(self, user_id: int, exp: int) -> None:
+    async def increase_battle_exp(self, user_id: int, exp: int) -> list[ViewLevelUp]:
+        """
+        Add exp to active battle passes of the user and grant rewards of the levels reached
+        """
+        levels = await self.get_levels()
         async with self._create_session() as session:
-            # select
-            q = (
-                select(PersonalAccountBattlePasses)
-                .join(BattlePass)
-                .where(
-                    and_(
-                        BattlePass.is_active,
-                        PersonalAccountBattlePasses.personal_account_id == user_id,
-                    )
-                )
-            )
-
-            passes = await session.scalars(q)
-
-            if passes:
-                for pa_bp in passes:
-                    # update
-                    q = (
-                        update(PersonalAccountBattlePasses)
-                        .where(
-                            and_(
-                                PersonalAccountBattlePasses.personal_account_id == user_id,
-                                PersonalAccountBattlePasses.battle_pass_id == pa_bp.battle_pass_id,
-                            )
-                        )
-                        .values(experience=PersonalAccountBattlePasses.experience + exp)
-                    )
-                    await session.execute(q)
-
-                await session.commit()
+            rows = await session.execute(self.INCREASE_EXP_QUERY, {"user_id": user_id, "exp": exp})
+            gained = await self.level_up(session, user_id, exp, [tuple(row) for row in rows], levels)
+            await session.commit()
+            return gained
+
+    async def level_up(
+        self,
+        session,
+        user_id: int,
+        exp: int,
+        experience: Iterable[tuple[int, int]],
+        levels: dict[int, BattlePassLevels],
+    ) -> list[ViewLevelUp]:
+        """
+        Grant rewards of levels crossed by adding exp, given (battle pass id, new experience) pairs.
+        Must be called in the transaction that added the exp: rows stay locked until it ends,
+        so every level is crossed (and rewarded) exactly once.
+        """
+        gained = []
+        for battle_pass_id, new_experience in experience:
+            battle_pass_levels = levels.get(battle_pass_id)
+            if battle_pass_levels is not None:
+                gained.extend(battle_pass_levels.crossed(new_experience - exp, new_experience))
+        if gained:
+            rewards = [(reward_id, 1) for level in gained for reward_id in level.rewards]
+            await Dependencies.get_reward_repository().grant(session, user_id, rewards)
+        return gained
 
 
 class EventRepository(SQLAlchemyRepository):
+    PARTICIPANT_INCLUDE = (PersonalAccountInclude.REWARDS, PersonalAccountInclude.ACHIEVEMENTS)
+
     async def create(self, event_data: CreateEvent) -> ViewEvent:
         async with self._create_session() as session:
             obj = Event(**event_data.model_dump())
             session.add(obj)
             await session.commit()
-            q = select(Event).where(Event.id == obj.id)
-            event = await session.scalar(q)
-            return ViewEvent.model_validate(event)
+            return ViewEvent.model_validate({**self._columns(obj), "participants": []})
 
     async def read(self, _id: int) -> Optional[ViewEvent]:
-        async with self._create_session() as session:
-            q = select(Event).where(Event.id == _id)
-            obj = await session.scalar(q)
-            if obj:
-                return ViewEvent.model_validate(obj)
+        return await self._read_one(Event.id == _id)
 
     async def get_active(self) -> Optional[ViewEvent]:
+        return await self._read_one(Event.is_active)
+
+    async def _read_one(self, where) -> Optional[ViewEvent]:
         async with self._create_session() as session:
-            q = select(Event).where(Event.is_active)
+            q = select(Event).where(where).limit(1)
             obj = await session.scalar(q)
-            if obj:
-                return ViewEvent.model_validate(obj)
+            if obj is None:
+                return None
+            q = select(EventParticipants.personal_account_id).where(EventParticipants.event_id == obj.id)
+            participant_ids = list(await session.scalars(q))
+        participants = await Dependencies.get_personal_account_repository().read_many(
+            participant_ids, self.PARTICIPANT_INCLUDE
+        )
+        return ViewEvent.model_validate({**self._columns(obj), "participants": participants})
+
+    @staticmethod
+    def _columns(event: Event) -> dict:
+        return {column.key: getattr(event, column.key) for column in Event.__table__.columns}
 
     async def add_participant_to_event(self, event_participant: CreateEventParticipant) -> None:
         async with self._create_session() as session:
@@ -1,18 +1,24 @@
 __all__ = ["router"]
 
-from typing import Annotated
+from typing import Annotated, Optional
 
-from fastapi import APIRouter, Depends
+from fastapi import APIRouter, Depends, Query, Request, Response
+from fastapi.exceptions import RequestValidationError
 
+from src.api.conditional import json_response, CONDITIONAL_RESPONSES
 from src.api.dependencies import (
+    DEPENDS_ADMIN,
     DEPENDS_PERSONAL_ACCOUNT_REPOSITORY,
     DEPENDS_REWARD_REPOSITORY,
     DEPENDS_ACHIEVEMENT_REPOSITORY,
     DEPENDS_BATTLE_PASS_REPOSITORY,
     DEPENDS_EVENT_REPOSITORY,
-    DEPENDS_USER_REPOSITORY,
 )
-from src.api.exceptions import IncorrectCredentialsException, NoCredentialsException, ForbiddenException
+from src.api.exceptions import (
+    IncorrectCredentialsException,
+    NoCredentialsException,
+    ObjectNotFound,
+)
 from src.modules.auth.dependencies import verify_request
 from src.modules.auth.schemas import VerificationResult
 from src.modules.personal_account.repository import (
@@ -24,6 +30,7 @@ from src.modules.personal_account.repository import (
 )
 from src.modules.personal_account.schemas import (
     ViewPersonalAccount,
+    PersonalAccountInclude,
     ViewReward,
     CreateReward,
     CreatePersonalAccountReward,
@@ -34,17 +41,34 @@ from src.modules.personal_account.schemas import (
     CreateBattlePass,
     CreatePersonalAccountBattlePasses,
     ViewLeaderBoard,
+    ViewLeaderBoardPosition,
     ViewAchievementWithSummary,
     ViewPersonalAccountBattlePass,
     CreateEvent,
     CreateEventParticipant,
     ViewEvent,
 )
-from src.modules.user.repository import UserRepository
 
 router = APIRouter(tags=["Personal Account"])
 
 
+def parse_include(
+    include: Annotated[
+        str,
+        Query(
+            description="Comma-separated relations to include: "
+            f"{', '.join(PersonalAccountInclude)}. Pass an empty value to read only the account itself",
+        ),
+    ] = "rewards,achievements",
+) -> set[PersonalAccountInclude]:
+    try:
+        return {PersonalAccountInclude(part.strip()) for part in include.split(",") if part.strip()}
+    except ValueError as e:
+        raise RequestValidationError(
+            [{"loc": ("query", "include"), "msg": str(e), "type": "enum", "input": include}]
+        ) from e
+
+
 @router.get(
     "/personal_account/",
     responses={
@@ -56,8 +80,9 @@ router = APIRouter(tags=["Personal Account"])
 async def get_my_personal_account(
     verification: Annotated[VerificationResult, Depends(verify_request)],
     personal_account_repository: Annotated[PersonalAccountRepository, DEPENDS_PERSONAL_ACCOUNT_REPOSITORY],
+    include: Annotated[set[PersonalAccountInclude], Depends(parse_include)],
 ) -> ViewPersonalAccount:
-    personal_account = await personal_account_repository.read(verification)
+    personal_account = await personal_account_repository.read(verification, include)
     return personal_account
 
 
@@ -67,14 +92,9 @@ async def get_my_personal_account(
 async def set_experience(
     user_id: int,
     exp: int,
-    verification: Annotated[VerificationResult, Depends(verify_request)],
-    user_repository: Annotated[UserRepository, DEPENDS_USER_REPOSITORY],
+    verification: Annotated[VerificationResult, DEPENDS_ADMIN],
     personal_account_repository: Annotated[PersonalAccountRepository, DEPENDS_PERSONAL_ACCOUNT_REPOSITORY],
 ):
-    user = await user_repository.read(verification.user_id)
-    if not user.is_admin:
-        raise ForbiddenException()
-
     await personal_account_repository.set_experience(user_id, exp)
     return {"success": True}
 
@@ -106,25 +126,53 @@ async def get_my_battle_pass(
 async def get_leaderboard(
     verification: Annotated[VerificationResult, Depends(verify_request)],
     personal_account_repository: Annotated[PersonalAccountRepository, DEPENDS_PERSONAL_ACCOUNT_REPOSITORY],
+    limit: Annotated[int, Query(ge=1, le=1000)] = PersonalAccountRepository.LEADERBOARD_TOP_SIZE,
+    after_exp: Annotated[Optional[int], Query(description="Total exp of the last entry of the previous page")] = None,
+    after_user_id: Annotated[Optional[int], Query(description="User ID of the last entry of the previous page")] = None,
+    after_place: Annotated[
+        Optional[int], Query(ge=0, description="Place of the last entry of the previous page")
+    ] = None,
 ) -> list[ViewLeaderBoard]:
-    leaderboard = await personal_account_repository.read_leaderboard()
+    leaderboard = await personal_account_repository.read_leaderboard(limit, after_exp, after_user_id, after_place)
     return leaderboard
 
 
+@router.get(
+    "/personal_account/leaderboard/me",
+    responses={
+        200: {"description": "My place in the leaderboard with neighbours"},
+        **IncorrectCredentialsException.responses,
+        **NoCredentialsException.responses,
+        **ObjectNotFound.responses,
+    },
+)
+async def get_my_leaderboard_position(
+    verification: Annotated[VerificationResult, Depends(verify_request)],
+    personal_account_repository: Annotated[PersonalAccountRepository, DEPENDS_PERSONAL_ACCOUNT_REPOSITORY],
+    neighbours: Annotated[int, Query(ge=0, le=50)] = 5,
+) -> ViewLeaderBoardPosition:
+    position = await personal_account_repository.read_leaderboard_position(verification.user_id, neighbours)
+    if position is None:
+        raise ObjectNotFound()
+    return position
+
+
 @router.get(
     "/rewards/",
+    response_model=list[ViewReward],
     responses={
         200: {"description": "Get all rewards"},
+        **CONDITIONAL_RESPONSES,
         **IncorrectCredentialsException.responses,
         **NoCredentialsException.responses,
     },
 )
 async def get_all_rewards(
+    request: Request,
     verification: Annotated[VerificationResult, Depends(verify_request)],
     reward_repository: Annotated[RewardRepository, DEPENDS_REWARD_REPOSITORY],
-) -> list[ViewReward]:
-    all_rewards = await reward_repository.get_all()
-    return all_rewards
+) -> Response:
+    return json_response(request, await reward_repository.get_all_json(), public=False)
 
 
 @router.get(
@@ -153,15 +201,10 @@ async def read_reward(
     },
 )
 async def create_reward(
-    verification: Annotated[VerificationResult, Depends(verify_request)],
-    user_repository: Annotated[UserRepository, DEPENDS_USER_REPOSITORY],
+    verification: Annotated[VerificationResult, DEPENDS_ADMIN],
     reward_repository: Annotated[RewardRepository, DEPENDS_REWARD_REPOSITORY],
     obj: CreateReward,
 ) -> ViewReward:
-    user = await user_repository.read(verification.user_id)
-    if not user.is_admin:
-        raise ForbiddenException()
-
     reward = await reward_repository.create(obj)
     return reward
 
@@ -175,33 +218,30 @@ async def create_reward(
     },
 )
 async def set_reward_to_personal_account(
-    verification: Annotated[VerificationResult, Depends(verify_request)],
-    user_repository: Annotated[UserRepository, DEPENDS_USER_REPOSITORY],
+    verification: Annotated[VerificationResult, DEPENDS_ADMIN],
     reward_repository: Annotated[RewardRepository, DEPENDS_REWARD_REPOSITORY],
     obj: CreatePersonalAccountReward,
 ):
-    user = await user_repository.read(verification.user_id)
-    if not user.is_admin:
-        raise ForbiddenException()
-
     await reward_repository.add_to_personal_account(obj)
     return {"success": True}
 
 
 @router.get(
     "/achievements/",
+    response_model=list[ViewAchievementWithSummary],
     responses={
         200: {"description": "Get all achievements"},
+        **CONDITIONAL_RESPONSES,
         **IncorrectCredentialsException.responses,
         **NoCredentialsException.responses,
     },
 )
 async def get_all_achievements(
+    request: Request,
     verification: Annotated[VerificationResult, Depends(verify_request)],
     achievement_repository: Annotated[AchievementRepository, DEPENDS_ACHIEVEMENT_REPOSITORY],
-) -> list[ViewAchievementWithSummary]:
-    all_achievements = await achievement_repository.get_all()
-    return all_achievements
+) -> Response:
+    return json_response(request, await achievement_repository.get_all_json(), public=False)
 
 
 @router.get(
@@ -230,15 +270,10 @@ async def read_achievement(
     },
 )
 async def create_achievement(
-    verification: Annotated[VerificationResult, Depends(verify_request)],
-    user_repository: Annotated[UserRepository, DEPENDS_USER_REPOSITORY],
+    verification: Annotated[VerificationResult, DEPENDS_ADMIN],
     achievement_repository: Annotated[AchievementRepository, DEPENDS_ACHIEVEMENT_REPOSITORY],
     obj: CreateAchievement,
 ) -> ViewAchievement:
-    user = await user_repository.read(verification.user_id)
-    if not user.is_admin:
-        raise ForbiddenException()
-
     achievement = await achievement_repository.create(obj)
     return achievement
 
@@ -252,33 +287,30 @@ async def create_achievement(
     },
 )
 async def set_achievement_to_personal_account(
-    verification: Annotated[VerificationResult, Depends(verify_request)],
-    user_repository: Annotated[UserRepository, DEPENDS_USER_REPOSITORY],
+    verification: Annotated[VerificationResult, DEPENDS_ADMIN],
     achievement_repository: Annotated[AchievementRepository, DEPENDS_ACHIEVEMENT_REPOSITORY],
     obj: CreatePersonalAccountAchievement,
 ) -> None:
-    user = await user_repository.read(verification.user_id)
-    if not user.is_admin:
-        raise ForbiddenException()
-
     await achievement_repository.set_to_personal_account(obj)
     return {"success": True}
 
 
 @router.get(
     "/battle-passes/",
+    response_model=list[ViewBattlePass],
     responses={
         200: {"description": "Get all battle-passes"},
+        **CONDITIONAL_RESPONSES,
         **IncorrectCredentialsException.responses,
         **NoCredentialsException.responses,
     },
 )
 async def get_all_battle_passes(
+    request: Request,
     verification: Annotated[VerificationResult, Depends(verify_request)],
     battle_pass_repository: Annotated[BattlePassRepository, DEPENDS_BATTLE_PASS_REPOSITORY],
-) -> list[ViewBattlePass]:
-    battle_passes = await battle_pass_repository.get_all()
-    return battle_passes
+) -> Response:
+    return json_response(request, await battle_pass_repository.get_all_json(), public=False)
 
 
 @router.get(
@@ -307,15 +339,10 @@ async def read_battle_pass(
     },
 )
 async def create_battle_pass(
-    verification: Annotated[VerificationResult, Depends(verify_request)],
-    user_repository: Annotated[UserRepository, DEPENDS_USER_REPOSITORY],
+    verification: Annotated[VerificationResult, DEPENDS_ADMIN],
     battle_pass_repository: Annotated[BattlePassRepository, DEPENDS_BATTLE_PASS_REPOSITORY],
     obj: CreateBattlePass,
 ) -> ViewBattlePass:
-    user = await user_repository.read(verification.user_id)
-    if not user.is_admin:
-        raise ForbiddenException()
-
     battle_pass = await battle_pass_repository.create(obj)
     return battle_pass
 
@@ -329,15 +356,10 @@ async def create_battle_pass(
     },
 )
 async def set_battle_pass_to_user(
-    verification: Annotated[VerificationResult, Depends(verify_request)],
-    user_repository: Annotated[UserRepository, DEPENDS_USER_REPOSITORY],
+    verification: Annotated[VerificationResult, DEPENDS_ADMIN],
     battle_pass_repository: Annotated[BattlePassRepository, DEPENDS_BATTLE_PASS_REPOSITORY],
     obj: CreatePersonalAccountBattlePasses,
 ):
-    user = await user_repository.read(verification.user_id)
-    if not user.is_admin:
-        raise ForbiddenException()
-
     await battle_pass_repository.add_to_user(obj)
     return {"success": True}
 
@@ -368,15 +390,10 @@ async def read_event(
     },
 )
 async def create_event(
-    verification: Annotated[VerificationResult, Depends(verify_request)],
-    user_repository: Annotated[UserRepository, DEPENDS_USER_REPOSITORY],
+    verification: Annotated[VerificationResult, DEPENDS_ADMIN],
     event_repository: Annotated[EventRepository, DEPENDS_EVENT_REPOSITORY],
     obj: CreateEvent,
 ) -> ViewEvent:
-    user = await user_repository.read(verification.user_id)
-    if not user.is_admin:
-        raise ForbiddenException()
-
     reward = await event_repository.create(obj)
     return reward
 
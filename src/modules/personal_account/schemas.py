@@ -1,16 +1,30 @@
 import datetime
+from enum import StrEnum
 from typing import Optional
 from pydantic import BaseModel, ConfigDict, Field
 
 from src.storages.sqlalchemy.models.personal_account import RewardType
 
 
+class PersonalAccountInclude(StrEnum):
+    """
+    Relations of a personal account that may be requested along with it
+    """
+
+    REWARDS = "rewards"
+    ACHIEVEMENTS = "achievements"
+    BATTLE_PASSES = "battle_passes"
+
+
 class ViewPersonalAccount(BaseModel):
     model_config = ConfigDict(from_attributes=True)
 
     user_id: int = Field(..., description="Owner User ID", examples=[0])
-    rewards: Optional[list["ViewReward"]] = Field(default_factory=list, description="List of rewards")
-    achievements: Optional[list["ViewAchievement"]] = Field(default_factory=list, description="List of achievements")
+    rewards: Optional[list["ViewReward"]] = Field(None, description="List of rewards (if included)")
+    achievements: Optional[list["ViewAchievement"]] = Field(None, description="List of achievements (if included)")
+    battle_passes: Optional[list["ViewPersonalAccountBattlePass"]] = Field(
+        None, description="Progress in battle passes (if included)"
+    )
     total_exp: int = Field(..., description="Total experience of personal account", examples=[0, 100, 1000])
 
 
@@ -42,6 +56,7 @@ class ViewAchievementWithSummary(BaseModel):
 
     achievement: ViewAchievement
     total_count: int = Field(..., description="Total count of users with this achievement", examples=[0, 1, 2, 3])
+    total_user_count: int = Field(0, description="Total count of users", examples=[0, 1, 2, 3])
     percent: float = Field(..., description="Percent of users with this achievement", examples=[0.0, 0.1, 0.2, 0.3])
 
 
@@ -144,12 +159,30 @@ class ViewPersonalAccountBattlePass(BaseModel):
     personal_account_id: int = Field(..., description="Personal Account ID")
 
 
+class ViewLevelUp(BaseModel):
+    battle_pass_id: int = Field(..., description="Battle pass id")
+    level_id: int = Field(..., description="Level id")
+    value: int = Field(..., description="Level value: the first, the second...", examples=[1, 2, 3, 4, 5])
+    experience: int = Field(..., description="Amount of experience needed to reach this level", examples=[100, 1000])
+    rewards: list[int] = Field(default_factory=list, description="IDs of rewards granted for reaching this level")
+
+
 class ViewLeaderBoard(BaseModel):
     model_config = ConfigDict(from_attributes=True)
 
     total_exp: int = Field(..., description="Total exp of user")
     name: str = Field(..., description="User name")
     id: int = Field(..., description="User ID")
+    place: Optional[int] = Field(
+        None, description="Position in the leaderboard (starting from 1), null on pages requested without after_place"
+    )
+
+
+class ViewLeaderBoardPosition(BaseModel):
+    place: Optional[int] = Field(
+        ..., description="Position of the user in the leaderboard (starting from 1), null if it is too far down"
+    )
+    entries: list[ViewLeaderBoard] = Field(..., description="The user and neighbours around, sorted by place")
 
 
 class ViewEvent(BaseModel):
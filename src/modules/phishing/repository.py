@@ -5,6 +5,8 @@ from typing import Optional
 
 from pydantic import BaseModel
 
+from src.storages.ephemeral import EphemeralStorage
+
 
 class Phishing(BaseModel):
     user_id: int
@@ -14,22 +16,24 @@ class Phishing(BaseModel):
 
 
 class PhishingRepository:
-    _phishing: dict[str, Phishing]  # msg_id -> Phishing
+    NAMESPACE = "phishing"  # msg_id -> Phishing
+    TTL = 7 * 24 * 60 * 60  # unfinished drills are forgotten after a week
     phishing_url = "https://x.innohassle.ru"
+    storage: EphemeralStorage
 
-    def __init__(self):
-        self._phishing = {}
+    def __init__(self, storage: EphemeralStorage):
+        self.storage = storage
 
-    def add_phishing(self, user_id: int, email: str, message_id: str, when_to_send: datetime.datetime) -> None:
-        if message_id in self._phishing:
-            return
-        self._phishing[message_id] = Phishing(
-            user_id=user_id, email=email, message_id=message_id, when_to_send=when_to_send
-        )
+    async def add_phishing(self, user_id: int, email: str, message_id: str, when_to_send: datetime.datetime) -> None:
+        phishing = Phishing(user_id=user_id, email=email, message_id=message_id, when_to_send=when_to_send)
+        await self.storage.add(self.NAMESPACE, message_id, phishing.model_dump(mode="json"), ttl=self.TTL)
 
-    def get_phishing(self, message_id: str) -> Optional[Phishing]:
-        return self._phishing.get(message_id, None)
+    async def get_phishing(self, message_id: str) -> Optional[Phishing]:
+        data = await self.storage.get(self.NAMESPACE, message_id)
+        if data is not None:
+            return Phishing.model_validate(data)
 
-    def pop_phishing(self, message_id: str) -> Optional[Phishing]:
-        if message_id in self._phishing:
-            return self._phishing.pop(message_id)
+    async def pop_phishing(self, message_id: str) -> Optional[Phishing]:
+        data = await self.storage.pop(self.NAMESPACE, message_id)
+        if data is not None:
+            return Phishing.model_validate(data)
@@ -2,10 +2,9 @@ __all__ = ["router"]
 
 import datetime
 import random
-from time import sleep
 from typing import Annotated
 
-from fastapi import APIRouter, BackgroundTasks
+from fastapi import APIRouter
 from starlette.responses import PlainTextResponse
 
 from src.api.dependencies import (
@@ -18,6 +17,7 @@ from src.api.dependencies import (
     DEPENDS_ACHIEVEMENT_REPOSITORY,
     DEPENDS_SMTP_REPOSITORY,
     DEPENDS_USER_REPOSITORY,
+    DEPENDS_SCHEDULED_JOB_REPOSITORY,
 )
 from src.api.exceptions import ObjectNotFound
 from src.config import settings
@@ -31,6 +31,8 @@ from src.modules.personal_account.repository import (
     AchievementRepository,
 )
 from src.modules.personal_account.schemas import CreatePersonalAccountAchievement
+from src.modules.scheduler.repository import ScheduledJobRepository
+from src.modules.smtp.jobs import SEND_MAIL_JOB
 from src.modules.smtp.repository import SMTPRepository
 from src.modules.user.repository import UserRepository
 
@@ -43,7 +45,7 @@ async def phishing_callback(
 ) -> str:
     phishing_repo = Dependencies.get_phishing_repository()
 
-    phish = phishing_repo.get_phishing(messageId)
+    phish = await phishing_repo.get_phishing(messageId)
 
     if phish is not None:
         return "Что-то не так...."
@@ -63,12 +65,12 @@ async def finish_phishing_task(
 ) -> TaskSolveResult:
     _, _, messageId = phishing_url.rpartition("/")
     phishing_repo = Dependencies.get_phishing_repository()
-    phish = phishing_repo.pop_phishing(messageId)
+    phish = await phishing_repo.pop_phishing(messageId)
 
     if phish is not None:
         phish_task = await task_repository.read_task_by_alias("phishing")
         await personal_account.increase_exp(verification.user_id, phish_task.exp)
-        await battle_pass_repository.increase_battle_exp(verification.user_id, phish_task.exp)
+        levels = await battle_pass_repository.increase_battle_exp(verification.user_id, phish_task.exp)
         rewards = [(ass.reward.id, ass.count) for ass in phish_task.rewards_associations]
         await reward_repository.add_rewards_to_personal_account(verification.user_id, rewards)
         await achievement_repository.set_to_personal_account(
@@ -77,7 +79,12 @@ async def finish_phishing_task(
                 achievement_id=100000007,
             )
         )
-        return TaskSolveResult(success=True, rewards=phish_task.rewards, exp=phish_task.exp)
+        return TaskSolveResult(
+            success=True,
+            rewards=[a.reward.id for a in phish_task.rewards_associations],
+            exp=phish_task.exp,
+            levels=levels,
+        )
 
     return TaskSolveResult(success=False)
 
@@ -87,37 +94,20 @@ async def start_phishing_task(
     verification: Annotated[VerificationResult, DEPENDS_VERIFIED_REQUEST],
     user_repository: Annotated[UserRepository, DEPENDS_USER_REPOSITORY],
     smtp_repository: Annotated[SMTPRepository, DEPENDS_SMTP_REPOSITORY],
-    background_tasks: BackgroundTasks,
+    scheduled_job_repository: Annotated[ScheduledJobRepository, DEPENDS_SCHEDULED_JOB_REPOSITORY],
 ):
     phishing_repo = Dependencies.get_phishing_repository()
     message_id = _generate_message_id()
     user = await user_repository.read(verification.user_id)
     # random value from 5 minutes to 60 minutes
-    when_to_send = datetime.datetime.now() + datetime.timedelta(seconds=random.randint(5, 60))
-    when_to_send: datetime.datetime
-    phishing_repo.add_phishing(
+    when_to_send = datetime.datetime.now(datetime.timezone.utc) + datetime.timedelta(seconds=random.randint(5, 60))
+    await phishing_repo.add_phishing(
         user_id=verification.user_id, email=user.email, message_id=message_id, when_to_send=when_to_send
     )
 
     message = smtp_repository.render_message(settings.smtp.phishing_template, user.email, message_id=message_id)
 
-    background_tasks.add_task(
-        delayed_message,
-        message,
-        user.email,
-        when_to_send,
-    )
-
-
-def delayed_message(
-    message: str,
-    to: str,
-    when_to_send: datetime.datetime,
-):
-    while datetime.datetime.now() < when_to_send:
-        sleep(10)
-    smtp_repository = Dependencies.get_smtp_repository()
-    smtp_repository.send(message, to)
+    await scheduled_job_repository.schedule(SEND_MAIL_JOB, {"to": user.email, "message": message}, run_at=when_to_send)
 
 
 def _generate_message_id() -> str:
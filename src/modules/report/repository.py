@@ -0,0 +1,117 @@
+__all__ = ["ReportRepository"]
+
+from typing import AsyncIterator, TypeVar
+
+from pydantic import BaseModel
+from sqlalchemy import TextClause
+
+from src.modules.report.schemas import UserReport, LessonProgressReport, TaskProgressReport
+from src.storages.sqlalchemy.repository import SQLAlchemyRepository
+from src.storages.sqlalchemy.utils import *
+
+M = TypeVar("M", bound=BaseModel)
+
+# answers of every user grouped by task, shared by the progress reports
+_PER_TASK_CTE = """
+    per_task AS (
+        SELECT
+            user_id,
+            task_id,
+            COUNT(*) AS attempts,
+            COUNT(*) FILTER (WHERE is_correct) AS correct_attempts,
+            MIN(timestamp) AS first_attempt_at,
+            MIN(timestamp) FILTER (WHERE is_correct) AS first_correct_at
+        FROM user_task_answers
+        GROUP BY user_id, task_id
+    )
+"""
+
+
+class ReportRepository(SQLAlchemyRepository):
+    BATCH_SIZE = 1000
+
+    USERS_QUERY = text(
+        """
+        SELECT personal_account.user_id, personal_account.total_exp, users.name
+        FROM personal_account
+        INNER JOIN users ON personal_account.user_id = users.id
+        ORDER BY personal_account.user_id
+        """
+    )
+
+    # every user x every lesson, one pass over user_task_answers
+    LESSON_PROGRESS_QUERY = text(
+        f"""
+        WITH {_PER_TASK_CTE},
+        lesson_sizes AS (
+            SELECT test_id AS lesson_id, COUNT(*) AS total_tasks FROM task_association GROUP BY test_id
+        ),
+        matrix AS (
+            SELECT
+                users.id AS user_id,
+                lessons.id AS lesson_id,
+                lessons.alias AS lesson_alias,
+                COALESCE(lesson_sizes.total_tasks, 0) AS total_tasks,
+                COUNT(per_task.first_correct_at) AS solved_tasks,
+                COALESCE(SUM(per_task.attempts), 0) AS attempts,
+                MIN(per_task.first_attempt_at) AS started_at,
+                MAX(per_task.first_correct_at) AS last_solved_at
+            FROM users
+            CROSS JOIN lessons
+            LEFT JOIN lesson_sizes ON lesson_sizes.lesson_id = lessons.id
+            LEFT JOIN task_association ON task_association.test_id = lessons.id
+            LEFT JOIN per_task ON per_task.user_id = users.id AND per_task.task_id = task_association.task_id
+            GROUP BY users.id, lessons.id, lessons.alias, lesson_sizes.total_tasks
+        )
+        SELECT
+            user_id,
+            lesson_id,
+            lesson_alias,
+            total_tasks,
+            solved_tasks,
+            attempts,
+            total_tasks > 0 AND solved_tasks = total_tasks AS completed,
+            started_at,
+            CASE WHEN total_tasks > 0 AND solved_tasks = total_tasks THEN last_solved_at END AS completed_at
+        FROM matrix
+        ORDER BY user_id, lesson_id
+        """
+    )
+
+    TASK_PROGRESS_QUERY = text(
+        f"""
+        WITH {_PER_TASK_CTE}
+        SELECT
+            per_task.user_id,
+            per_task.task_id,
+            tasks.alias AS task_alias,
+            per_task.attempts,
+            per_task.correct_attempts,
+            per_task.first_attempt_at,
+            per_task.first_correct_at
+        FROM per_task
+        INNER JOIN tasks ON tasks.id = per_task.task_id
+        ORDER BY per_task.user_id, per_task.task_id
+        """
+    )
+
+    async def stream_users(self) -> AsyncIterator[list[UserReport]]:
+        async for batch in self._stream(self.USERS_QUERY, UserReport):
+            yield batch
+
+    async def stream_lesson_progress(self) -> AsyncIterator[list[LessonProgressReport]]:
+        async for batch in self._stream(self.LESSON_PROGRESS_QUERY, LessonProgressReport):
+            yield batch
+
+    async def stream_task_progress(self) -> AsyncIterator[list[TaskProgressReport]]:
+        async for batch in self._stream(self.TASK_PROGRESS_QUERY, TaskProgressReport):
+            yield batch
+
+    async def _stream(self, query: TextClause, model: type[M]) -> AsyncIterator[list[M]]:
+        """
+        Read the query with a server-side cursor, `BATCH_SIZE` rows at a time.
+        """
+        async with self._create_session() as session:
+            result = await session.stream(query.execution_options(yield_per=self.BATCH_SIZE))
+            async for rows in result.partitions():
+                yield [model.model_validate(row) for row in rows]
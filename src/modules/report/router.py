@@ -1,45 +1,69 @@
-import csv
-import json
-from typing import Annotated
-from io import StringIO
-
-from fastapi import APIRouter, Depends, Response
-from fastapi.responses import FileResponse
-from starlette.responses import Response
-
-from src.api.dependencies import DEPENDS_USER_REPOSITORY
-from src.api.exceptions import IncorrectCredentialsException, NoCredentialsException, ForbiddenException
-from src.modules.auth.dependencies import verify_request
+from typing import Annotated, AsyncIterator
+
+from fastapi import APIRouter, Query
+from pydantic import BaseModel
+from fastapi.responses import StreamingResponse
+
+from src.api.dependencies import DEPENDS_ADMIN, DEPENDS_REPORT_REPOSITORY
+from src.api.exceptions import IncorrectCredentialsException, NoCredentialsException
 from src.modules.auth.schemas import VerificationResult
-from src.modules.report.schemas import UserReport
-from src.modules.report.utils import get_rows
-from src.modules.user.repository import UserRepository
+from src.modules.report.repository import ReportRepository
+from src.modules.report.schemas import UserReport, LessonProgressReport, TaskProgressReport
+from src.modules.report.utils import ReportFormat, encode_report
 
 router = APIRouter(prefix="/report", tags=["Report"])
 
 
-@router.get(
-    "/",
-    responses={
-        200: {"description": "Export report", "media_type": "text/csv"},
-        **IncorrectCredentialsException.responses,
-        **NoCredentialsException.responses,
+_EXPORT_RESPONSES = {
+    200: {
+        "description": "Export report",
+        "content": {report_format.media_type: {} for report_format in ReportFormat},
     },
-    response_class=FileResponse,
-)
+    **IncorrectCredentialsException.responses,
+    **NoCredentialsException.responses,
+}
+
+FormatQuery = Annotated[ReportFormat, Query(description="Export format")]
+
+
+def _export(
+    batches: AsyncIterator[list[BaseModel]], model: type[BaseModel], report_format: ReportFormat, name: str
+) -> StreamingResponse:
+    return StreamingResponse(
+        encode_report(batches, model, report_format),
+        media_type=report_format.media_type,
+        headers={"Content-Disposition": f'attachment; filename="{name}.{report_format}"'},
+    )
+
+
+@router.get("/", responses=_EXPORT_RESPONSES, response_class=StreamingResponse)
 async def get_report(
-    verification: Annotated[VerificationResult, Depends(verify_request)],
-    user_repository: Annotated[UserRepository, DEPENDS_USER_REPOSITORY],
-) -> Response:
-    user = await user_repository.read(verification.user_id)
-    if not user.is_admin:
-        raise ForbiddenException()
-
-    rows = await get_rows()
-    fieldnames = list(UserReport.model_json_schema()["properties"].keys())
-    out = StringIO()
-    writer = csv.DictWriter(out, fieldnames=fieldnames)
-    writer.writeheader()
-    for row in rows:
-        writer.writerow(json.loads(UserReport(**row.model_dump()).model_dump_json()))
-    return Response(content=out.getvalue(), media_type="text/csv")
+    verification: Annotated[VerificationResult, DEPENDS_ADMIN],
+    report_repository: Annotated[ReportRepository, DEPENDS_REPORT_REPOSITORY],
+    format: FormatQuery = ReportFormat.CSV,
+) -> StreamingResponse:
+    return _export(report_repository.stream_users(), UserReport, format, "report")
+
+
+@router.get("/lesson-progress", responses=_EXPORT_RESPONSES, response_class=StreamingResponse)
+async def get_lesson_progress_report(
+    verification: Annotated[VerificationResult, DEPENDS_ADMIN],
+    report_repository: Annotated[ReportRepository, DEPENDS_REPORT_REPOSITORY],
+    format: FormatQuery = ReportFormat.CSV,
+) -> StreamingResponse:
+    """
+    User x lesson completion matrix: solved tasks, attempts, start and completion time for every pair.
+    """
+    return _export(report_repository.stream_lesson_progress(), LessonProgressReport, format, "lesson-progress")
+
+
+@router.get("/task-progress", responses=_EXPORT_RESPONSES, response_class=StreamingResponse)
+async def get_task_progress_report(
+    verification: Annotated[VerificationResult, DEPENDS_ADMIN],
+    report_repository: Annotated[ReportRepository, DEPENDS_REPORT_REPOSITORY],
+    format: FormatQuery = ReportFormat.CSV,
+) -> StreamingResponse:
+    """
+    Attempts and first correct answer time of every task a user answered.
+    """
+    return _export(report_repository.stream_task_progress(), TaskProgressReport, format, "task-progress")
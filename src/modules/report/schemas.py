@@ -1,3 +1,6 @@
+import datetime
+from typing import Optional
+
 from pydantic import BaseModel, ConfigDict, Field
 
 
@@ -7,3 +10,31 @@ class UserReport(BaseModel):
     user_id: int = Field(..., description="User id")
     name: str = Field(..., description="User name")
     total_exp: int = Field(..., description="Total exp")
+
+
+class LessonProgressReport(BaseModel):
+    model_config = ConfigDict(from_attributes=True)
+
+    user_id: int = Field(..., description="User id")
+    lesson_id: int = Field(..., description="Lesson id")
+    lesson_alias: str = Field(..., description="Lesson alias")
+    total_tasks: int = Field(..., description="Number of tasks in the lesson")
+    solved_tasks: int = Field(..., description="Number of lesson tasks the user solved")
+    attempts: int = Field(..., description="Number of answers to the lesson tasks")
+    completed: bool = Field(..., description="Whether all tasks of the lesson are solved")
+    started_at: Optional[datetime.datetime] = Field(None, description="Time of the first answer")
+    completed_at: Optional[datetime.datetime] = Field(
+        None, description="Time when the last unsolved task got its first correct answer"
+    )
+
+
+class TaskProgressReport(BaseModel):
+    model_config = ConfigDict(from_attributes=True)
+
+    user_id: int = Field(..., description="User id")
+    task_id: int = Field(..., description="Task id")
+    task_alias: str = Field(..., description="Task alias")
+    attempts: int = Field(..., description="Number of answers")
+    correct_attempts: int = Field(..., description="Number of correct answers")
+    first_attempt_at: datetime.datetime = Field(..., description="Time of the first answer")
+    first_correct_at: Optional[datetime.datetime] = Field(None, description="Time of the first correct answer")
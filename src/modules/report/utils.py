@@ -1,14 +1,66 @@
-from src.config import settings
-from src.modules.report.schemas import UserReport
-from src.storages.sqlalchemy import SQLAlchemyStorage
-from src.storages.sqlalchemy.utils import *
-
-
-async def get_rows() -> list[UserReport]:
-    async with SQLAlchemyStorage(settings.database.get_async_engine()).create_session() as session:
-        q = text(
-            """select personal_account.user_id, personal_account.total_exp, users.name from personal_account inner join users on personal_account.user_id=users.id"""
-        )
-        objs = await session.execute(q)
-        if objs:
-            return [UserReport.model_validate(obj) for obj in objs]
+__all__ = ["ReportFormat", "encode_report"]
+
+import csv
+import zlib
+from enum import StrEnum
+from io import StringIO
+from typing import AsyncIterator, Any
+
+from pydantic import BaseModel
+
+Batches = AsyncIterator[list[BaseModel]]
+
+
+class ReportFormat(StrEnum):
+    CSV = "csv"
+    CSV_GZ = "csv.gz"
+    NDJSON = "ndjson"
+
+    @property
+    def media_type(self) -> str:
+        return _MEDIA_TYPES[self]
+
+
+_MEDIA_TYPES = {
+    ReportFormat.CSV: "text/csv",
+    ReportFormat.CSV_GZ: "application/gzip",
+    ReportFormat.NDJSON: "application/x-ndjson",
+}
+
+
+def encode_report(batches: Batches, model: type[BaseModel], report_format: ReportFormat) -> AsyncIterator[Any]:
+    """Encode batches of rows incrementally, one or more chunks per batch."""
+    if report_format == ReportFormat.CSV:
+        return _csv_chunks(batches, model)
+    if report_format == ReportFormat.CSV_GZ:
+        return _gzip_chunks(_csv_chunks(batches, model))
+    if report_format == ReportFormat.NDJSON:
+        return _ndjson_chunks(batches)
+    raise ValueError(f"Unknown report format: {report_format}")
+
+
+async def _csv_chunks(batches: Batches, model: type[BaseModel]) -> AsyncIterator[str]:
+    out = StringIO()
+    writer = csv.DictWriter(out, fieldnames=list(model.model_fields.keys()))
+    writer.writeheader()
+    async for batch in batches:
+        writer.writerows(row.model_dump(mode="json") for row in batch)
+        yield out.getvalue()
+        out.seek(0)
+        out.truncate()
+    if out.tell():
+        yield out.getvalue()
+
+
+async def _gzip_chunks(chunks: AsyncIterator[str]) -> AsyncIterator[bytes]:
+    compressor = zlib.compressobj(wbits=16 + zlib.MAX_WBITS)  # gzip container
+    async for chunk in chunks:
+        compressed = compressor.compress(chunk.encode())
+        if compressed:
+            yield compressed
+    yield compressor.flush()
+
+
+async def _ndjson_chunks(batches: Batches) -> AsyncIterator[str]:
+    async for batch in batches:
+        yield "".join(row.model_dump_json() + "\n" for row in batch)
@@ -0,0 +1,88 @@
+__all__ = ["ScheduledJobRepository"]
+
+import asyncio
+import datetime
+from typing import Any, Optional
+
+from src.modules.scheduler.schemas import ClaimedJob
+from src.storages.sqlalchemy.models import ScheduledJob
+from src.storages.sqlalchemy.repository import SQLAlchemyRepository
+from src.storages.sqlalchemy.unit_of_work import run_after_commit
+from src.storages.sqlalchemy.utils import *
+
+
+class ScheduledJobRepository(SQLAlchemyRepository):
+    """
+    Persistent delayed jobs. They survive restarts and are run by `Scheduler`.
+    """
+
+    CLAIM_QUERY = text(
+        """
+        UPDATE scheduled_jobs
+        SET locked_until = now() + make_interval(secs => :lease),
+            attempts = attempts + 1
+        WHERE id IN (
+            SELECT id FROM scheduled_jobs
+            WHERE failed_at IS NULL
+              AND run_at <= now()
+              AND (locked_until IS NULL OR locked_until < now())
+            ORDER BY run_at
+            LIMIT :limit
+            FOR UPDATE SKIP LOCKED
+        )
+        RETURNING id, kind, payload, attempts
+        """
+    )
+
+    new_job: asyncio.Event
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.new_job = asyncio.Event()
+
+    async def schedule(self, kind: str, payload: dict[str, Any], run_at: datetime.datetime) -> int:
+        async with self._create_session() as session:
+            q = (
+                insert(ScheduledJob)
+                .values(kind=kind, payload=payload, run_at=run_at, attempts=0)
+                .returning(ScheduledJob.id)
+            )
+            id_ = await session.scalar(q)
+            await session.commit()
+
+        run_after_commit(self.new_job.set)
+        return id_
+
+    async def next_run_at(self) -> Optional[datetime.datetime]:
+        """Earliest run time of not claimed jobs."""
+        async with self._create_session() as session:
+            q = select(func.min(ScheduledJob.run_at)).where(
+                ScheduledJob.failed_at.is_(None),
+                or_(ScheduledJob.locked_until.is_(None), ScheduledJob.locked_until < func.now()),
+            )
+            return await session.scalar(q)
+
+    async def claim(self, limit: int, lease: int) -> list[ClaimedJob]:
+        async with self._create_session() as session:
+            rows = (await session.execute(self.CLAIM_QUERY, {"limit": limit, "lease": lease})).all()
+            await session.commit()
+            return [ClaimedJob.model_validate(row, from_attributes=True) for row in rows]
+
+    async def complete(self, id_: int) -> None:
+        async with self._create_session() as session:
+            await session.execute(delete(ScheduledJob).where(ScheduledJob.id == id_))
+            await session.commit()
+
+    async def fail(self, id_: int, error: str, retry_at: Optional[datetime.datetime]) -> None:
+        """
+        Record a failed run. The job is run again at `retry_at`, or kept as failed if it is None.
+        """
+        values = {"locked_until": None, "last_error": error}
+        if retry_at is None:
+            values["failed_at"] = func.now()
+        else:
+            values["run_at"] = retry_at
+
+        async with self._create_session() as session:
+            await session.execute(update(ScheduledJob).where(ScheduledJob.id == id_).values(values))
+            await session.commit()
@@ -0,0 +1,65 @@
+__all__ = ["Scheduler", "JobHandler"]
+
+import datetime
+import logging
+from typing import Any, Awaitable, Callable
+
+from src.config import settings
+from src.modules.scheduler.repository import ScheduledJobRepository
+from src.modules.scheduler.schemas import ClaimedJob
+from src.modules.worker import LeasedWorker
+
+logger = logging.getLogger(__name__)
+
+JobHandler = Callable[[dict[str, Any]], Awaitable[None]]
+
+
+class Scheduler(LeasedWorker[ClaimedJob]):
+    """
+    Runs jobs from `scheduled_jobs` when they are due.
+    It sleeps until the earliest `run_at` (but at most `poll_interval`), so waiting jobs cost no threads.
+    Jobs are claimed with a lease, so every app worker may run its own scheduler.
+    """
+
+    repository: ScheduledJobRepository
+    _handlers: dict[str, JobHandler]  # kind -> handler
+
+    def __init__(self, repository: ScheduledJobRepository):
+        super().__init__("scheduler", repository.new_job)
+        self.repository = repository
+        self._handlers = {}
+
+    def register(self, kind: str, handler: JobHandler) -> None:
+        self._handlers[kind] = handler
+
+    @property
+    def poll_interval(self) -> float:
+        return settings.scheduler.poll_interval
+
+    async def claim(self) -> list[ClaimedJob]:
+        config = settings.scheduler
+        return await self.repository.claim(limit=config.batch_size, lease=config.lease)
+
+    async def idle_timeout(self) -> float:
+        next_run_at = await self.repository.next_run_at()
+        if next_run_at is None:
+            return self.poll_interval
+        delay = (next_run_at - datetime.datetime.now(datetime.timezone.utc)).total_seconds()
+        return min(max(delay, 0), self.poll_interval)
+
+    async def handle(self, job: ClaimedJob) -> None:
+        handler = self._handlers.get(job.kind)
+        try:
+            if handler is None:
+                raise LookupError(f"No handler for job kind {job.kind!r}")
+            await handler(job.payload)
+        except Exception as e:
+            retry_at = None
+            if handler is not None and job.attempts < settings.scheduler.max_attempts:
+                delay = settings.scheduler.retry_delay * 2 ** (job.attempts - 1)
+                retry_at = datetime.datetime.now(datetime.timezone.utc) + datetime.timedelta(seconds=delay)
+            else:
+                logger.warning(f"Giving up job {job.id} ({job.kind}) after {job.attempts} attempts: {e!r}")
+            await self.repository.fail(job.id, repr(e), retry_at)
+        else:
+            await self.repository.complete(job.id)
@@ -0,0 +1,12 @@
+__all__ = ["ClaimedJob"]
+
+from typing import Any
+
+from pydantic import BaseModel, Field
+
+
+class ClaimedJob(BaseModel):
+    id: int
+    kind: str
+    payload: dict[str, Any]
+    attempts: int = Field(..., description="Number of attempts including the current one")
@@ -0,0 +1,12 @@
+__all__ = ["SEND_MAIL_JOB", "send_mail_job"]
+
+from typing import Any
+
+from src.api.dependencies import Dependencies
+
+SEND_MAIL_JOB = "send_mail"
+
+
+async def send_mail_job(payload: dict[str, Any]) -> None:
+    """Put a scheduled email into the outbox. Payload: {"to": str, "message": str}."""
+    await Dependencies.get_mail_outbox_repository().enqueue(payload["to"], payload["message"])
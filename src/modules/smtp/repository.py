@@ -1,29 +1,41 @@
-__all__ = ["SMTPRepository"]
+__all__ = ["SMTPRepository", "MailOutboxRepository"]
 
-import contextlib
+import asyncio
+import datetime
 import smtplib
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
 from email.mime.multipart import MIMEMultipart
 from email.mime.text import MIMEText
+from typing import Optional
 
 from email_validator import validate_email, EmailNotValidError
 
 from src.config import settings
-from src.modules.smtp.schemas import MailingTemplate
+from src.modules.smtp.schemas import MailingTemplate, ClaimedMail
+from src.storages.sqlalchemy.models import MailOutbox, MailStatus
+from src.storages.sqlalchemy.repository import SQLAlchemyRepository
+from src.storages.sqlalchemy.unit_of_work import run_after_commit
+from src.storages.sqlalchemy.utils import *
 
 
 class SMTPRepository:
-    _server: smtplib.SMTP
+    """
+    Sends emails through a pool of persistent SMTP connections.
+    smtplib is blocking, so every pool thread keeps its own connection and reuses it between messages.
+    """
 
-    def __init__(self):
-        self._server = smtplib.SMTP(settings.smtp.server, settings.smtp.port)
+    _executor: ThreadPoolExecutor
+    _local: threading.local
+    _lock: threading.Lock
+    _servers: set[smtplib.SMTP]  # all open connections, to close them on shutdown
 
-    @contextlib.contextmanager
-    def _context(self):
-        self._server.connect(settings.smtp.server, settings.smtp.port)
-        self._server.starttls()
-        self._server.login(settings.smtp.username, settings.smtp.password.get_secret_value())
-        yield
-        self._server.quit()
+    def __init__(self):
+        self._executor = ThreadPoolExecutor(max_workers=settings.smtp.pool_size, thread_name_prefix="smtp")
+        self._local = threading.local()
+        self._lock = threading.Lock()
+        self._servers = set()
 
     def render_message(self, template: "MailingTemplate", target_email: str, **environment) -> str:
         mail = MIMEMultipart("related")
@@ -37,37 +49,169 @@ class SMTPRepository:
 
         return mail.as_string()
 
-    def send(self, message: str, to: str):
+    @staticmethod
+    def normalize_email(email: str) -> str:
         try:
-            valid = validate_email(to)
-            to = valid.normalized
+            return validate_email(email, check_deliverability=False).normalized
         except EmailNotValidError as e:
             raise ValueError(e)
-        with self._context():
-            self._server.sendmail(settings.smtp.username, to, message)
-
-    # def send_connect_email(self, email: str, auth_code: str):
-    #     mail = MIMEMultipart("related")
-    #     # Jinja2 for html template
-    #     main = Template(
-    #         """
-    #         <html>
-    #             <body>
-    #                 <p>Hi!</p>
-    #                 <p>Here is your temporary code for registration: {{ code }}</p>
-    #             </body>
-    #         </html>
-    #         """,
-    #         autoescape=True,
-    #     )
-    #
-    #     html = main.render(code=auth_code)
-    #     msgHtml = MIMEText(html, "html")
-    #     mail.attach(msgHtml)
-    #
-    #     mail["Subject"] = "Registration in Monitoring Service"
-    #     mail["From"] = settings.smtp.username
-    #     mail["To"] = email
-    #
-    #     with self._context():
-    #         self._server.sendmail(settings.smtp.username, email, mail.as_string())
+
+    @staticmethod
+    def is_permanent_error(error: Exception) -> bool:
+        """Whether sending again will not help (bad address or 5xx reply)."""
+        if isinstance(error, (ValueError, smtplib.SMTPRecipientsRefused)):
+            return True
+        if isinstance(error, smtplib.SMTPResponseException):
+            return 500 <= error.smtp_code < 600
+        return False
+
+    async def send(self, message: str, to: str) -> None:
+        to = self.normalize_email(to)
+        await asyncio.get_running_loop().run_in_executor(self._executor, self._send, message, to)
+
+    async def close(self) -> None:
+        await asyncio.to_thread(self._executor.shutdown)
+        with self._lock:
+            servers, self._servers = self._servers, set()
+        for server in servers:
+            self._quit(server)
+
+    # ------------------ runs in pool threads ------------------ #
+
+    def _send(self, message: str, to: str) -> None:
+        # a pooled connection may have been closed by the server, so reconnect once
+        for retry in (False, True):
+            server = self._get_server()
+            try:
+                server.sendmail(settings.smtp.username, to, message)
+            except smtplib.SMTPServerDisconnected:
+                self._drop_server()
+                if retry:
+                    raise
+            except (smtplib.SMTPRecipientsRefused, smtplib.SMTPSenderRefused, smtplib.SMTPDataError):
+                # the connection itself is fine
+                self._local.last_used = time.monotonic()
+                raise
+            except Exception:
+                self._drop_server()
+                raise
+            else:
+                self._local.last_used = time.monotonic()
+                return
+
+    def _get_server(self) -> smtplib.SMTP:
+        server: Optional[smtplib.SMTP] = getattr(self._local, "server", None)
+        if server is not None:
+            idle = time.monotonic() - self._local.last_used
+            if idle < settings.smtp.connection_idle_timeout:
+                return server
+            self._drop_server()
+
+        server = smtplib.SMTP(settings.smtp.server, settings.smtp.port, timeout=30)
+        try:
+            if settings.smtp.starttls:
+                server.starttls()
+            if settings.smtp.password is not None:
+                server.login(settings.smtp.username, settings.smtp.password.get_secret_value())
+        except Exception:
+            server.close()
+            raise
+
+        with self._lock:
+            self._servers.add(server)
+        self._local.server = server
+        self._local.last_used = time.monotonic()
+        return server
+
+    def _drop_server(self) -> None:
+        server: Optional[smtplib.SMTP] = getattr(self._local, "server", None)
+        self._local.server = None
+        if server is not None:
+            with self._lock:
+                self._servers.discard(server)
+            self._quit(server)
+
+    @staticmethod
+    def _quit(server: smtplib.SMTP) -> None:
+        try:
+            server.quit()
+        except smtplib.SMTPException:
+            server.close()
+        except OSError:
+            pass
+
+
+class MailOutboxRepository(SQLAlchemyRepository):
+    """
+    Persistent queue of emails. Requests only insert rows, `MailOutboxWorker` sends them.
+    """
+
+    # Hide due emails from other workers for the lease time.
+    # SKIP LOCKED lets concurrent workers claim different rows without waiting for each other.
+    CLAIM_QUERY = text(
+        """
+        UPDATE mail_outbox
+        SET locked_until = now() + make_interval(secs => :lease),
+            attempts = attempts + 1
+        WHERE id IN (
+            SELECT id FROM mail_outbox
+            WHERE status = 'pending'
+              AND send_after <= now()
+              AND (locked_until IS NULL OR locked_until < now())
+            ORDER BY send_after
+            LIMIT :limit
+            FOR UPDATE SKIP LOCKED
+        )
+        RETURNING id, recipient, message, attempts
+        """
+    )
+
+    new_mail: asyncio.Event
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.new_mail = asyncio.Event()
+
+    async def enqueue(self, to: str, message: str, send_after: Optional[datetime.datetime] = None) -> int:
+        to = SMTPRepository.normalize_email(to)
+        async with self._create_session() as session:
+            values = {"recipient": to, "message": message, "status": MailStatus.pending, "attempts": 0}
+            if send_after is not None:
+                values["send_after"] = send_after
+            q = insert(MailOutbox).values(values).returning(MailOutbox.id)
+            id_ = await session.scalar(q)
+            await session.commit()
+
+        if send_after is None:
+            run_after_commit(self.new_mail.set)
+        return id_
+
+    async def claim(self, limit: int, lease: int) -> list[ClaimedMail]:
+        async with self._create_session() as session:
+            rows = (await session.execute(self.CLAIM_QUERY, {"limit": limit, "lease": lease})).all()
+            await session.commit()
+            return [ClaimedMail.model_validate(row, from_attributes=True) for row in rows]
+
+    async def mark_sent(self, id_: int) -> None:
+        async with self._create_session() as session:
+            q = (
+                update(MailOutbox)
+                .where(MailOutbox.id == id_)
+                .values(status=MailStatus.sent, sent_at=func.now(), locked_until=None, last_error=None)
+            )
+            await session.execute(q)
+            await session.commit()
+
+    async def mark_failed(self, id_: int, error: str, retry_at: Optional[datetime.datetime]) -> None:
+        """
+        Record a failed attempt. The email is retried at `retry_at`, or given up if it is None.
+        """
+        values = {"locked_until": None, "last_error": error}
+        if retry_at is None:
+            values["status"] = MailStatus.failed
+        else:
+            values["send_after"] = retry_at
+
+        async with self._create_session() as session:
+            await session.execute(update(MailOutbox).where(MailOutbox.id == id_).values(values))
+            await session.commit()
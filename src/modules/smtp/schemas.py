@@ -12,3 +12,10 @@ class MailingTemplate(BaseModel):
 
         html = main.render(**environment)
         return html
+
+
+class ClaimedMail(BaseModel):
+    id: int
+    recipient: str
+    message: str
+    attempts: int = Field(..., description="Number of attempts including the current one")
@@ -0,0 +1,53 @@
+__all__ = ["MailOutboxWorker"]
+
+import datetime
+import logging
+from typing import Optional
+
+from src.config import settings
+from src.modules.smtp.repository import SMTPRepository, MailOutboxRepository
+from src.modules.smtp.schemas import ClaimedMail
+from src.modules.worker import LeasedWorker
+
+logger = logging.getLogger(__name__)
+
+
+class MailOutboxWorker(LeasedWorker[ClaimedMail]):
+    """
+    Background task draining the mail outbox.
+    Every app worker runs its own, claimed emails are locked, so each one is sent by a single worker.
+    """
+
+    outbox: MailOutboxRepository
+    smtp: SMTPRepository
+
+    def __init__(self, outbox: MailOutboxRepository, smtp: SMTPRepository):
+        super().__init__("mail-outbox", outbox.new_mail)
+        self.outbox = outbox
+        self.smtp = smtp
+
+    @property
+    def poll_interval(self) -> float:
+        return settings.smtp.outbox.poll_interval
+
+    async def claim(self) -> list[ClaimedMail]:
+        config = settings.smtp.outbox
+        return await self.outbox.claim(limit=config.batch_size, lease=config.lease)
+
+    async def handle(self, mail: ClaimedMail) -> None:
+        try:
+            await self.smtp.send(mail.message, mail.recipient)
+        except Exception as e:
+            retry_at = self._retry_at(mail, e)
+            if retry_at is None:
+                logger.warning(f"Giving up sending email {mail.id} after {mail.attempts} attempts: {e!r}")
+            await self.outbox.mark_failed(mail.id, repr(e), retry_at)
+        else:
+            await self.outbox.mark_sent(mail.id)
+
+    def _retry_at(self, mail: ClaimedMail, error: Exception) -> Optional[datetime.datetime]:
+        config = settings.smtp.outbox
+        if self.smtp.is_permanent_error(error) or mail.attempts >= config.max_attempts:
+            return None
+        delay = min(config.retry_delay * 2 ** (mail.attempts - 1), config.max_retry_delay)
+        return datetime.datetime.now(datetime.timezone.utc) + datetime.timedelta(seconds=delay)
@@ -7,8 +7,8 @@ from sqlalchemy import select, insert
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from src.api.dependencies import Dependencies
-from src.modules.user.schemas import ViewUser, CreateUser
-from src.storages.sqlalchemy.models.users import User, UserTaskAnswer
+from src.modules.user.schemas import ViewUser, CreateUser, CreateUserWithPasswordHash, UserRoles
+from src.storages.sqlalchemy.models.users import User
 from src.storages.sqlalchemy.repository import SQLAlchemyRepository
 
 MIN_USER_ID = 100_000
@@ -37,11 +37,15 @@ class UserRepository(SQLAlchemyRepository):
 
     # ------------------ CRUD ------------------ #
 
-    async def create(self, user: CreateUser) -> ViewUser:
+    async def create(self, user: CreateUser | CreateUserWithPasswordHash) -> ViewUser:
+        if isinstance(user, CreateUser):
+            # hash before taking a connection, hashing may wait for a free worker
+            password_hash = await Dependencies.get_auth_repository().get_password_hash(user.password)
+            user = CreateUserWithPasswordHash(**user.model_dump(exclude={"password"}), password_hash=password_hash)
+
         async with self._create_session() as session:
-            user_dict = user.model_dump(exclude={"password"})
+            user_dict = user.model_dump()
             user_dict["id"] = await _get_available_user_ids(session)
-            user_dict["password_hash"] = Dependencies.get_auth_repository().get_password_hash(user.password)
             q = insert(User).values(user_dict).returning(User)
             new_user = await session.scalar(q)
             await Dependencies.get_personal_account_repository().create(session, new_user.id)
@@ -49,13 +53,14 @@ class UserRepository(SQLAlchemyRepository):
             return ViewUser.model_validate(new_user)
 
     async def create_superuser(self, login: str, password: str, email: str) -> ViewUser:
+        password_hash = await Dependencies.get_auth_repository().get_password_hash(password)
         async with self._create_session() as session:
             user_dict = {
                 "id": await _get_available_user_ids(session),
                 "login": login,
                 "name": "Superuser",
                 "email": email,
-                "password_hash": Dependencies.get_auth_repository().get_password_hash(password),
+                "password_hash": password_hash,
                 "role": "admin",
             }
 
@@ -72,6 +77,13 @@ class UserRepository(SQLAlchemyRepository):
             if user:
                 return ViewUser.model_validate(user, from_attributes=True)
 
+    async def read_role(self, id_: int) -> Optional[UserRoles]:
+        async with self._create_session() as session:
+            q = select(User.role).where(User.id == id_)
+            role = await session.scalar(q)
+            if role:
+                return UserRoles(role)
+
     async def read_by_login(self, login: str) -> Optional["ViewUser"]:
         async with self._create_session() as session:
             q = select(User).where(User.login == login)
@@ -87,13 +99,3 @@ class UserRepository(SQLAlchemyRepository):
                 return ViewUser.model_validate(user, from_attributes=True)
 
     # ^^^^^^^^^^^^^^^^^^^ CRUD ^^^^^^^^^^^^^^^^^^^ #
-
-    async def submit_answer_for_task(self, user_id: int, lesson_id: int, task_id: int, is_correct: bool) -> None:
-        async with self._create_session() as session:
-            q = (
-                insert(UserTaskAnswer)
-                .values(user_id=user_id, lesson_id=lesson_id, task_id=task_id, is_correct=is_correct)
-                .returning(UserTaskAnswer)
-            )
-            await session.execute(q)
-            await session.commit()
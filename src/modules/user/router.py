@@ -4,11 +4,10 @@ from typing import Annotated
 
 from fastapi import APIRouter
 
-from src.api.dependencies import DEPENDS_USER_REPOSITORY, DEPENDS_VERIFIED_REQUEST
+from src.api.dependencies import DEPENDS_ADMIN, DEPENDS_USER_REPOSITORY, DEPENDS_VERIFIED_REQUEST
 from src.api.exceptions import (
     IncorrectCredentialsException,
     NoCredentialsException,
-    ForbiddenException,
 )
 from src.modules.auth.schemas import VerificationResult
 from src.modules.user.repository import UserRepository
@@ -44,16 +43,12 @@ async def get_me(
 async def create_user(
     create_user: CreateUser,
     user_repository: Annotated[UserRepository, DEPENDS_USER_REPOSITORY],
-    verification: Annotated[VerificationResult, DEPENDS_VERIFIED_REQUEST],
+    verification: Annotated[VerificationResult, DEPENDS_ADMIN],
 ) -> ViewUser:
     """
     Create user
     """
 
-    user = await user_repository.read(verification.user_id)
-    if not user.is_admin:
-        raise ForbiddenException()
-
     new_user = await user_repository.create(create_user)
     return new_user
 
@@ -61,15 +56,11 @@ async def create_user(
 @router.get("/")
 async def get_users(
     user_repository: Annotated[UserRepository, DEPENDS_USER_REPOSITORY],
-    verification: Annotated[VerificationResult, DEPENDS_VERIFIED_REQUEST],
+    verification: Annotated[VerificationResult, DEPENDS_ADMIN],
 ) -> list[ViewUser]:
     """
     Get users
     """
 
-    user = await user_repository.read(verification.user_id)
-    if not user.is_admin:
-        raise ForbiddenException()
-
     users = await user_repository.read_all()
     return users
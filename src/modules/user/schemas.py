@@ -1,4 +1,4 @@
-__all__ = ["ViewUser", "CreateUser"]
+__all__ = ["ViewUser", "CreateUser", "CreateUserWithPasswordHash"]
 
 from enum import StrEnum
 from typing import Optional
@@ -31,3 +31,10 @@ class CreateUser(BaseModel):
     password: str
     email: str
     name: str
+
+
+class CreateUserWithPasswordHash(BaseModel):
+    login: str
+    password_hash: str
+    email: str
+    name: str
@@ -0,0 +1,76 @@
+__all__ = ["LeasedWorker"]
+
+import abc
+import asyncio
+import contextlib
+import logging
+from typing import Generic, Optional, Sequence, TypeVar
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+
+class LeasedWorker(abc.ABC, Generic[T]):
+    """
+    Background task running items of a persistent queue.
+    Items are claimed with a lease, so every app worker may run its own and each item is handled by a single one.
+    When nothing is claimed it sleeps until `idle_timeout()` passes or `wakeup` is set by a new item.
+    """
+
+    name: str
+    wakeup: asyncio.Event
+    _task: Optional[asyncio.Task]
+
+    def __init__(self, name: str, wakeup: asyncio.Event):
+        self.name = name
+        self.wakeup = wakeup
+        self._task = None
+
+    @property
+    @abc.abstractmethod
+    def poll_interval(self) -> float:
+        """Longest sleep between claims, also the back off after an error."""
+
+    @abc.abstractmethod
+    async def claim(self) -> Sequence[T]:
+        """Claim a batch of due items with a lease."""
+
+    @abc.abstractmethod
+    async def handle(self, item: T) -> None:
+        """Handle one claimed item and record the outcome, it should not raise."""
+
+    async def idle_timeout(self) -> float:
+        """How long to sleep when nothing was claimed."""
+        return self.poll_interval
+
+    def start(self) -> None:
+        if self._task is None:
+            self._task = asyncio.create_task(self._run(), name=self.name)
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            with contextlib.suppress(asyncio.CancelledError):
+                await self._task
+            self._task = None
+
+    async def run_once(self) -> int:
+        """Handle one batch of claimed items concurrently, return how many were claimed."""
+        items = await self.claim()
+        await asyncio.gather(*(self.handle(item) for item in items))
+        return len(items)
+
+    async def _run(self) -> None:
+        while True:
+            self.wakeup.clear()
+            try:
+                if await self.run_once():
+                    continue
+                timeout = await self.idle_timeout()
+            except Exception:
+                logger.exception(f"Worker {self.name} failed")
+                timeout = self.poll_interval
+
+            with contextlib.suppress(asyncio.TimeoutError):
+                await asyncio.wait_for(self.wakeup.wait(), timeout)
@@ -0,0 +1,136 @@
+__all__ = ["TTLCache", "CatalogCache", "SerializedJSON"]
+
+import asyncio
+import hashlib
+import time
+from collections import OrderedDict
+from typing import Awaitable, Callable, Generic, Hashable, Iterable, Optional, TypeVar
+
+from pydantic import BaseModel
+
+from src.storages.sqlalchemy.unit_of_work import UnitOfWork
+
+V = TypeVar("V")
+
+
+class TTLCache(Generic[V]):
+    """
+    In-process LRU cache with per-entry expiration.
+    It is not shared between workers, so cached values may be stale for up to `ttl` seconds after a write
+    made by another process.
+    """
+
+    maxsize: int
+    ttl: float
+    _data: OrderedDict[Hashable, tuple[float, V]]  # key -> (expires at (monotonic), value)
+
+    def __init__(self, maxsize: int = 128, ttl: float = 60):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._data = OrderedDict()
+
+    def get(self, key: Hashable, default: Optional[V] = None) -> Optional[V]:
+        item = self._data.get(key)
+        if item is None:
+            return default
+        expires_at, value = item
+        if expires_at <= time.monotonic():
+            del self._data[key]
+            return default
+        self._data.move_to_end(key)
+        return value
+
+    def set(self, key: Hashable, value: V, ttl: Optional[float] = None) -> None:
+        ttl = self.ttl if ttl is None else min(ttl, self.ttl)
+        if ttl <= 0:
+            self._data.pop(key, None)
+            return
+        self._data[key] = (time.monotonic() + ttl, value)
+        self._data.move_to_end(key)
+        while len(self._data) > self.maxsize:
+            self._data.popitem(last=False)
+
+    def pop(self, key: Hashable, default: Optional[V] = None) -> Optional[V]:
+        item = self._data.pop(key, None)
+        if item is None:
+            return default
+        return item[1]
+
+    def clear(self) -> None:
+        self._data.clear()
+
+    def __contains__(self, key: Hashable) -> bool:
+        return self.get(key) is not None
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+
+class CatalogCache(Generic[V]):
+    """
+    A single value loaded on demand and dropped by writes, e.g. a serialized catalog.
+    Concurrent misses wait for one load. A value loaded concurrently with a write, or by a request
+    with uncommitted writes, is not cached, so it can not outlive the write; writes made by other workers
+    are noticed after `ttl` seconds.
+    """
+
+    _cache: TTLCache[V]
+    _version: int  # bumped by every invalidation
+    _lock: asyncio.Lock
+
+    def __init__(self, ttl: float = 60):
+        self._cache = TTLCache(maxsize=1, ttl=ttl)
+        self._version = 0
+        self._lock = asyncio.Lock()
+
+    async def get(self, load: Callable[[], Awaitable[V]]) -> V:
+        value = self._cache.get("value")
+        if value is not None:
+            return value
+
+        async with self._lock:
+            value = self._cache.get("value")
+            if value is None:
+                version = self._version
+                value = await load()
+                unit_of_work = UnitOfWork.current()
+                if version == self._version and (unit_of_work is None or not unit_of_work.has_writes):
+                    self._cache.set("value", value)
+            return value
+
+    def invalidate(self) -> None:
+        self._version += 1
+        self._cache.clear()
+        unit_of_work = UnitOfWork.current()
+        if unit_of_work is not None:
+            # the write becomes visible (or is rolled back) only when the request ends
+            unit_of_work.after_close(self.invalidate)
+
+
+class SerializedJSON:
+    """
+    JSON response body serialized once, with a strong ETag derived from its content.
+    Equal content gives equal ETags in every worker, so clients can revalidate against any of them.
+    """
+
+    __slots__ = ("content", "etag")
+
+    content: bytes
+    etag: str
+
+    def __init__(self, content: bytes):
+        self.content = content
+        self.etag = f'"{hashlib.blake2b(content, digest_size=16).hexdigest()}"'
+
+    @classmethod
+    def from_model(cls, model: BaseModel) -> "SerializedJSON":
+        return cls(model.model_dump_json().encode())
+
+    @classmethod
+    def from_models(cls, models: Iterable[BaseModel]) -> "SerializedJSON":
+        return cls.from_parts(model.model_dump_json().encode() for model in models)
+
+    @classmethod
+    def from_parts(cls, parts: Iterable[bytes]) -> "SerializedJSON":
+        """JSON array of already serialized items"""
+        return cls(b"[" + b",".join(parts) + b"]")
@@ -0,0 +1,5 @@
+from src.storages.ephemeral.storage import EphemeralStorage
+from src.storages.ephemeral.memory import MemoryEphemeralStorage
+from src.storages.ephemeral.postgres import PostgresEphemeralStorage
+
+__all__ = ["EphemeralStorage", "MemoryEphemeralStorage", "PostgresEphemeralStorage"]
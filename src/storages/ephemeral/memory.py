@@ -0,0 +1,49 @@
+__all__ = ["MemoryEphemeralStorage"]
+
+import copy
+import time
+from typing import Any, Optional
+
+from src.storages.ephemeral.storage import EphemeralStorage
+
+
+class MemoryEphemeralStorage(EphemeralStorage):
+    """
+    Per-process storage. Use it for tests and single-worker setups only.
+    """
+
+    _data: dict[tuple[str, str], tuple[float, dict[str, Any]]]  # (namespace, key) -> (expires at (monotonic), value)
+
+    def __init__(self):
+        self._data = {}
+
+    async def get(self, namespace: str, key: str) -> Optional[dict[str, Any]]:
+        item = self._data.get((namespace, key))
+        if item is None:
+            return None
+        expires_at, value = item
+        if expires_at <= time.monotonic():
+            del self._data[(namespace, key)]
+            return None
+        return copy.deepcopy(value)
+
+    async def set(self, namespace: str, key: str, value: dict[str, Any], ttl: float) -> None:
+        self._data[(namespace, key)] = (time.monotonic() + ttl, copy.deepcopy(value))
+
+    async def add(self, namespace: str, key: str, value: dict[str, Any], ttl: float) -> bool:
+        if await self.get(namespace, key) is not None:
+            return False
+        await self.set(namespace, key, value, ttl)
+        return True
+
+    async def pop(self, namespace: str, key: str) -> Optional[dict[str, Any]]:
+        value = await self.get(namespace, key)
+        self._data.pop((namespace, key), None)
+        return value
+
+    async def purge_expired(self) -> int:
+        now = time.monotonic()
+        expired = [k for k, (expires_at, _) in self._data.items() if expires_at <= now]
+        for k in expired:
+            del self._data[k]
+        return len(expired)
@@ -0,0 +1,82 @@
+__all__ = ["PostgresEphemeralStorage"]
+
+from typing import Any, Optional
+
+from src.storages.ephemeral.storage import EphemeralStorage
+from src.storages.sqlalchemy import SQLAlchemyStorage
+from src.storages.sqlalchemy.models import EphemeralState
+from src.storages.sqlalchemy.utils import *
+
+
+class PostgresEphemeralStorage(EphemeralStorage):
+    """
+    Storage in the UNLOGGED `ephemeral_state` table, shared by all app workers.
+    Expired rows are invisible at once and deleted by the background cleanup.
+    """
+
+    SET_QUERY = text(
+        """
+        INSERT INTO ephemeral_state (namespace, key, value, expires_at)
+        VALUES (:namespace, :key, :value, now() + make_interval(secs => :ttl))
+        ON CONFLICT (namespace, key) DO UPDATE
+        SET value = excluded.value, expires_at = excluded.expires_at
+        """
+    ).bindparams(bindparam("value", type_=EphemeralState.value.type))
+
+    # replaces only an expired entry
+    ADD_QUERY = text(
+        """
+        INSERT INTO ephemeral_state (namespace, key, value, expires_at)
+        VALUES (:namespace, :key, :value, now() + make_interval(secs => :ttl))
+        ON CONFLICT (namespace, key) DO UPDATE
+        SET value = excluded.value, expires_at = excluded.expires_at
+        WHERE ephemeral_state.expires_at <= now()
+        RETURNING true
+        """
+    ).bindparams(bindparam("value", type_=EphemeralState.value.type))
+
+    storage: SQLAlchemyStorage
+
+    def __init__(self, storage: SQLAlchemyStorage):
+        self.storage = storage
+
+    async def get(self, namespace: str, key: str) -> Optional[dict[str, Any]]:
+        async with self.storage.create_session() as session:
+            q = select(EphemeralState.value).where(
+                EphemeralState.namespace == namespace,
+                EphemeralState.key == key,
+                EphemeralState.expires_at > func.now(),
+            )
+            return await session.scalar(q)
+
+    async def set(self, namespace: str, key: str, value: dict[str, Any], ttl: float) -> None:
+        async with self.storage.create_session() as session:
+            await session.execute(self.SET_QUERY, {"namespace": namespace, "key": key, "value": value, "ttl": ttl})
+            await session.commit()
+
+    async def add(self, namespace: str, key: str, value: dict[str, Any], ttl: float) -> bool:
+        async with self.storage.create_session() as session:
+            params = {"namespace": namespace, "key": key, "value": value, "ttl": ttl}
+            added = await session.scalar(self.ADD_QUERY, params)
+            await session.commit()
+            return bool(added)
+
+    async def pop(self, namespace: str, key: str) -> Optional[dict[str, Any]]:
+        async with self.storage.create_session() as session:
+            q = (
+                delete(EphemeralState)
+                .where(EphemeralState.namespace == namespace, EphemeralState.key == key)
+                .returning(EphemeralState.value, EphemeralState.expires_at > func.now())
+            )
+            row = (await session.execute(q)).one_or_none()
+            await session.commit()
+            if row is None:
+                return None
+            value, alive = row
+            return value if alive else None
+
+    async def purge_expired(self) -> int:
+        async with self.storage.create_session() as session:
+            result = await session.execute(delete(EphemeralState).where(EphemeralState.expires_at <= func.now()))
+            await session.commit()
+            return result.rowcount
@@ -0,0 +1,59 @@
+__all__ = ["EphemeralStorage"]
+
+import abc
+import asyncio
+import contextlib
+import logging
+from typing import Any, Optional
+
+logger = logging.getLogger(__name__)
+
+
+class EphemeralStorage(abc.ABC):
+    """
+    Key-value storage for short-lived state shared between app workers.
+    Values are JSON-compatible dicts, every entry expires after its ttl.
+    Keys are grouped by namespace, so different modules do not clash.
+    """
+
+    _cleanup_task: Optional[asyncio.Task] = None
+
+    @abc.abstractmethod
+    async def get(self, namespace: str, key: str) -> Optional[dict[str, Any]]:
+        ...
+
+    @abc.abstractmethod
+    async def set(self, namespace: str, key: str, value: dict[str, Any], ttl: float) -> None:
+        """Create or replace the entry, it expires in `ttl` seconds."""
+
+    @abc.abstractmethod
+    async def add(self, namespace: str, key: str, value: dict[str, Any], ttl: float) -> bool:
+        """Create the entry if there is no live one. Return False if it already exists."""
+
+    @abc.abstractmethod
+    async def pop(self, namespace: str, key: str) -> Optional[dict[str, Any]]:
+        """Atomically remove the entry and return it, so only one caller gets it."""
+
+    @abc.abstractmethod
+    async def purge_expired(self) -> int:
+        """Remove expired entries, return how many were removed."""
+
+    def start_cleanup(self, interval: float) -> None:
+        """Purge expired entries in background every `interval` seconds."""
+        if self._cleanup_task is None:
+            self._cleanup_task = asyncio.create_task(self._cleanup(interval), name="ephemeral-cleanup")
+
+    async def close(self) -> None:
+        if self._cleanup_task is not None:
+            self._cleanup_task.cancel()
+            with contextlib.suppress(asyncio.CancelledError):
+                await self._cleanup_task
+            self._cleanup_task = None
+
+    async def _cleanup(self, interval: float) -> None:
+        while True:
+            await asyncio.sleep(interval)
+            try:
+                await self.purge_expired()
+            except Exception:
+                logger.exception("Failed to purge expired ephemeral state")
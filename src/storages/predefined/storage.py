@@ -1,7 +1,12 @@
 import datetime
+import hashlib
+import logging
+import os
+import pickle
 from pathlib import Path
-from typing import Optional
+from typing import ClassVar, Optional
 
+import pydantic
 import yaml
 from pydantic import BaseModel, Field
 
@@ -111,6 +116,76 @@ class Predefined(BaseModel):
     @classmethod
     def from_yaml(cls, path: Path):
         with open(path, "r", encoding="utf-8") as f:
-            yaml_config = yaml.safe_load(f)
+            yaml_config = yaml.load(f, Loader=_YamlLoader)
 
         return cls.model_validate(yaml_config)
+
+    # ------------------ Snapshot ------------------ #
+    # Validated data pickled next to the yaml file: magic line, header (schema and source hashes), model.
+    # It is a build artifact made by scripts/compile_predefined.py, so unpickling it is trusted.
+
+    SNAPSHOT_MAGIC: ClassVar[bytes] = b"predefined-snapshot-v1\n"
+
+    @classmethod
+    def snapshot_path(cls, path: Path) -> Path:
+        return path.with_suffix(".pickle")
+
+    @classmethod
+    def schema_hash(cls) -> str:
+        # models are defined in this module, enums they use come from the database models;
+        # cheaper than hashing model_json_schema(), which takes longer than parsing the yaml itself
+        digest = hashlib.sha256(pydantic.VERSION.encode())
+        digest.update(Path(__file__).read_bytes())
+        for enum in (StepType, RewardType, ConditionType):
+            digest.update(repr(list(enum)).encode())
+        return digest.hexdigest()
+
+    @classmethod
+    def compile_snapshot(cls, path: Path) -> Path:
+        source = path.read_bytes()
+        predefined = cls.model_validate(yaml.load(source, Loader=_YamlLoader))
+        header = {"schema": cls.schema_hash(), "source": hashlib.sha256(source).hexdigest()}
+
+        snapshot_path = cls.snapshot_path(path)
+        tmp_path = snapshot_path.with_suffix(".pickle.tmp")
+        with open(tmp_path, "wb") as f:
+            f.write(cls.SNAPSHOT_MAGIC)
+            pickle.dump(header, f, protocol=pickle.HIGHEST_PROTOCOL)
+            pickle.dump(predefined, f, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(tmp_path, snapshot_path)
+        return snapshot_path
+
+    @classmethod
+    def load(cls, path: Path) -> "Predefined":
+        """
+        Load from the snapshot if it was compiled from the current yaml file with the current schema,
+        parse the yaml file otherwise.
+        """
+        predefined = cls._load_snapshot(path)
+        if predefined is None:
+            return cls.from_yaml(path)
+        return predefined
+
+    @classmethod
+    def _load_snapshot(cls, path: Path) -> Optional["Predefined"]:
+        snapshot_path = cls.snapshot_path(path)
+        if not snapshot_path.exists():
+            return None
+        try:
+            with open(snapshot_path, "rb") as f:
+                if f.read(len(cls.SNAPSHOT_MAGIC)) != cls.SNAPSHOT_MAGIC:
+                    return None
+                header = pickle.load(f)
+                source_hash = hashlib.sha256(path.read_bytes()).hexdigest()
+                if header.get("source") != source_hash or header.get("schema") != cls.schema_hash():
+                    logging.info(f"Predefined snapshot {snapshot_path} is stale, parsing {path}")
+                    return None
+                predefined = pickle.load(f)
+        except Exception as e:
+            logging.warning(f"Failed to load predefined snapshot {snapshot_path}: {e!r}")
+            return None
+        return predefined if isinstance(predefined, cls) else None
+
+
+# libyaml bindings are several times faster, if PyYAML was built with them
+_YamlLoader = getattr(yaml, "CSafeLoader", yaml.SafeLoader)
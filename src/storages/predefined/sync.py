@@ -0,0 +1,235 @@
+__all__ = ["PredefinedSync"]
+
+import hashlib
+from typing import Iterable
+
+from pydantic import BaseModel
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from src.storages.predefined.storage import Predefined
+from src.storages.sqlalchemy.models import (
+    Achievement,
+    BattlePass,
+    Consultant,
+    Level,
+    LevelRewards,
+    PersonalAccountAchievements,
+    PersonalAccountBattlePasses,
+    PredefinedState,
+    Reward,
+    Task,
+    Timeslot,
+    TaskAssociation,
+    Lesson,
+)
+from src.storages.sqlalchemy.models.lesson import TaskReward, ConditionType
+from src.storages.sqlalchemy.repository import SQLAlchemyRepository
+from src.storages.sqlalchemy.utils import *
+
+
+def _hash(*parts: BaseModel | str | int) -> str:
+    digest = hashlib.sha256()
+    for part in parts:
+        digest.update(part.model_dump_json().encode() if isinstance(part, BaseModel) else str(part).encode())
+        digest.update(b"\0")
+    return digest.hexdigest()
+
+
+class PredefinedSync(SQLAlchemyRepository):
+    """
+    Applies predefined data to the database in one transaction.
+    Hashes of applied entities are kept in `predefined_state`, so unchanged entities are skipped
+    and an unchanged file costs a single query. Changed entities are written with bulk upserts.
+    """
+
+    # pg_advisory_xact_lock key, makes workers starting at once seed one after another
+    LOCK_ID = 7_024_591_338
+    TOTAL_KEY = "predefined"
+
+    async def sync(self, predefined: Predefined, superuser_id: int) -> bool:
+        """
+        Return True if anything was written.
+        """
+        hashes = {self.TOTAL_KEY: _hash(predefined, superuser_id)}
+        hashes.update({f"reward:{obj.id}": _hash(obj) for obj in predefined.rewards})
+        hashes.update({f"achievement:{obj.id}": _hash(obj) for obj in predefined.achievements})
+        hashes.update({f"consultant:{obj.id}": _hash(obj) for obj in predefined.consultants})
+        hashes.update({f"battle_pass:{obj.id}": _hash(obj) for obj in predefined.battle_passes})
+        hashes.update({f"task:{obj.alias}": _hash(obj) for obj in predefined.tasks})
+        hashes.update({f"lesson:{obj.alias}": _hash(obj) for obj in predefined.lessons})
+
+        async with self._create_session() as session:
+            await session.execute(text("SELECT pg_advisory_xact_lock(:id)"), {"id": self.LOCK_ID})
+            stored = dict((await session.execute(select(PredefinedState.key, PredefinedState.hash))).all())
+            if stored.get(self.TOTAL_KEY) == hashes[self.TOTAL_KEY]:
+                await session.commit()
+                return False
+
+            changed = {key for key, hash_ in hashes.items() if stored.get(key) != hash_}
+
+            def pick(prefix: str, objects: Iterable, key: str):
+                return [obj for obj in objects if f"{prefix}:{getattr(obj, key)}" in changed]
+
+            await self._sync_rewards(session, pick("reward", predefined.rewards, "id"))
+            await self._sync_achievements(session, pick("achievement", predefined.achievements, "id"))
+            await self._sync_consultants(session, pick("consultant", predefined.consultants, "id"))
+            await self._sync_battle_passes(session, pick("battle_pass", predefined.battle_passes, "id"))
+            changed_tasks = pick("task", predefined.tasks, "alias")
+            await self._sync_tasks(session, changed_tasks)
+            # new tasks have to be linked to lessons that already list them
+            changed_task_aliases = {task.alias for task in changed_tasks}
+            changed_lessons = [
+                lesson
+                for lesson in predefined.lessons
+                if f"lesson:{lesson.alias}" in changed or changed_task_aliases.intersection(lesson.tasks)
+            ]
+            await self._sync_lessons(session, changed_lessons)
+            await self._grant_to_superuser(session, predefined, superuser_id)
+
+            q = pg_insert(PredefinedState).values([{"key": key, "hash": hashes[key]} for key in sorted(changed)])
+            q = q.on_conflict_do_update(index_elements=[PredefinedState.key], set_={"hash": q.excluded.hash})
+            await session.execute(q)
+            await session.commit()
+            return True
+
+    @staticmethod
+    async def _upsert(session: AsyncSession, model, rows: list[dict], index_elements: list[str], returning=()):
+        q = pg_insert(model).values(rows)
+        update_columns = {key: q.excluded[key] for key in rows[0] if key not in index_elements}
+        q = q.on_conflict_do_update(index_elements=index_elements, set_=update_columns)
+        if returning:
+            q = q.returning(*returning)
+        return await session.execute(q)
+
+    async def _sync_rewards(self, session: AsyncSession, rewards: list) -> None:
+        if not rewards:
+            return
+        rows = [reward.model_dump() for reward in rewards]
+        await self._upsert(session, Reward, rows, ["id"])
+
+    async def _sync_achievements(self, session: AsyncSession, achievements: list) -> None:
+        if not achievements:
+            return
+        rows = [achievement.model_dump() for achievement in achievements]
+        await self._upsert(session, Achievement, rows, ["id"])
+
+    async def _sync_consultants(self, session: AsyncSession, consultants: list) -> None:
+        if not consultants:
+            return
+        rows = [consultant.model_dump(exclude={"timeslots"}) for consultant in consultants]
+        await self._upsert(session, Consultant, rows, ["id"])
+
+        ids = [consultant.id for consultant in consultants]
+        await session.execute(delete(Timeslot).where(Timeslot.consultant_id.in_(ids)))
+        timeslots = [
+            {**timeslot.model_dump(), "consultant_id": consultant.id}
+            for consultant in consultants
+            for timeslot in consultant.timeslots
+        ]
+        if timeslots:
+            await session.execute(insert(Timeslot).values(timeslots))
+
+    async def _sync_battle_passes(self, session: AsyncSession, battle_passes: list) -> None:
+        if not battle_passes:
+            return
+        rows = [battle_pass.model_dump(exclude={"levels"}) for battle_pass in battle_passes]
+        await self._upsert(session, BattlePass, rows, ["id"])
+
+        ids = [battle_pass.id for battle_pass in battle_passes]
+        level_ids = select(Level.id).where(Level.battle_pass_id.in_(ids)).scalar_subquery()
+        await session.execute(delete(LevelRewards).where(LevelRewards.level_id.in_(level_ids)))
+        await session.execute(delete(Level).where(Level.battle_pass_id.in_(ids)))
+
+        levels = [(battle_pass.id, level) for battle_pass in battle_passes for level in battle_pass.levels]
+        if not levels:
+            return
+        q = (
+            insert(Level)
+            .values(
+                [
+                    {"battle_pass_id": battle_pass_id, "experience": level.experience, "value": level.value}
+                    for battle_pass_id, level in levels
+                ]
+            )
+            .returning(Level.id, Level.battle_pass_id, Level.value)
+        )
+        level_id_by_key = {(row.battle_pass_id, row.value): row.id for row in await session.execute(q)}
+        level_rewards = [
+            {"level_id": level_id_by_key[(battle_pass_id, level.value)], "reward_id": reward_id}
+            for battle_pass_id, level in levels
+            for reward_id in level.rewards
+        ]
+        if level_rewards:
+            await session.execute(insert(LevelRewards).values(level_rewards))
+
+    async def _sync_tasks(self, session: AsyncSession, tasks: list) -> None:
+        if not tasks:
+            return
+        rows = [
+            {
+                **task.model_dump(exclude={"rewards"}),
+                "title": task.title or "",
+                "exp": task.exp or 0,
+            }
+            for task in tasks
+        ]
+        result = await self._upsert(session, Task, rows, ["alias"], returning=(Task.id, Task.alias))
+        task_id_by_alias = {row.alias: row.id for row in result}
+
+        await session.execute(delete(TaskReward).where(TaskReward.task_id.in_(list(task_id_by_alias.values()))))
+        task_rewards = [
+            {"task_id": task_id_by_alias[task.alias], "reward_id": entry.reward_id, "count": entry.count}
+            for task in tasks
+            for entry in task.rewards
+        ]
+        if task_rewards:
+            await session.execute(insert(TaskReward).values(task_rewards))
+
+    async def _sync_lessons(self, session: AsyncSession, lessons: list) -> None:
+        if not lessons:
+            return
+        rows = [
+            {
+                **lesson.model_dump(exclude={"tasks"}),
+                "condition_type": lesson.condition_type or ConditionType.nothing,
+            }
+            for lesson in lessons
+        ]
+        result = await self._upsert(session, Lesson, rows, ["alias"], returning=(Lesson.id, Lesson.alias))
+        lesson_id_by_alias = {row.alias: row.id for row in result}
+
+        await session.execute(
+            delete(TaskAssociation).where(TaskAssociation.test_id.in_(list(lesson_id_by_alias.values())))
+        )
+        task_aliases = {alias for lesson in lessons for alias in lesson.tasks}
+        task_id_by_alias = dict(
+            (await session.execute(select(Task.alias, Task.id).where(Task.alias.in_(task_aliases)))).all()
+        )
+        associations = [
+            {"test_id": lesson_id_by_alias[lesson.alias], "task_id": task_id_by_alias[alias], "order": i}
+            for lesson in lessons
+            for i, alias in enumerate(lesson.tasks)
+            if alias in task_id_by_alias
+        ]
+        if associations:
+            await session.execute(insert(TaskAssociation).values(associations))
+
+    @staticmethod
+    async def _grant_to_superuser(session: AsyncSession, predefined: Predefined, superuser_id: int) -> None:
+        if predefined.achievements:
+            q = pg_insert(PersonalAccountAchievements).values(
+                [
+                    {"personal_account_id": superuser_id, "achievement_id": achievement.id}
+                    for achievement in predefined.achievements
+                ]
+            )
+            await session.execute(q.on_conflict_do_nothing())
+        if predefined.battle_passes:
+            q = pg_insert(PersonalAccountBattlePasses).values(
+                [
+                    {"personal_account_id": superuser_id, "battle_pass_id": battle_pass.id, "experience": 0}
+                    for battle_pass in predefined.battle_passes
+                ]
+            )
+            await session.execute(q.on_conflict_do_nothing())
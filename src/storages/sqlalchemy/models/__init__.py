@@ -16,6 +16,10 @@ from src.storages.sqlalchemy.models.personal_account import (
 from src.storages.sqlalchemy.models.users import User, UserTaskAnswer
 from src.storages.sqlalchemy.models.lesson import Lesson, Task, TaskAssociation, StepType
 from src.storages.sqlalchemy.models.consultation import Consultant, Timeslot, Appointment
+from src.storages.sqlalchemy.models.mail import MailOutbox, MailStatus
+from src.storages.sqlalchemy.models.scheduler import ScheduledJob
+from src.storages.sqlalchemy.models.ephemeral import EphemeralState
+from src.storages.sqlalchemy.models.predefined import PredefinedState
 
 __all__ = [
     "Base",
@@ -40,4 +44,9 @@ __all__ = [
     "Appointment",
     "Event",
     "EventParticipants",
+    "MailOutbox",
+    "MailStatus",
+    "ScheduledJob",
+    "EphemeralState",
+    "PredefinedState",
 ]
@@ -20,7 +20,7 @@ class Consultant(Base, IdMixin):
 class Timeslot(Base, IdMixin):
     __tablename__ = "timeslots"
 
-    consultant_id: Mapped[int] = mapped_column(ForeignKey(Consultant.id), nullable=False)
+    consultant_id: Mapped[int] = mapped_column(ForeignKey(Consultant.id), nullable=False, index=True)
     day: Mapped[int] = mapped_column(nullable=False)
     start: Mapped[str] = mapped_column(nullable=False)
     end: Mapped[str] = mapped_column(nullable=False)
@@ -32,9 +32,9 @@ class Appointment(Base, IdMixin):
     __tablename__ = "appointments"
 
     date: Mapped[datetime.date] = mapped_column(DateTime(timezone=True), nullable=False)
-    consultant_id: Mapped[int] = mapped_column(ForeignKey(Consultant.id), nullable=False)
+    consultant_id: Mapped[int] = mapped_column(ForeignKey(Consultant.id), nullable=False, index=True)
     user_id: Mapped[int] = mapped_column(ForeignKey("users.id"), nullable=False)
-    timeslot_id: Mapped[int] = mapped_column(ForeignKey(Timeslot.id), nullable=False)
+    timeslot_id: Mapped[int] = mapped_column(ForeignKey(Timeslot.id), nullable=False, index=True)
     comment: Mapped[str] = mapped_column(nullable=True, default="")
     consultant: Mapped[Consultant] = relationship("Consultant", back_populates="appointments", viewonly=True)
     timeslot: Mapped[Timeslot] = relationship("Timeslot", back_populates="appointments", lazy="joined", viewonly=True)
@@ -0,0 +1,24 @@
+__all__ = ["EphemeralState"]
+
+import datetime
+from typing import Any
+
+from sqlalchemy.dialects.postgresql import JSONB
+
+from src.storages.sqlalchemy.models.base import Base
+from src.storages.sqlalchemy.utils import *
+
+
+class EphemeralState(Base):
+    """
+    Короткоживущее состояние (незавершённые регистрации, фишинг).
+    Таблица UNLOGGED: быстрее на запись, но очищается после сбоя базы
+    """
+
+    __tablename__ = "ephemeral_state"
+    __table_args__ = {"prefixes": ["UNLOGGED"]}
+
+    namespace: Mapped[str] = mapped_column(primary_key=True)
+    key: Mapped[str] = mapped_column(primary_key=True)
+    value: Mapped[dict[str, Any]] = mapped_column(JSONB, nullable=False)
+    expires_at: Mapped[datetime.datetime] = mapped_column(DateTime(timezone=True), nullable=False, index=True)
@@ -24,7 +24,7 @@ class Event(Base, IdMixin):
     date_end: Mapped[datetime.date] = mapped_column(Date(), nullable=False)
     battle_pass_only: Mapped[bool] = mapped_column(nullable=False, default=False)
     participants: Mapped[Optional[list["PersonalAccount"]]] = relationship(
-        "PersonalAccount", secondary="event_participants", lazy="selectin"
+        "PersonalAccount", secondary="event_participants", lazy="raise"
     )
     is_active: Mapped[bool] = mapped_column(nullable=False, default=False)
 
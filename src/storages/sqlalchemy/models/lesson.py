@@ -67,7 +67,7 @@ class TaskAssociation(Base):
     __tablename__ = "task_association"
 
     test_id: Mapped[int] = mapped_column(ForeignKey(Lesson.id), primary_key=True)
-    task_id: Mapped[int] = mapped_column(ForeignKey(Task.id), primary_key=True)
+    task_id: Mapped[int] = mapped_column(ForeignKey(Task.id), primary_key=True, index=True)
     order: Mapped[int] = mapped_column(nullable=False, default=0)
     lesson: Mapped[Lesson] = relationship(Lesson, viewonly=True)
     task: Mapped[Task] = relationship(Task, lazy="joined", viewonly=True)
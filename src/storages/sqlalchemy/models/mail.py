@@ -0,0 +1,43 @@
+__all__ = ["MailOutbox", "MailStatus"]
+
+import datetime
+from enum import StrEnum
+from typing import Optional
+
+from sqlalchemy import BigInteger, Identity, Text
+from sqlalchemy.sql.functions import now
+
+from src.storages.sqlalchemy.models.base import Base
+from src.storages.sqlalchemy.utils import *
+
+
+class MailStatus(StrEnum):
+    pending = "pending"
+    sent = "sent"
+    failed = "failed"
+
+
+class MailOutbox(Base):
+    """
+    Письма, ожидающие отправки
+    """
+
+    __tablename__ = "mail_outbox"
+
+    id: Mapped[int] = mapped_column(BigInteger, Identity(), primary_key=True)
+    recipient: Mapped[str] = mapped_column(nullable=False)
+    message: Mapped[str] = mapped_column(Text, nullable=False)
+    status: Mapped[MailStatus] = mapped_column(SQLEnum(MailStatus), nullable=False, default=MailStatus.pending)
+    attempts: Mapped[int] = mapped_column(nullable=False, default=0)
+    send_after: Mapped[datetime.datetime] = mapped_column(DateTime(timezone=True), nullable=False, server_default=now())
+    locked_until: Mapped[Optional[datetime.datetime]] = mapped_column(DateTime(timezone=True), nullable=True)
+    last_error: Mapped[Optional[str]] = mapped_column(nullable=True)
+    created_at: Mapped[datetime.datetime] = mapped_column(DateTime(timezone=True), nullable=False, server_default=now())
+    sent_at: Mapped[Optional[datetime.datetime]] = mapped_column(DateTime(timezone=True), nullable=True)
+
+
+Index(
+    "ix_mail_outbox_pending_send_after",
+    MailOutbox.send_after,
+    postgresql_where=MailOutbox.status == MailStatus.pending,
+)
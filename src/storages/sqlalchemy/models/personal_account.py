@@ -32,21 +32,26 @@ class PersonalAccount(Base):
 
     user_id: Mapped[int] = mapped_column(ForeignKey("users.id"), primary_key=True)
     total_exp: Mapped[int] = mapped_column(nullable=False, default=0)
+    # relationships are not loaded implicitly, repositories read what they need with explicit queries
     rewards: Mapped[Optional[list["Reward"]]] = relationship(
-        "Reward", secondary="personal_account_rewards", lazy="selectin"
+        "Reward", secondary="personal_account_rewards", lazy="raise"
     )
     achievements: Mapped[Optional[list["Achievement"]]] = relationship(
-        "Achievement", secondary="personal_account_achievements", lazy="selectin"
+        "Achievement", secondary="personal_account_achievements", lazy="raise"
     )
     battle_passes: Mapped[Optional[list["BattlePass"]]] = relationship(
         "BattlePass",
         secondary="personal_account_battle_passes",
-        lazy="selectin",
+        lazy="raise",
         viewonly=True,
         secondaryjoin="and_(BattlePass.id == PersonalAccountBattlePasses.battle_pass_id)",
     )
 
 
+# Leaderboard order, keeps ranking and keyset pagination O(page)
+Index("ix_personal_account_total_exp_user_id", PersonalAccount.total_exp.desc(), PersonalAccount.user_id)
+
+
 class BattlePass(Base, IdMixin):
     """
     Глобальная сущность БП
@@ -57,7 +62,7 @@ class BattlePass(Base, IdMixin):
     name: Mapped[str] = mapped_column(nullable=False)
     date_start: Mapped[datetime.date] = mapped_column(Date(), nullable=False)
     date_end: Mapped[datetime.date] = mapped_column(Date(), nullable=False)
-    levels: Mapped[Optional[list["Level"]]] = relationship("Level", lazy="selectin")
+    levels: Mapped[Optional[list["Level"]]] = relationship("Level", lazy="raise")
     is_active: Mapped[bool] = mapped_column(nullable=False, default=True)
 
 
@@ -69,7 +74,7 @@ class PersonalAccountBattlePasses(Base):
     __tablename__ = "personal_account_battle_passes"
 
     battle_pass_id: Mapped[int] = mapped_column(ForeignKey(BattlePass.id), primary_key=True)
-    personal_account_id: Mapped[int] = mapped_column(ForeignKey(PersonalAccount.user_id), primary_key=True)
+    personal_account_id: Mapped[int] = mapped_column(ForeignKey(PersonalAccount.user_id), primary_key=True, index=True)
     experience: Mapped[int] = mapped_column(nullable=False, default=0)  # суммарная экспа юзера по конкретному БП
 
 
@@ -81,10 +86,10 @@ class Level(Base, IdMixin):
 
     __tablename__ = "level"
 
-    battle_pass_id: Mapped[int] = mapped_column(ForeignKey(BattlePass.id), nullable=False)
+    battle_pass_id: Mapped[int] = mapped_column(ForeignKey(BattlePass.id), nullable=False, index=True)
     experience: Mapped[int] = mapped_column(nullable=False)  # необходимое кол-во экспы для уровня
     value: Mapped[int] = mapped_column(nullable=False)  # порядковый номер уровня (первый, второй, и т.д.)
-    rewards: Mapped[Optional[list["Reward"]]] = relationship("Reward", secondary="level_rewards", lazy="selectin")
+    rewards: Mapped[Optional[list["Reward"]]] = relationship("Reward", secondary="level_rewards", lazy="raise")
 
 
 class RewardType(StrEnum):
@@ -129,6 +134,12 @@ class PersonalAccountRewards(Base, IdMixin):
     """
 
     __tablename__ = "personal_account_rewards"
+    __table_args__ = (
+        # one row per granted reward, repeated grants increase its count
+        UniqueConstraint(
+            "personal_account_id", "reward_id", name="uq_personal_account_rewards_personal_account_id_reward_id"
+        ),
+    )
 
     reward_id: Mapped[int] = mapped_column(ForeignKey(Reward.id))
     personal_account_id: Mapped[int] = mapped_column(ForeignKey(PersonalAccount.user_id))
@@ -0,0 +1,15 @@
+__all__ = ["PredefinedState"]
+
+from src.storages.sqlalchemy.models.base import Base
+from src.storages.sqlalchemy.utils import *
+
+
+class PredefinedState(Base):
+    """
+    Хэши последних применённых предопределённых данных (predefined.yaml), по одному на сущность
+    """
+
+    __tablename__ = "predefined_state"
+
+    key: Mapped[str] = mapped_column(primary_key=True)
+    hash: Mapped[str] = mapped_column(nullable=False)
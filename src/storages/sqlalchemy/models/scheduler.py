@@ -0,0 +1,36 @@
+__all__ = ["ScheduledJob"]
+
+import datetime
+from typing import Any, Optional
+
+from sqlalchemy import BigInteger, Identity
+from sqlalchemy.dialects.postgresql import JSONB
+from sqlalchemy.sql.functions import now
+
+from src.storages.sqlalchemy.models.base import Base
+from src.storages.sqlalchemy.utils import *
+
+
+class ScheduledJob(Base):
+    """
+    Отложенная задача. Удаляется после успешного выполнения
+    """
+
+    __tablename__ = "scheduled_jobs"
+
+    id: Mapped[int] = mapped_column(BigInteger, Identity(), primary_key=True)
+    kind: Mapped[str] = mapped_column(nullable=False)
+    payload: Mapped[dict[str, Any]] = mapped_column(JSONB, nullable=False)
+    run_at: Mapped[datetime.datetime] = mapped_column(DateTime(timezone=True), nullable=False)
+    attempts: Mapped[int] = mapped_column(nullable=False, default=0)
+    locked_until: Mapped[Optional[datetime.datetime]] = mapped_column(DateTime(timezone=True), nullable=True)
+    last_error: Mapped[Optional[str]] = mapped_column(nullable=True)
+    failed_at: Mapped[Optional[datetime.datetime]] = mapped_column(DateTime(timezone=True), nullable=True)
+    created_at: Mapped[datetime.datetime] = mapped_column(DateTime(timezone=True), nullable=False, server_default=now())
+
+
+Index(
+    "ix_scheduled_jobs_active_run_at",
+    ScheduledJob.run_at,
+    postgresql_where=ScheduledJob.failed_at.is_(None),
+)
@@ -36,3 +36,12 @@ class UserTaskAnswer(Base, IdMixin):
     task_id: Mapped[int] = mapped_column(ForeignKey("tasks.id"), nullable=False)
     is_correct: Mapped[bool] = mapped_column(nullable=False)
     timestamp: Mapped[datetime.datetime] = mapped_column(DateTime(timezone=True), nullable=False, server_default=now())
+
+
+# Correct answers of a user, checks whether tasks are solved without touching other rows
+Index(
+    "ix_user_task_answers_user_id_task_id_correct",
+    UserTaskAnswer.user_id,
+    UserTaskAnswer.task_id,
+    postgresql_where=UserTaskAnswer.is_correct,
+)
@@ -0,0 +1,65 @@
+__all__ = ["TimedAsyncAdaptedQueuePool", "DatabasePoolStats"]
+
+import time
+
+from pydantic import BaseModel, Field
+from sqlalchemy import exc
+from sqlalchemy.pool import AsyncAdaptedQueuePool
+
+
+class DatabasePoolStats(BaseModel):
+    pool_size: int = Field(..., description="Connections kept open by the pool")
+    max_overflow: int = Field(..., description="Connections that may be opened above pool_size under load")
+    checked_in: int = Field(..., description="Idle connections in the pool right now")
+    checked_out: int = Field(..., description="Connections used by requests right now")
+    overflow: int = Field(..., description="Connections opened above pool_size right now (negative if not all opened)")
+    checkouts: int = Field(..., description="Connections handed out since startup")
+    timeouts: int = Field(..., description="Checkouts that gave up after pool_timeout since startup")
+    average_wait: float = Field(..., description="Average time (in seconds) a checkout waited for a connection")
+    max_wait: float = Field(..., description="Longest time (in seconds) a checkout waited for a connection")
+
+
+class TimedAsyncAdaptedQueuePool(AsyncAdaptedQueuePool):
+    """
+    Queue pool that also measures how long checkouts wait for a free connection.
+    Every worker process has its own pool, so multiply its size by the number of workers
+    when comparing it with Postgres max_connections.
+    """
+
+    _checkouts: int
+    _timeouts: int
+    _total_wait: float
+    _max_wait: float
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self._checkouts = 0
+        self._timeouts = 0
+        self._total_wait = 0.0
+        self._max_wait = 0.0
+
+    def _do_get(self):
+        started_at = time.perf_counter()
+        try:
+            connection = super()._do_get()
+        except exc.TimeoutError:
+            self._timeouts += 1
+            raise
+        waited = time.perf_counter() - started_at
+        self._checkouts += 1
+        self._total_wait += waited
+        self._max_wait = max(self._max_wait, waited)
+        return connection
+
+    def stats(self) -> DatabasePoolStats:
+        return DatabasePoolStats(
+            pool_size=self.size(),
+            max_overflow=self._max_overflow,
+            checked_in=self.checkedin(),
+            checked_out=self.checkedout(),
+            overflow=self.overflow(),
+            checkouts=self._checkouts,
+            timeouts=self._timeouts,
+            average_wait=self._total_wait / (self._checkouts or 1),
+            max_wait=self._max_wait,
+        )
@@ -3,6 +3,7 @@ __all__ = ["SQLAlchemyRepository"]
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from src.storages.sqlalchemy import SQLAlchemyStorage
+from src.storages.sqlalchemy.unit_of_work import UnitOfWork
 
 
 class SQLAlchemyRepository:
@@ -11,5 +12,13 @@ class SQLAlchemyRepository:
     def __init__(self, storage: SQLAlchemyStorage):
         self.storage = storage
 
-    def _create_session(self) -> AsyncSession:
-        return self.storage.create_session()
+    def _create_session(self, independent: bool = False) -> AsyncSession:
+        """
+        Session of the current unit of work (one per request), or a session of its own outside of a request.
+
+        :param independent: always use a session of its own, committed separately from the request
+        """
+        unit_of_work = UnitOfWork.current()
+        if unit_of_work is None or independent:
+            return self.storage.create_session()
+        return unit_of_work.join()  # type: ignore[return-value]
@@ -0,0 +1,150 @@
+__all__ = ["UnitOfWork", "run_after_commit"]
+
+from contextvars import ContextVar, Token
+from typing import Any, Callable, Optional
+
+from sqlalchemy.exc import SQLAlchemyError
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from src.storages.sqlalchemy.storage import SQLAlchemyStorage
+
+_current: ContextVar[Optional["UnitOfWork"]] = ContextVar("unit_of_work", default=None)
+
+
+class UnitOfWork:
+    """
+    One session and transaction shared by all repositories during a request.
+    Repositories join it in `SQLAlchemyRepository._create_session`, their `commit()` only flushes,
+    and the transaction is committed once by `commit()`. Anything not committed is rolled back on exit.
+    The session (and a pooled connection) is taken only when the first repository needs it.
+    """
+
+    storage: SQLAlchemyStorage
+    has_writes: bool  # a repository committed its part of the work, which is not committed yet
+    _session: Optional[AsyncSession]
+    _failed: bool
+    _closed: bool
+    _depth: int  # repository blocks using the session right now, they may be nested
+    _after_commit: list[Callable[[], Any]]
+    _after_close: list[Callable[[], Any]]
+    _token: Optional[Token]
+
+    def __init__(self, storage: SQLAlchemyStorage):
+        self.storage = storage
+        self.has_writes = False
+        self._session = None
+        self._failed = False
+        self._closed = False
+        self._depth = 0
+        self._after_commit = []
+        self._after_close = []
+        self._token = None
+
+    @classmethod
+    def current(cls) -> Optional["UnitOfWork"]:
+        unit_of_work = _current.get()
+        if unit_of_work is None or unit_of_work._closed:
+            return None
+        return unit_of_work
+
+    def join(self) -> "_JoinedSession":
+        if self._session is None:
+            self._session = self.storage.create_session()
+        return _JoinedSession(self, self._session)
+
+    def after_commit(self, callback: Callable[[], Any]) -> None:
+        """Run callback once the work is committed, it is dropped on rollback"""
+        self._after_commit.append(callback)
+
+    def after_close(self, callback: Callable[[], Any]) -> None:
+        """Run callback after the session is closed, whether the work was committed or not"""
+        self._after_close.append(callback)
+
+    async def commit(self) -> None:
+        """
+        :raises RuntimeError: if a database error happened in a repository, its transaction is aborted
+        """
+        if self._failed:
+            raise RuntimeError("Unit of work can not be committed after a database error")
+        if self._session is not None:
+            await self._session.commit()
+        self.has_writes = False
+        callbacks, self._after_commit = self._after_commit, []
+        for callback in callbacks:
+            callback()
+
+    async def rollback(self) -> None:
+        if self._session is not None:
+            await self._session.rollback()
+        self.has_writes = False
+        self._failed = False
+        self._after_commit.clear()
+
+    async def close(self) -> None:
+        if self._closed:
+            return
+        self._closed = True
+        try:
+            if self._session is not None:
+                await self._session.close()
+        finally:
+            callbacks, self._after_close = self._after_close, []
+            for callback in callbacks:
+                callback()
+
+    async def __aenter__(self) -> "UnitOfWork":
+        self._token = _current.set(self)
+        return self
+
+    async def __aexit__(self, exc_type, exc_val, exc_tb) -> None:
+        _current.reset(self._token)
+        await self.close()
+
+
+class _JoinedSession:
+    """
+    Shared session handed to one repository block.
+    `commit()` flushes instead of committing, and leaving the block detaches loaded objects
+    like closing a session of its own would, so repositories behave the same with or without a unit of work.
+    """
+
+    _unit_of_work: UnitOfWork
+    _session: AsyncSession
+
+    def __init__(self, unit_of_work: UnitOfWork, session: AsyncSession):
+        self._unit_of_work = unit_of_work
+        self._session = session
+
+    def __getattr__(self, name: str) -> Any:
+        return getattr(self._session, name)
+
+    async def commit(self) -> None:
+        await self._session.flush()
+        self._unit_of_work.has_writes = True
+
+    async def rollback(self) -> None:
+        await self._unit_of_work.rollback()
+
+    async def close(self) -> None:
+        pass
+
+    async def __aenter__(self) -> AsyncSession:
+        self._unit_of_work._depth += 1
+        return self  # type: ignore[return-value]
+
+    async def __aexit__(self, exc_type, exc_val, exc_tb) -> None:
+        self._unit_of_work._depth -= 1
+        if isinstance(exc_val, SQLAlchemyError):
+            # Postgres aborts the transaction, nothing else in the request can be committed
+            self._unit_of_work._failed = True
+        if self._unit_of_work._depth == 0:
+            self._session.expunge_all()
+
+
+def run_after_commit(callback: Callable[[], Any]) -> None:
+    """Run callback once the current unit of work is committed, or right away outside of one"""
+    unit_of_work = UnitOfWork.current()
+    if unit_of_work is None:
+        callback()
+    else:
+        unit_of_work.after_commit(callback)
@@ -4,6 +4,7 @@ __all__ = [
     "Mapped",
     "relationship",
     "UniqueConstraint",
+    "Index",
     "select",
     "update",
     "insert",
@@ -24,7 +25,7 @@ __all__ = [
     "text",
 ]
 
-from sqlalchemy import ForeignKey, UniqueConstraint
+from sqlalchemy import ForeignKey, UniqueConstraint, Index
 from sqlalchemy.ext.associationproxy import association_proxy, AssociationProxy
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 from sqlalchemy import select, update, insert, delete, join, union
@@ -0,0 +1,67 @@
+import asyncio
+import datetime
+import inspect
+import os
+from pathlib import Path
+from typing import Callable, Generic, Optional, TypeVar
+
+import pytest
+
+# src.config reads the settings on import
+os.environ.setdefault("SETTINGS_PATH", str(Path(__file__).parent / "settings.yaml"))
+
+T = TypeVar("T")
+
+
+@pytest.hookimpl(tryfirst=True)
+def pytest_pyfunc_call(pyfuncitem: pytest.Function) -> Optional[bool]:
+    """Run `async def` tests in a fresh event loop"""
+    if not inspect.iscoroutinefunction(pyfuncitem.obj):
+        return None
+    arguments = {name: pyfuncitem.funcargs[name] for name in pyfuncitem._fixtureinfo.argnames}
+    asyncio.run(pyfuncitem.obj(**arguments))
+    return True
+
+
+async def wait_for(condition: Callable[[], bool], timeout: float = 2) -> None:
+    """Poll until the condition holds, fail if it does not within `timeout` seconds"""
+
+    async def poll():
+        while not condition():
+            await asyncio.sleep(0.01)
+
+    await asyncio.wait_for(poll(), timeout)
+
+
+def now() -> datetime.datetime:
+    return datetime.datetime.now(datetime.timezone.utc)
+
+
+class FakeQueue(Generic[T]):
+    """
+    In-memory stand-in for the repositories behind a `LeasedWorker`: claim returns every due item once,
+    finished items are recorded in `done` and `failed` by id.
+    """
+
+    wakeup: asyncio.Event
+    waiting: list[tuple[datetime.datetime, T]]  # (run at, item)
+    done: list[int]
+    failed: list[tuple[int, Optional[datetime.datetime]]]  # (id, retry at)
+
+    def __init__(self):
+        self.wakeup = asyncio.Event()
+        self.waiting = []
+        self.done = []
+        self.failed = []
+
+    def put(self, item: T, run_at: Optional[datetime.datetime] = None) -> None:
+        self.waiting.append((run_at or now(), item))
+        self.wakeup.set()
+
+    async def claim(self, limit: int, lease: int) -> list[T]:
+        due = [item for run_at, item in self.waiting if run_at <= now()][:limit]
+        self.waiting = [(run_at, item) for run_at, item in self.waiting if item not in due]
+        return due
+
+    async def next_run_at(self) -> Optional[datetime.datetime]:
+        return min((run_at for run_at, _ in self.waiting), default=None)
@@ -0,0 +1,69 @@
+import pytest
+
+from src.modules.lesson.schemas import TaskAnswerKey, normalize_answer
+from src.storages.sqlalchemy.models.lesson import StepType
+
+
+@pytest.mark.parametrize(
+    "answer, expected",
+    [
+        ("Phishing", "phishing"),
+        ("ＰＨＩＳＨＩＮＧ", "phishing"),  # fullwidth letters
+        ("ﬁle", "file"),  # ligature
+        ("Straße", "strasse"),  # casefold, not lower
+        ("ПАРОЛЬ", "пароль"),
+        ("  two\t\twords \n", "two words"),
+        ("no break", "no break"),  # NBSP
+        ("", ""),
+        (" \t\n", ""),
+    ],
+)
+def test_normalize_answer(answer, expected):
+    assert normalize_answer(answer) == expected
+
+
+def _input_task(*answers: str) -> TaskAnswerKey:
+    return TaskAnswerKey(id=1, type=StepType.input, input_answers=list(answers))
+
+
+def _choice_task(step_type: StepType, choices) -> TaskAnswerKey:
+    return TaskAnswerKey(id=1, type=step_type, correct_choices=choices)
+
+
+@pytest.mark.parametrize("answer", ["Two-Factor", "two-factor", "  TWO-FACTOR ", "ＴＷＯ-ＦＡＣＴＯＲ", "2FA", "2fa"])
+def test_input_answer_matches_normalized(answer):
+    assert _input_task("two-factor", " 2FA ").check_answer(answer)
+
+
+@pytest.mark.parametrize("answer", ["two factor", "twofactor", "", None, [1]])
+def test_input_answer_mismatch(answer):
+    assert not _input_task("two-factor").check_answer(answer)
+
+
+def test_input_answer_without_answers():
+    assert not _input_task().check_answer("anything")
+    assert not TaskAnswerKey(id=1, type=StepType.input).check_answer("")
+
+
+@pytest.mark.parametrize("step_type", [StepType.instant, StepType.radio, StepType.multichoice])
+def test_choices_ignore_order(step_type):
+    task = _choice_task(step_type, [1, 3])
+    assert task.check_answer([1, 3])
+    assert task.check_answer([3, 1])
+
+
+@pytest.mark.parametrize("answer", [[1], [1, 2, 3], [], [2, 4], None, "1"])
+def test_choices_mismatch(answer):
+    assert not _choice_task(StepType.multichoice, [1, 3]).check_answer(answer)
+
+
+def test_choices_without_correct_choices():
+    task = _choice_task(StepType.radio, None)
+    assert not task.check_answer([])
+    assert not task.check_answer([1])
+
+
+def test_empty_step_is_always_correct():
+    task = TaskAnswerKey(id=1, type=StepType.empty)
+    assert task.check_answer(None)
+    assert task.check_answer("whatever")
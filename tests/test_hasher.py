@@ -0,0 +1,63 @@
+import asyncio
+import threading
+
+import pytest
+
+from src.api.exceptions import TooManyRequestsException
+from src.modules.auth.hasher import PasswordHasher
+from tests.conftest import wait_for
+
+
+async def test_hashes_and_verifies():
+    hasher = PasswordHasher(rounds=4, workers=2, queue_size=2)
+    password_hash = await hasher.hash("secret")
+    assert await hasher.verify("secret", password_hash)
+    assert not await hasher.verify("wrong", password_hash)
+    stats = hasher.stats()
+    assert stats.completed == 3 and stats.in_flight == 0
+    hasher.shutdown()
+
+
+@pytest.fixture
+def blocked():
+    """Hasher with one worker and one queue slot, jobs running `release.wait` block until the test ends"""
+    hasher = PasswordHasher(rounds=4, workers=1, queue_size=1)
+    release = threading.Event()
+    yield hasher, release
+    release.set()
+    hasher.shutdown()
+
+
+async def test_rejects_when_workers_and_queue_are_full(blocked):
+    hasher, release = blocked
+    running = [asyncio.create_task(hasher._run(release.wait)) for _ in range(2)]
+    await asyncio.sleep(0.05)
+    with pytest.raises(TooManyRequestsException):
+        await hasher._run(release.wait)
+    release.set()
+    await asyncio.gather(*running)
+    assert hasher.stats().rejected == 1 and hasher.stats().in_flight == 0
+
+
+async def test_cancelled_requests_keep_their_slot_while_the_job_runs(blocked):
+    hasher, release = blocked
+    running = asyncio.create_task(hasher._run(release.wait))
+    queued = asyncio.create_task(hasher._run(release.wait))
+    await asyncio.sleep(0.05)
+
+    # abandoned requests, e.g. clients that disconnected
+    running.cancel()
+    queued.cancel()
+    await asyncio.gather(running, queued, return_exceptions=True)
+
+    # the queued job is cancelled before it starts, the running one still occupies its worker
+    assert hasher.stats().in_flight == 1
+    waiting = asyncio.create_task(hasher._run(release.wait))  # takes the last queue slot
+    await asyncio.sleep(0.05)
+    with pytest.raises(TooManyRequestsException):
+        await hasher._run(release.wait)
+
+    release.set()
+    await waiting
+    await wait_for(lambda: hasher.stats().in_flight == 0)
+    assert hasher.stats().completed == 2
@@ -0,0 +1,61 @@
+import pytest
+
+from src.modules.personal_account.repository import BattlePassLevels
+from src.modules.personal_account.schemas import ViewLevelUp
+
+
+def _levels(*thresholds: int) -> BattlePassLevels:
+    # given out of order, values follow the thresholds
+    levels = [
+        ViewLevelUp(battle_pass_id=1, level_id=10 + value, value=value, experience=experience)
+        for value, experience in enumerate(thresholds, start=1)
+    ]
+    return BattlePassLevels(list(reversed(levels)))
+
+
+def _values(levels) -> list[int]:
+    return [level.value for level in levels]
+
+
+@pytest.mark.parametrize(
+    "old, new, expected",
+    [
+        (0, 99, []),
+        (0, 100, [1]),  # reaching the threshold exactly crosses it
+        (99, 100, [1]),
+        (100, 101, []),  # already reached
+        (100, 199, []),
+        (99, 200, [1, 2]),
+        (0, 10_000, [1, 2, 3]),
+        (300, 10_000, []),
+    ],
+)
+def test_crossed_threshold_edges(old, new, expected):
+    assert _values(_levels(100, 200, 300).crossed(old, new)) == expected
+
+
+@pytest.mark.parametrize("experience", [0, 99, 100, 250, 300, 1000])
+def test_zero_exp_crosses_nothing(experience):
+    assert _levels(100, 200, 300).crossed(experience, experience) == []
+
+
+def test_levels_with_zero_threshold_are_reached_from_the_start():
+    levels = _levels(0, 100)
+    assert _values(levels.crossed(0, 0)) == []
+    assert _values(levels.crossed(0, 100)) == [2]
+
+
+def test_equal_thresholds_are_crossed_together_in_value_order():
+    levels = _levels(100, 100, 200)
+    assert _values(levels.crossed(0, 100)) == [1, 2]
+    assert _values(levels.crossed(99, 200)) == [1, 2, 3]
+    assert _values(levels.crossed(100, 200)) == [3]
+
+
+def test_crossed_returns_level_rewards():
+    levels = BattlePassLevels([ViewLevelUp(battle_pass_id=1, level_id=11, value=1, experience=100, rewards=[5, 6])])
+    assert levels.crossed(0, 150)[0].rewards == [5, 6]
+
+
+def test_no_levels():
+    assert BattlePassLevels([]).crossed(0, 100) == []
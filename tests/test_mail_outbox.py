@@ -0,0 +1,109 @@
+import asyncio
+import datetime
+import smtplib
+from typing import Optional
+
+from src.modules.smtp.repository import SMTPRepository
+from src.modules.smtp.schemas import ClaimedMail
+from src.modules.smtp.worker import MailOutboxWorker
+from tests.conftest import FakeQueue, now, wait_for
+
+
+class FakeOutbox(FakeQueue[ClaimedMail]):
+    """In-memory `MailOutboxRepository`"""
+
+    @property
+    def new_mail(self):
+        return self.wakeup
+
+    def enqueue(self, id_: int, recipient: str, attempts: int = 1) -> None:
+        self.put(ClaimedMail(id=id_, recipient=recipient, message=f"mail {id_}", attempts=attempts))
+
+    async def mark_sent(self, id_: int) -> None:
+        self.done.append(id_)
+
+    async def mark_failed(self, id_: int, error: str, retry_at: Optional[datetime.datetime]) -> None:
+        self.failed.append((id_, retry_at))
+
+
+class FakeSMTP(SMTPRepository):
+    """Runs the real pool and address checks, but records messages instead of talking to a server."""
+
+    def __init__(self, error: Optional[Exception] = None):
+        super().__init__()
+        self.error = error
+        self.delivered: list[tuple[str, str]] = []
+
+    def _send(self, message: str, to: str) -> None:
+        if self.error is not None:
+            raise self.error
+        self.delivered.append((to, message))
+
+
+async def test_sends_claimed_mail():
+    outbox, smtp = FakeOutbox(), FakeSMTP()
+    outbox.enqueue(1, "a@example.com")
+    outbox.enqueue(2, "b@example.com")
+    assert await MailOutboxWorker(outbox, smtp).run_once() == 2
+    assert sorted(smtp.delivered) == [("a@example.com", "mail 1"), ("b@example.com", "mail 2")]
+    assert sorted(outbox.done) == [1, 2]
+    await smtp.close()
+
+
+async def test_wakes_up_on_new_mail():
+    outbox, smtp = FakeOutbox(), FakeSMTP()
+    worker = MailOutboxWorker(outbox, smtp)  # poll interval is 5 seconds, only the event can wake it in time
+    worker.start()
+    await asyncio.sleep(0.05)  # idle by now
+    outbox.enqueue(1, "a@example.com")
+    await wait_for(lambda: outbox.done == [1])
+    await worker.stop()
+    await smtp.close()
+
+
+async def test_retries_temporary_errors_with_backoff():
+    outbox, smtp = FakeOutbox(), FakeSMTP(smtplib.SMTPServerDisconnected("gone"))
+    worker = MailOutboxWorker(outbox, smtp)
+    outbox.enqueue(1, "a@example.com", attempts=1)
+    outbox.enqueue(2, "b@example.com", attempts=3)
+    outbox.enqueue(3, "c@example.com", attempts=6)  # the last one
+    before = now()
+    await worker.run_once()
+    retry_at = dict(outbox.failed)
+    assert 30 <= (retry_at[1] - before).total_seconds() < 31
+    assert 120 <= (retry_at[2] - before).total_seconds() < 121
+    assert retry_at[3] is None
+    assert outbox.done == []
+    await smtp.close()
+
+
+async def test_gives_up_on_permanent_errors():
+    outbox, smtp = FakeOutbox(), FakeSMTP(smtplib.SMTPResponseException(550, b"no such user"))
+    worker = MailOutboxWorker(outbox, smtp)
+    outbox.enqueue(1, "a@example.com")
+    outbox.enqueue(2, "not an email")
+    await worker.run_once()
+    assert sorted(outbox.failed) == [(1, None), (2, None)]
+    await smtp.close()
+
+
+async def test_keeps_running_after_claim_errors():
+    outbox, smtp = FakeOutbox(), FakeSMTP()
+    claims = 0
+    real_claim = outbox.claim
+
+    async def flaky_claim(limit: int, lease: int) -> list[ClaimedMail]:
+        nonlocal claims
+        claims += 1
+        if claims == 1:
+            raise ConnectionError("database is down")
+        return await real_claim(limit, lease)
+
+    outbox.claim = flaky_claim
+    worker = MailOutboxWorker(outbox, smtp)
+    worker.start()
+    await wait_for(lambda: claims == 1)
+    outbox.enqueue(1, "a@example.com")
+    await wait_for(lambda: outbox.done == [1])
+    await worker.stop()
+    await smtp.close()
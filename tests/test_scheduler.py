@@ -0,0 +1,78 @@
+import asyncio
+import datetime
+from typing import Any, Optional
+
+from src.modules.scheduler.scheduler import Scheduler
+from src.modules.scheduler.schemas import ClaimedJob
+from tests.conftest import FakeQueue, now, wait_for
+
+
+class FakeJobs(FakeQueue[ClaimedJob]):
+    """In-memory `ScheduledJobRepository`"""
+
+    @property
+    def new_job(self):
+        return self.wakeup
+
+    def schedule(self, id_: int, kind: str, run_at: datetime.datetime, attempts: int = 1) -> None:
+        self.put(ClaimedJob(id=id_, kind=kind, payload={"id": id_}, attempts=attempts), run_at)
+
+    async def complete(self, id_: int) -> None:
+        self.done.append(id_)
+
+    async def fail(self, id_: int, error: str, retry_at: Optional[datetime.datetime]) -> None:
+        self.failed.append((id_, retry_at))
+
+
+def _scheduler(jobs: FakeJobs, ran: list[int]) -> Scheduler:
+    async def ping(payload: dict[str, Any]) -> None:
+        ran.append(payload["id"])
+
+    async def boom(payload: dict[str, Any]) -> None:
+        raise RuntimeError("boom")
+
+    scheduler = Scheduler(jobs)
+    scheduler.register("ping", ping)
+    scheduler.register("boom", boom)
+    return scheduler
+
+
+async def test_runs_due_jobs_only():
+    jobs, ran = FakeJobs(), []
+    scheduler = _scheduler(jobs, ran)
+    jobs.schedule(1, "ping", now())
+    jobs.schedule(2, "ping", now() + datetime.timedelta(hours=1))
+    assert await scheduler.run_once() == 1
+    assert ran == [1] and jobs.done == [1]
+
+
+async def test_sleeps_until_the_next_job():
+    jobs, ran = FakeJobs(), []
+    scheduler = _scheduler(jobs, ran)
+    assert await scheduler.idle_timeout() == scheduler.poll_interval
+    jobs.schedule(1, "ping", now() + datetime.timedelta(seconds=0.2))
+    assert 0 < await scheduler.idle_timeout() <= 0.2
+    jobs.schedule(2, "ping", now() - datetime.timedelta(seconds=5))
+    assert await scheduler.idle_timeout() == 0
+
+    jobs.waiting.clear()
+    scheduler.start()
+    await asyncio.sleep(0.05)  # idle by now
+    jobs.schedule(3, "ping", now() + datetime.timedelta(seconds=0.2))  # poll interval is 30 seconds
+    await wait_for(lambda: ran == [3])
+    await scheduler.stop()
+
+
+async def test_retries_failed_jobs_and_gives_up():
+    jobs = FakeJobs()
+    scheduler = _scheduler(jobs, [])
+    jobs.schedule(1, "boom", now(), attempts=2)
+    jobs.schedule(2, "boom", now(), attempts=5)  # the last one
+    jobs.schedule(3, "unknown", now())
+    before = now()
+    await scheduler.run_once()
+    retry_at = dict(jobs.failed)
+    assert 60 <= (retry_at[1] - before).total_seconds() < 61
+    assert retry_at[2] is None
+    assert retry_at[3] is None
+    assert jobs.done == []
@@ -0,0 +1,153 @@
+import asyncio
+import smtplib
+import socket
+import time
+
+import pytest
+
+from src.config import settings
+from src.modules.smtp.repository import SMTPRepository
+from tests.conftest import wait_for
+
+
+@pytest.fixture
+def smtp_settings(monkeypatch):
+    # a single pool thread, so every send goes through the same pooled connection
+    monkeypatch.setattr(settings.smtp, "pool_size", 1)
+    monkeypatch.setattr(settings.smtp, "starttls", False)
+    monkeypatch.setattr(settings.smtp, "password", None)
+    return settings.smtp
+
+
+class FakeConnection:
+    """`smtplib.SMTP` stand-in, `drop()` makes it behave like a connection closed by the server"""
+
+    opened: list["FakeConnection"] = []
+
+    def __init__(self, host: str, port: int, timeout: float):
+        self.sent: list[str] = []
+        self.connected = True
+        self.quit_called = False
+        FakeConnection.opened.append(self)
+
+    def sendmail(self, from_addr: str, to_addrs: str, msg: str) -> dict:
+        if not self.connected:
+            raise smtplib.SMTPServerDisconnected("Connection unexpectedly closed")
+        self.sent.append(to_addrs)
+        return {}
+
+    def drop(self) -> None:
+        self.connected = False
+
+    def quit(self) -> None:
+        self.quit_called = True
+        if not self.connected:
+            raise smtplib.SMTPServerDisconnected("please run connect() first")
+        self.connected = False
+
+    def close(self) -> None:
+        self.connected = False
+
+
+@pytest.fixture
+def connections(monkeypatch, smtp_settings) -> list[FakeConnection]:
+    monkeypatch.setattr(FakeConnection, "opened", [])
+    monkeypatch.setattr(smtplib, "SMTP", FakeConnection)
+    return FakeConnection.opened
+
+
+async def test_sends_share_one_connection(connections):
+    smtp = SMTPRepository()
+    for i in range(3):
+        await smtp.send("message", f"user{i}@example.com")
+    assert len(connections) == 1
+    assert connections[0].sent == ["user0@example.com", "user1@example.com", "user2@example.com"]
+    await smtp.close()
+    assert connections[0].quit_called
+
+
+async def test_reconnects_once_when_the_server_dropped_the_connection(connections):
+    smtp = SMTPRepository()
+    await smtp.send("message", "a@example.com")
+    connections[0].drop()
+    await smtp.send("message", "b@example.com")
+    assert len(connections) == 2
+    assert connections[1].sent == ["b@example.com"]
+    await smtp.send("message", "c@example.com")
+    assert len(connections) == 2
+    await smtp.close()
+
+
+async def test_gives_up_when_the_new_connection_drops_too(connections, monkeypatch):
+    def sendmail(self, from_addr, to_addrs, msg):
+        raise smtplib.SMTPServerDisconnected("Connection unexpectedly closed")
+
+    monkeypatch.setattr(FakeConnection, "sendmail", sendmail)
+    smtp = SMTPRepository()
+    with pytest.raises(smtplib.SMTPServerDisconnected):
+        await smtp.send("message", "a@example.com")
+    assert len(connections) == 2
+    await smtp.close()
+
+
+async def test_reopens_connections_idle_for_too_long(connections, smtp_settings, monkeypatch):
+    monkeypatch.setattr(smtp_settings, "connection_idle_timeout", 0.05)
+    smtp = SMTPRepository()
+    await smtp.send("message", "a@example.com")
+    await smtp.send("message", "b@example.com")
+    assert len(connections) == 1
+    time.sleep(0.1)
+    await smtp.send("message", "c@example.com")
+    assert len(connections) == 2
+    assert connections[0].quit_called
+    await smtp.close()
+
+
+def _free_port() -> int:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+@pytest.fixture
+def smtp_server(smtp_settings, monkeypatch):
+    """Local aiosmtpd server collecting messages with the session they came through"""
+    controller_module = pytest.importorskip("aiosmtpd.controller")
+
+    class Handler:
+        def __init__(self):
+            self.received: list[tuple[object, list[str]]] = []  # (session, recipients)
+            self.servers = []
+
+        async def handle_DATA(self, server, session, envelope):
+            self.received.append((session, envelope.rcpt_tos))
+            self.servers.append(server)
+            return "250 OK"
+
+    handler = Handler()
+    port = _free_port()
+    controller = controller_module.Controller(handler, hostname="127.0.0.1", port=port)
+    controller.start()
+    monkeypatch.setattr(smtp_settings, "server", "127.0.0.1")
+    monkeypatch.setattr(smtp_settings, "port", port)
+    yield controller, handler
+    controller.stop()
+
+
+async def test_against_local_smtp_server(smtp_server):
+    controller, handler = smtp_server
+    smtp = SMTPRepository()
+    for i in range(3):
+        await smtp.send("Subject: test\r\n\r\nhello", f"user{i}@example.com")
+    sessions = {id(session) for session, _ in handler.received}
+    assert [recipients for _, recipients in handler.received] == [[f"user{i}@example.com"] for i in range(3)]
+    assert len(sessions) == 1
+
+    # the server closes the connection, the next send opens a new session
+    controller.loop.call_soon_threadsafe(handler.servers[-1].transport.close)
+    await wait_for(lambda: handler.servers[-1].transport is None or handler.servers[-1].transport.is_closing())
+    await asyncio.sleep(0.05)
+    await smtp.send("Subject: test\r\n\r\nhello", "after@example.com")
+    assert handler.received[-1][1] == ["after@example.com"]
+    assert len({id(session) for session, _ in handler.received}) == 2
+    await smtp.close()
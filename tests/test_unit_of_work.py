@@ -0,0 +1,25 @@
+from src.storages.sqlalchemy.unit_of_work import UnitOfWork, run_after_commit
+
+
+async def test_run_after_commit_waits_for_the_commit():
+    calls = []
+    async with UnitOfWork(storage=None) as unit_of_work:  # no repository joins it, so no session is made
+        run_after_commit(lambda: calls.append("commit"))
+        assert calls == []
+        await unit_of_work.commit()
+        assert calls == ["commit"]
+
+
+async def test_run_after_commit_drops_callbacks_on_rollback():
+    calls = []
+    async with UnitOfWork(storage=None) as unit_of_work:
+        run_after_commit(lambda: calls.append("rolled back"))
+        await unit_of_work.rollback()
+        await unit_of_work.commit()
+    assert calls == []
+
+
+def test_run_after_commit_outside_of_unit_of_work():
+    calls = []
+    run_after_commit(lambda: calls.append("now"))
+    assert calls == ["now"]